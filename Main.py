@@ -1,17 +1,8 @@
 # Fix import syntax error and handle missing imports
 import json
-
-player_stats = {
-    "health": 60,
-    "corruption": 20,
-    "reputation": 45,
-    "sanity": 90
-}
-
-with open("stats.json", "w") as f:
-    json.dump(player_stats, f)
 import random
 import os
+import threading
 # main.py
 from player import Player
 from story import jungle_intro
@@ -19,6 +10,10 @@ from battle import battle
 from save_load import save_game, load_game
 from ai_enemy_gen import generate_enemy
 from Levelup_system import level_up, determine_roles
+from encounter_queue import EncounterQueue
+from scene_index import SceneIndex
+from save_queue import get_save_queue
+from save_store import CLI_GAME, get_save_store, import_json_save, player_key
 # Handle imports that may not exist
 try:
     from events import daily_event
@@ -36,7 +31,20 @@ except ImportError:
         print("The hollow flame whispers are silent today.")
         pass
 
+def write_stats_file():
+    """Write the starting world stats to stats.json"""
+    player_stats = {
+        "health": 60,
+        "corruption": 20,
+        "reputation": 45,
+        "sanity": 90
+    }
+
+    with open("stats.json", "w") as f:
+        json.dump(player_stats, f)
+
 def main():
+    write_stats_file()
     player = load_game(Player)
     daily_event(player)
     whisper_from_hollow_flame(player)
@@ -74,7 +82,6 @@ def main():
 if __name__ == "__main__":
     main()
 
-from supabase import create_client, Client
 try:
     import AI as brain
     AI_AVAILABLE = True
@@ -88,29 +95,69 @@ except ImportError:
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
 
-def init_supabase():
-    """Initialize Supabase client"""
+# The CLI's saves in the local save database
+LOCAL_SAVE_GAME = CLI_GAME
+
+def init_supabase(verbose=True):
+    """Initialize Supabase client; verbose=False keeps quiet unless connecting fails"""
     if not SUPABASE_URL or not SUPABASE_KEY:
-        print("⚠️ Supabase secrets not configured!")
-        print("Please set SUPABASE_URL and SUPABASE_ANON_KEY in the Secrets tab.")
+        if verbose:
+            print("⚠️ Supabase secrets not configured!")
+            print("Please set SUPABASE_URL and SUPABASE_ANON_KEY in the Secrets tab.")
         return None
 
     try:
-        print("🔍 Supabase secrets found! Attempting connection...")
+        from supabase import create_client, Client
+
+        if verbose:
+            print("🔍 Supabase secrets found! Attempting connection...")
         supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-        print("✅ Successfully connected to Supabase!")
+        if verbose:
+            print("✅ Successfully connected to Supabase!")
         return supabase
     except Exception as e:
         print(f"❌ Failed to connect to Supabase: {e}")
         print("Please check your SUPABASE_URL and SUPABASE_ANON_KEY values.")
         return None
 
-def save_game_to_supabase(supabase, player_name, player_stats, inventory, character_health, character_points, current_stage):
-    """Save game data to Supabase"""
+# Connected on first use, so importing this module never touches the network
+_supabase_client = None
+_supabase_checked = False
+_supabase_lock = threading.Lock()
+
+def get_supabase_client(verbose=True):
+    """Return the Supabase client (None when unavailable), connecting on first use
+
+    verbose=False skips the status lines, for callers off the main thread.
+    """
+    global _supabase_client, _supabase_checked
+    if not _supabase_checked:
+        with _supabase_lock:
+            if not _supabase_checked:
+                if verbose:
+                    print("🔍 Checking Supabase configuration...")
+                _supabase_client = init_supabase(verbose)
+                if verbose:
+                    if _supabase_client:
+                        print("✅ Cloud save/load will be available!")
+                    else:
+                        print("⚠️ Using local save files only.")
+                    print("-" * 50)
+                _supabase_checked = True
+    return _supabase_client
+
+def save_game_to_supabase(supabase, player_name, player_stats, inventory, character_health, character_points, current_stage, scene_index=None, verbose=True):
+    """Save game data to Supabase; verbose=False keeps quiet unless something fails
+
+    The scene index has no column in game_saves, so it is only kept in the
+    local save, which is written first whether or not Supabase is connected.
+    """
     if not supabase:
-        print("Supabase not connected, using local save instead")
-        save_game_local(player_name, player_stats, inventory, character_health, character_points, current_stage)
+        if verbose:
+            print("Supabase not connected, using local save instead")
+        save_game_local(player_name, player_stats, inventory, character_health, character_points, current_stage, scene_index, verbose)
         return
+    save_game_local(player_name, player_stats, inventory, character_health, character_points, current_stage, scene_index, verbose=False)
 
     try:
         save_data = {
@@ -124,18 +171,20 @@ def save_game_to_supabase(supabase, player_name, player_stats, inventory, charac
 
         # Insert or update the save data
         result = supabase.table('game_saves').upsert(save_data, on_conflict='player_name').execute()
-        print("Game saved to Supabase successfully!")
+        if verbose:
+            print("Game saved to Supabase successfully!")
 
     except Exception as e:
         print(f"Failed to save to Supabase: {e}")
-        print("Falling back to local save...")
-        save_game_local(player_name, player_stats, inventory, character_health, character_points, current_stage)
+        print("Game was saved locally instead.")
 
 def load_game_from_supabase(supabase, player_name):
     """Load game data from Supabase"""
+    # Write any auto-save still queued first, so the load sees it
+    get_save_queue().flush(player_name)
     if not supabase:
         print("Supabase not connected, using local load instead")
-        return load_game_local()
+        return load_game_local(player_name)
 
     try:
         result = supabase.table('game_saves').select('*').eq('player_name', player_name).execute()
@@ -158,38 +207,50 @@ def load_game_from_supabase(supabase, player_name):
     except Exception as e:
         print(f"Failed to load from Supabase: {e}")
         print("Falling back to local load...")
-        return load_game_local()
+        return load_game_local(player_name)
 
-def save_game_local(player_name, player_stats, inventory, character_health, character_points, current_stage):
+def save_game_local(player_name, player_stats, inventory, character_health, character_points, current_stage, scene_index=None, verbose=True):
     save_data = {
         "player_name": player_name,
         "player_stats": player_stats,
         "inventory": inventory,
         "character_health": character_health,
         "character_points": character_points,
-        "current_stage": current_stage
+        "current_stage": current_stage,
+        "scene_index": scene_index
     }
-    with open("save_game.json", "w") as save_file:
-        json.dump(save_data, save_file)
+    get_save_store().save(LOCAL_SAVE_GAME, player_name, save_data)
+    if verbose:
         print("Game saved locally successfully!")
 
-def load_game_local():
-    try:
-        with open("save_game.json", "r") as file:
-            save_data = json.load(file)
-        print("Game loaded from local file successfully!")
-        return (
-            save_data["player_name"],
-            save_data["player_stats"],
-            save_data["inventory"],
-            save_data["character_health"],
-            save_data["character_points"],
-            save_data.get("current_stage", "")
-        )
-    except FileNotFoundError:
+def load_game_local(player_name=None):
+    """Load a player's local save, or the most recent one when no name is given"""
+    store = get_save_store()
+    save_data = store.load(LOCAL_SAVE_GAME, player_name) if player_name else store.latest(LOCAL_SAVE_GAME)
+    if save_data is None:
+        # Before the save database every player shared one save_game.json
+        save_data = import_json_save(store, LOCAL_SAVE_GAME, "save_game.json")
+        if save_data is not None and player_name and player_key(save_data["player_name"]) != player_key(player_name):
+            save_data = None
+    if save_data is None:
         print("No saved game found.")
         return None
 
+    print("Game loaded from local save successfully!")
+    return (
+        save_data["player_name"],
+        save_data["player_stats"],
+        save_data["inventory"],
+        save_data["character_health"],
+        save_data["character_points"],
+        save_data.get("current_stage", "")
+    )
+
+def load_scene_index(player_name):
+    """The scenes a player has been shown, from their local save; only its scenes section is decoded"""
+    save_data = get_save_store().load(LOCAL_SAVE_GAME, player_name, sections=("scenes",)) if player_name else None
+    return SceneIndex.from_dict((save_data or {}).get("scene_index"))
+
 # Initialize global variables
 go_to_hut_next = False
 player_name = ""
@@ -198,12 +259,37 @@ inventory = []
 character_health = 100
 character_points = 0
 current_stage = ""
+scene_index = None
+
+def get_scene_index():
+    """This player's scene index, loaded from their save the first time it is needed"""
+    global scene_index
+    if scene_index is None:
+        scene_index = load_scene_index(player_name)
+    return scene_index
 
 def auto_save(reason=None):
-    save_game_to_supabase(supabase_client, player_name, player_stats, inventory, character_health, character_points, current_stage)
+    """Hand a snapshot of the game to the background saver and return at once
+
+    Snapshots queued before the saver gets to them collapse into one write of
+    the latest, so at most one save per player is ever waiting. Whatever is
+    still queued is written when the game exits.
+    """
+    snapshot = (
+        player_name, dict(player_stats), list(inventory), character_health, character_points, current_stage,
+        get_scene_index().to_dict()
+    )
+    get_save_queue().submit(player_name, write_auto_save, snapshot)
     if reason:
         print(f"Autosaved: {reason}")
 
+def write_auto_save(snapshot):
+    """Save queue worker for auto_save; quiet, so it never prints over an input() prompt
+
+    The client is looked up here, so connecting never blocks the prompt.
+    """
+    save_game_to_supabase(get_supabase_client(verbose=False), *snapshot, verbose=False)
+
 def clean_inventory():
     """Remove duplicate items from inventory, keeping only one of each category"""
     global inventory
@@ -497,15 +583,6 @@ def hut_encounter():
             character_health = 0
             return
 
-# Test Supabase connection at startup
-print("🔍 Checking Supabase configuration...")
-supabase_client = init_supabase()
-if supabase_client:
-    print("✅ Cloud save/load will be available!")
-else:
-    print("⚠️ Using local save files only.")
-print("-" * 50)
-
 def text_based_adventure_game():
     global character_health, go_to_hut_next
 
@@ -571,6 +648,13 @@ def dynamic_forest_path():
     """New dynamic forest path using AI-generated encounters"""
     global character_health, go_to_hut_next, current_stage
 
+    encounters = None
+    if AI_AVAILABLE and brain and brain.openai_key:
+        # Start writing the first batch while the player reads the intro
+        # Skip encounters that repeat a scene the player has already seen, in this run or a saved one
+        encounters = EncounterQueue(brain.generate_dynamic_encounters, "dark forest", scene_index=get_scene_index())
+        encounters.prime(player_stats, inventory)
+
     print("\nHello young adventurer, do you accept to take on one of the most fearsome adventures of your life?")
     print("1. Yes")
     print("2. No")
@@ -581,7 +665,7 @@ def dynamic_forest_path():
         while character_health > 0 and encounter_count < 10:  # Limit encounters to prevent infinite loop
             if AI_AVAILABLE and brain and brain.openai_key:
                 print("🤖 Using AI-generated encounter...")
-                encounter = brain.generate_dynamic_encounter(player_stats, inventory, "dark forest")
+                encounter = encounters.next(player_stats, inventory)
                 print(f"\n{encounter['scene']}")
 
                 for i, choice_text in enumerate(encounter['choices'], 1):
@@ -617,6 +701,14 @@ def dynamic_forest_path():
     else:
         print("Invalid choice")
 
+    if encounters:
+        encounters.close()
+        # Keep the scenes shown this run with the save
+        auto_save()
+        repetition = encounters.scene_index.stats()
+        if repetition["repeats"]:
+            print(f"Skipped {repetition['repeats']} repeated encounters ({repetition['repetition_rate']:.0%} of those written)")
+
 def handle_encounter_outcome(outcome, choice_index):
     """Handle the results of an encounter based on AI outcome"""
     global character_health, character_points
@@ -0,0 +1,156 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from stat_buckets import stat_buckets
+
+# Disk cache for analyze_player_action results (override via environment)
+ACTION_CACHE_PATH = os.getenv("ACTION_CACHE_PATH", "action_cache.db")
+ACTION_CACHE_MAX_ENTRIES = int(os.getenv("ACTION_CACHE_MAX_ENTRIES", "5000"))
+ACTION_CACHE_TTL = float(os.getenv("ACTION_CACHE_TTL", str(7 * 24 * 3600)))
+# A hit only rewrites last_used when it is older than this, so most hits are read-only
+ACTION_CACHE_TOUCH_SECONDS = float(os.getenv("ACTION_CACHE_TOUCH_SECONDS", "3600"))
+
+FILLER_WORDS = {"a", "an", "the", "to", "i", "my", "and", "then", "please"}
+
+def normalize_action(action):
+    """Lowercase, drop punctuation and filler words so similar phrasings share a key"""
+    words = re.findall(r"[a-z0-9']+", (action or "").lower())
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+def cache_key(action, player_stats):
+    """Cache key: normalized action plus bucketed Strength/Luck/Agility"""
+    buckets = list(stat_buckets(player_stats))
+    return f"{normalize_action(action)}|{'|'.join(buckets)}"
+
+class ActionCache:
+    """SQLite-backed LRU + TTL cache of action analyses
+
+    Recency is tracked to within touch_seconds: a hit on an entry used more
+    recently than that doesn't write, so repeat hits cost one SELECT.
+    """
+
+    def __init__(self, path=ACTION_CACHE_PATH, max_entries=ACTION_CACHE_MAX_ENTRIES, ttl=ACTION_CACHE_TTL,
+                 touch_seconds=ACTION_CACHE_TOUCH_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.touch_seconds = touch_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL + NORMAL keeps the LRU touch off the fsync path
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS action_analyses (
+                cache_key TEXT PRIMARY KEY,
+                analysis TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_action_analyses_last_used ON action_analyses (last_used)")
+        self._conn.commit()
+
+    def get(self, action, player_stats):
+        """Return the cached analysis for this action and stat bucket, or None"""
+        key = cache_key(action, player_stats)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT analysis, created_at, last_used FROM action_analyses WHERE cache_key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            if now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM action_analyses WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            if now - row[2] >= self.touch_seconds:
+                self._conn.execute("UPDATE action_analyses SET last_used = ? WHERE cache_key = ?", (now, key))
+                self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, action, player_stats, analysis):
+        """Store an analysis and evict least recently used entries over the size cap"""
+        key = cache_key(action, player_stats)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO action_analyses (cache_key, analysis, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(analysis), now, now)
+            )
+
+            size = self._conn.execute("SELECT COUNT(*) FROM action_analyses").fetchone()[0]
+            if size > self.max_entries:
+                # Evict down to 90% of the cap so eviction doesn't run on every insert
+                excess = size - int(self.max_entries * 0.9)
+                self._conn.execute(
+                    "DELETE FROM action_analyses WHERE cache_key IN "
+                    "(SELECT cache_key FROM action_analyses ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+                self.evictions += excess
+            self._conn.commit()
+
+    def purge_expired(self):
+        """Drop every entry older than the TTL"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM action_analyses WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        """Remove every cached analysis and reset the counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM action_analyses")
+            self._conn.commit()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM action_analyses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "size": size,
+            "max_entries": self.max_entries
+        }
+
+# Shared cache, opened on first use
+_action_cache = None
+_action_cache_lock = threading.Lock()
+
+def get_action_cache():
+    """Return the process-wide action cache, or None if it can't be opened"""
+    global _action_cache
+    if _action_cache is None:
+        with _action_cache_lock:
+            if _action_cache is None:
+                try:
+                    _action_cache = ActionCache()
+                except sqlite3.Error as e:
+                    print(f"Action cache unavailable: {e}")
+                    return None
+    return _action_cache
@@ -0,0 +1,167 @@
+import json
+import os
+import re
+import threading
+
+# Stat keywords and weights, editable without touching code (override via environment)
+ACTION_KEYWORDS_PATH = os.getenv(
+    "ACTION_KEYWORDS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "action_keywords.json")
+)
+
+# Tie-break order, matching the old keyword checks
+STAT_ORDER = ("Strength", "Agility", "Luck")
+DEFAULT_STAT = "Luck"
+
+# Words in an action are runs of a-z and apostrophes, so "don't" stays one word.
+# Splitting the UTF-8 bytes on everything else is several times faster than a
+# regex and gives the same words: non-ASCII bytes are never word characters.
+WORD_BYTES = b"abcdefghijklmnopqrstuvwxyz'"
+NON_WORD_TO_SPACE = bytes(byte if byte in WORD_BYTES else 32 for byte in range(256))
+
+def split_words(text):
+    """Lowercase words of a text as bytes, e.g. "Don't RUN!" -> [b"don't", b"run"]"""
+    return (text or "").lower().encode("utf-8").translate(NON_WORD_TO_SPACE).split()
+
+VOWELS = "aeiou"
+VOWEL_GROUP = re.compile(r"[aeiou]+")
+
+def doubles_final_consonant(word):
+    """Whether -ed and -ing double the last letter: one syllable ending consonant-vowel-consonant (run, slip, bet)"""
+    return (
+        len(word) >= 3 and word[-1] not in VOWELS + "wxy" and word[-2] in VOWELS and word[-3] not in VOWELS
+        and len(VOWEL_GROUP.findall(word)) == 1
+    )
+
+def inflections(word, irregular=()):
+    """A keyword, its regular verb forms, and the irregular forms listed for it
+
+    dodge -> dodges, dodged, dodging; try -> tries, tried, trying; slip ->
+    slips, slipped, slipping. Nothing else is guessed at, so "runes" and
+    "runner" don't match run, nor "better" bet: forms like fought, quickly
+    or faster come from the keyword file.
+    """
+    forms = {word, *irregular}
+    consonant_y = len(word) > 1 and word[-1] == "y" and word[-2] not in VOWELS
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        forms.add(word + "es")
+    elif consonant_y:
+        forms.add(word[:-1] + "ies")
+    else:
+        forms.add(word + "s")
+
+    if word.endswith("e"):
+        # flee -> fleeing, tiptoe -> tiptoeing, but dodge -> dodging
+        forms.update((word + "d", (word if word.endswith(("ee", "oe", "ye")) else word[:-1]) + "ing"))
+    elif consonant_y:
+        forms.update((word[:-1] + "ied", word + "ing"))
+    else:
+        stem = word + word[-1] if doubles_final_consonant(word) else word
+        forms.update((stem + "ed", stem + "ing"))
+    return forms
+
+class KeywordClassifier:
+    """Weighted stat keywords compiled once into a word-boundary lookup table
+
+    Every inflected form of every keyword is precomputed into dicts, so
+    classifying an action is one byte-level split plus a hash lookup per
+    word. A phrase inflects its first word ("sneaked past", "fought back").
+    Multi-word phrases are matched longest first and consume their words,
+    so "sneak past" isn't also counted as "sneak".
+    """
+
+    def __init__(self, keywords, forms=None):
+        forms = forms or {}
+        self._words = {}  # word -> (stat, weight)
+        self._phrases = {}  # first word -> [(following words, stat, weight)], longest first
+        for stat, weights in keywords.items():
+            for keyword, weight in weights.items():
+                words = split_words(keyword)
+                head = words[0].decode("utf-8")
+                for first in inflections(head, forms.get(head, ())):
+                    first = first.encode("utf-8")
+                    if len(words) == 1:
+                        self._words.setdefault(first, (stat, float(weight)))
+                    else:
+                        self._phrases.setdefault(first, []).append((tuple(words[1:]), stat, float(weight)))
+        for candidates in self._phrases.values():
+            candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+        self._vocabulary = frozenset(self._words) | frozenset(self._phrases)
+        self.stats = [stat for stat in STAT_ORDER if stat in keywords] + [
+            stat for stat in keywords if stat not in STAT_ORDER
+        ]
+
+    def scores(self, text):
+        """Summed keyword weight per stat"""
+        scores = dict.fromkeys(self.stats, 0.0)
+        words = split_words(text)
+        single = self._words
+        phrases = self._phrases
+        # Most words are not keywords: find the ones that are with one set operation
+        hits = self._vocabulary.intersection(words)
+        if not hits:
+            return scores
+        if phrases.keys().isdisjoint(hits):
+            for word in hits:
+                stat, weight = single[word]
+                scores[stat] += weight * words.count(word)
+            return scores
+
+        # A phrase may start here: walk the words in order so it consumes its own
+        skip_to = 0
+        for index, word in enumerate(words):
+            if index < skip_to:
+                continue  # Consumed by a phrase
+            if word in phrases:
+                start = index + 1
+                for rest, stat, weight in phrases[word]:
+                    end = start + len(rest)
+                    if tuple(words[start:end]) == rest:
+                        scores[stat] += weight
+                        skip_to = end
+                        break
+                else:
+                    if word in single:
+                        stat, weight = single[word]
+                        scores[stat] += weight
+            elif word in single:
+                stat, weight = single[word]
+                scores[stat] += weight
+        return scores
+
+    def classify(self, text):
+        """Return {"primary_stat", "confidence", "scores"} for an action
+
+        confidence is the primary stat's share of the total weight, 0.0 when
+        no keyword matched and the default stat was used.
+        """
+        scores = self.scores(text)
+        total = sum(scores.values())
+        if not total:
+            return {"primary_stat": DEFAULT_STAT, "confidence": 0.0, "scores": scores}
+        # scores is in STAT_ORDER and max() keeps the first of equal scores, so ties go by STAT_ORDER
+        primary = max(scores, key=scores.get)
+        return {"primary_stat": primary, "confidence": scores[primary] / total, "scores": scores}
+
+def load_keywords(path=ACTION_KEYWORDS_PATH):
+    """Read ({stat: {keyword: weight}}, {keyword: [irregular forms]}) from the keyword data file"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    forms = data.pop("forms", {})
+    return data, forms
+
+# Shared classifier, compiled on first use
+_classifier = None
+_classifier_lock = threading.Lock()
+
+def get_classifier():
+    """Return the process-wide keyword classifier"""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = KeywordClassifier(*load_keywords())
+    return _classifier
+
+def classify_action(text):
+    """Classify an action or choice with the shared classifier"""
+    return get_classifier().classify(text)
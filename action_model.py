@@ -0,0 +1,251 @@
+"""Local TF-IDF + logistic regression model for action analysis.
+
+Predicts PRIMARY_STAT and DIFFICULTY for a typed action so that
+analyze_player_action can skip the LLM for obvious actions. It is trained
+from the analyses the LLM already produced, which analyze_player_action
+appends to ANALYSIS_LOG_PATH.
+
+Usage:
+    python action_model.py train [log_path] [model_path]
+"""
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+from action_cache import normalize_action
+from stat_buckets import bucket_stat
+
+ANALYSIS_LOG_PATH = os.getenv("ANALYSIS_LOG_PATH", "analysis_log.jsonl")
+ACTION_MODEL_PATH = os.getenv("ACTION_MODEL_PATH", "action_model.npz")
+# Minimum probability for the model to answer without the LLM
+ACTION_MODEL_THRESHOLD = float(os.getenv("ACTION_MODEL_THRESHOLD", "0.85"))
+ACTION_MODEL_DIFFICULTY_THRESHOLD = float(os.getenv("ACTION_MODEL_DIFFICULTY_THRESHOLD", "0.6"))
+
+STATS = ("Strength", "Luck", "Agility")
+DIFFICULTIES = ("Easy", "Medium", "Hard", "Very Hard")
+
+def features(action, player_stats):
+    """Word unigrams and bigrams of the normalized action, plus stat-bucket tokens"""
+    words = normalize_action(action).split()
+    tokens = words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+    tokens += [f"__{stat.lower()}={bucket_stat(player_stats.get(stat, 5))}" for stat in STATS]
+    return tokens
+
+def _softmax(logits):
+    import numpy as np
+
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+class ActionModel:
+    """Two softmax regression heads (stat, difficulty) over shared TF-IDF features"""
+
+    def __init__(self, vocab, idf, stat_weights, stat_bias, difficulty_weights, difficulty_bias):
+        self.vocab = vocab  # token -> column
+        self.idf = idf
+        self.stat_weights = stat_weights
+        self.stat_bias = stat_bias
+        self.difficulty_weights = difficulty_weights
+        self.difficulty_bias = difficulty_bias
+
+    def _vectorize(self, tokens):
+        """Sparse L2-normalized TF-IDF row as (column indices, values)"""
+        import numpy as np
+
+        counts = {}
+        for token in tokens:
+            column = self.vocab.get(token)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        columns = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=float, count=len(counts)) * self.idf[columns]
+        return columns, values / np.linalg.norm(values)
+
+    def predict(self, action, player_stats):
+        """Return {"primary_stat", "stat_confidence", "difficulty", "difficulty_confidence", "stat_probs"}"""
+        columns, values = self._vectorize(features(action, player_stats))
+        stat_probs = _softmax(values @ self.stat_weights[columns] + self.stat_bias)
+        difficulty_probs = _softmax(values @ self.difficulty_weights[columns] + self.difficulty_bias)
+        stat = int(stat_probs.argmax())
+        difficulty = int(difficulty_probs.argmax())
+        return {
+            "primary_stat": STATS[stat],
+            "stat_confidence": float(stat_probs[stat]),
+            "difficulty": DIFFICULTIES[difficulty],
+            "difficulty_confidence": float(difficulty_probs[difficulty]),
+            "stat_probs": dict(zip(STATS, (float(p) for p in stat_probs)))
+        }
+
+    @classmethod
+    def fit(cls, examples, epochs=40, learning_rate=2.0, l2=1e-4, min_df=1, max_features=20000, seed=0):
+        """Train on (action, player_stats, primary_stat, difficulty) tuples"""
+        import numpy as np
+
+        documents = [features(action, stats) for action, stats, _, _ in examples]
+        document_frequency = {}
+        for tokens in documents:
+            for token in set(tokens):
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+        kept = sorted(
+            (token for token, df in document_frequency.items() if df >= min_df),
+            key=lambda token: -document_frequency[token]
+        )[:max_features]
+        vocab = {token: column for column, token in enumerate(kept)}
+        total = len(documents)
+        idf = np.array([math.log((1 + total) / (1 + document_frequency[token])) + 1 for token in kept])
+
+        model = cls(
+            vocab, idf,
+            np.zeros((len(vocab), len(STATS))), np.zeros(len(STATS)),
+            np.zeros((len(vocab), len(DIFFICULTIES))), np.zeros(len(DIFFICULTIES))
+        )
+        # Dense design matrix; logged analyses number in the thousands, not millions
+        matrix = np.zeros((total, len(vocab)))
+        for row, tokens in enumerate(documents):
+            columns, values = model._vectorize(tokens)
+            matrix[row, columns] = values
+        stat_labels = np.array([STATS.index(stat) for _, _, stat, _ in examples])
+        difficulty_labels = np.array([DIFFICULTIES.index(difficulty) for _, _, _, difficulty in examples])
+
+        rng = np.random.default_rng(seed)
+        batch_size = 256
+        for _ in range(epochs):
+            order = rng.permutation(total)
+            for start in range(0, total, batch_size):
+                batch = order[start:start + batch_size]
+                x = matrix[batch]
+                for weights, bias, labels in (
+                    (model.stat_weights, model.stat_bias, stat_labels),
+                    (model.difficulty_weights, model.difficulty_bias, difficulty_labels)
+                ):
+                    probs = _softmax(x @ weights + bias)
+                    probs[np.arange(len(batch)), labels[batch]] -= 1
+                    weights -= learning_rate * (x.T @ probs / len(batch) + l2 * weights)
+                    bias -= learning_rate * probs.mean(axis=0)
+        return model
+
+    def save(self, path=ACTION_MODEL_PATH):
+        import numpy as np
+
+        tokens = sorted(self.vocab, key=self.vocab.get)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                vocab=np.array(tokens, dtype=str),
+                idf=self.idf,
+                stat_weights=self.stat_weights,
+                stat_bias=self.stat_bias,
+                difficulty_weights=self.difficulty_weights,
+                difficulty_bias=self.difficulty_bias
+            )
+
+    @classmethod
+    def load(cls, path=ACTION_MODEL_PATH):
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as data:
+            vocab = {str(token): column for column, token in enumerate(data["vocab"])}
+            return cls(
+                vocab, data["idf"],
+                data["stat_weights"], data["stat_bias"],
+                data["difficulty_weights"], data["difficulty_bias"]
+            )
+
+def log_analysis(action, player_stats, analysis, latency):
+    """Append one LLM analysis to the training log"""
+    entry = {
+        "action": action,
+        "stats": {stat: player_stats.get(stat, 5) for stat in STATS},
+        "primary_stat": analysis["primary_stat"],
+        "difficulty": analysis["difficulty"],
+        "latency_ms": round(latency * 1000, 1),
+        "ts": time.time()
+    }
+    try:
+        with open(ANALYSIS_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        print(f"Error logging action analysis: {e}")
+
+def load_examples(log_path=ANALYSIS_LOG_PATH):
+    """Read the analysis log as (action, stats, primary_stat, difficulty, latency_ms) tuples"""
+    examples = []
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Torn last line from a crash
+            if entry.get("primary_stat") in STATS and entry.get("difficulty") in DIFFICULTIES:
+                examples.append((
+                    entry["action"], entry.get("stats", {}), entry["primary_stat"],
+                    entry["difficulty"], entry.get("latency_ms", 0.0)
+                ))
+    return examples
+
+def train_from_log(log_path=ANALYSIS_LOG_PATH, model_path=ACTION_MODEL_PATH):
+    """Train on the analysis log and save the model; returns it"""
+    examples = [example[:4] for example in load_examples(log_path)]
+    if not examples:
+        raise ValueError(f"No usable analyses in {log_path}")
+    model = ActionModel.fit(examples)
+    model.save(model_path)
+    print(f"Trained action model on {len(examples)} analyses, {len(model.vocab)} features -> {model_path}")
+    return model
+
+# Shared model, loaded in the background on first use
+_model = None
+_model_state = "unloaded"  # unloaded, loading, ready or unavailable
+_model_lock = threading.Lock()
+
+def _load_model():
+    global _model, _model_state
+    try:
+        model = ActionModel.load(ACTION_MODEL_PATH)
+    except ImportError:
+        print("NumPy not installed - local action model disabled")
+        model = None
+    except (OSError, KeyError, ValueError) as e:
+        if os.path.exists(ACTION_MODEL_PATH):
+            print(f"Action model unavailable: {e}")
+        model = None
+    with _model_lock:
+        _model = model
+        _model_state = "ready" if model is not None else "unavailable"
+
+def get_action_model():
+    """Return the local action model, or None while it loads or if there isn't one
+
+    The first call starts loading it on a background thread, so a turn never
+    waits on NumPy or the model file.
+    """
+    global _model_state
+    if _model_state == "unloaded":
+        with _model_lock:
+            if _model_state == "unloaded":
+                _model_state = "loading"
+                threading.Thread(target=_load_model, name="action-model", daemon=True).start()
+    return _model
+
+def predict_confident(action, player_stats):
+    """Model prediction if it clears both confidence thresholds, otherwise None"""
+    model = get_action_model()
+    if model is None:
+        return None
+    prediction = model.predict(action, player_stats)
+    if (prediction["stat_confidence"] >= ACTION_MODEL_THRESHOLD
+            and prediction["difficulty_confidence"] >= ACTION_MODEL_DIFFICULTY_THRESHOLD):
+        return prediction
+    return None
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "train":
+        train_from_log(*sys.argv[2:4])
+    else:
+        print(__doc__)
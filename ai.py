@@ -1,5 +1,9 @@
 import os
-from supabase import create_client, Client
+import threading
+from llm_client import LOCAL_FALLBACK_ERRORS, create_chat_completion
+from procedural_encounters import generate_procedural_encounter
+from prompts import ENCOUNTER_PROMPT, ENCOUNTER_BATCH_PROMPT, ENCOUNTER_SYSTEM
+from response_parser import ENCOUNTER_SCHEMA, parse_records, parse_response
 
 # Supabase configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -13,6 +17,8 @@ def init_supabase():
         return None
 
     try:
+        from supabase import create_client, Client
+
         print("🔍 Supabase secrets found! Attempting connection...")
         supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
         print("✅ Successfully connected to Supabase!")
@@ -22,8 +28,37 @@ def init_supabase():
         print("Please check your SUPABASE_URL and SUPABASE_ANON_KEY values.")
         return None
 
-# Initialize Supabase client
-supabase_client = init_supabase()
+# Clients and keys are set up on first use, so importing this module is cheap and silent
+_UNSET = object()
+_supabase_client = _UNSET
+_openai_key = _UNSET
+_init_lock = threading.Lock()
+
+def get_supabase_client():
+    """Return the Supabase client (None when unavailable), connecting on first use"""
+    global _supabase_client
+    if _supabase_client is _UNSET:
+        with _init_lock:
+            if _supabase_client is _UNSET:
+                _supabase_client = init_supabase()
+    return _supabase_client
+
+def get_openai_key():
+    """Return the OpenAI API key (None when unset), checking and reporting it on first use"""
+    global _openai_key
+    if _openai_key is _UNSET:
+        with _init_lock:
+            if _openai_key is _UNSET:
+                _openai_key = init_openai()
+    return _openai_key
+
+def __getattr__(name):
+    # Lazy module attributes for callers that read brain.openai_key / brain.supabase_client
+    if name == "openai_key":
+        return get_openai_key()
+    if name == "supabase_client":
+        return get_supabase_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def normalize_context(context):
     """Normalize context data structure"""
@@ -41,6 +76,7 @@ def normalize_context(context):
 
 def load_player_data(player_id):
     """Load player data from Supabase"""
+    supabase_client = get_supabase_client()
     if not supabase_client:
         print("⚠️ Supabase client not available")
         return None
@@ -117,10 +153,7 @@ def init_openai():
         print(f"❌ Failed to initialize OpenAI: {e}")
         return None
 
-# Initialize OpenAI
-openai_key = init_openai()
-
-def get_ai_story(prompt, api_key):
+def get_ai_story(prompt, api_key, max_tokens=300, call_site="encounter"):
     """Generate AI story using OpenAI API"""
     print(f"🔧 Attempting to use OpenAI API...")
     print(f"🔧 API key preview: {api_key[:15]}..." if api_key else "No API key")
@@ -137,24 +170,25 @@ def get_ai_story(prompt, api_key):
         return None
     
     try:
-        print("🔧 Creating OpenAI client...")
-        client = openai.OpenAI(api_key=api_key)
-        print("✅ OpenAI client created successfully")
-        
         print("🔧 Making API call to gpt-4o-mini...")
-        response = client.chat.completions.create(
+        response = create_chat_completion(
+            call_site=call_site,
+            api_key=api_key,
             model="gpt-4o-mini",
             messages=[
-                {"role": "system", "content": "You are a helpful fantasy story generator."},
+                {"role": "system", "content": ENCOUNTER_SYSTEM},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=300,
+            max_tokens=max_tokens,
             temperature=0.8,
         )
         print("✅ OpenAI API call successful!")
         result = response.choices[0].message.content.strip()
         print(f"✅ Received response: {len(result)} characters")
         return result
+    except LOCAL_FALLBACK_ERRORS as e:
+        print(f"⏱️ Skipping AI encounter: {e}")
+        return None
     except openai.AuthenticationError as e:
         print(f"❌ Authentication Error: {e}")
         print("Check if your OPENAI_API_KEY is correct and has sufficient credits")
@@ -175,9 +209,10 @@ def get_ai_story(prompt, api_key):
 
 def generate_dynamic_encounter(player_stats, inventory, current_location="forest"):
     """Generate a dynamic encounter based on player context"""
+    openai_key = get_openai_key()
     if not openai_key:
         # Fallback to random encounters if no AI
-        return generate_random_encounter(player_stats, inventory)
+        return generate_random_encounter(player_stats, inventory, current_location)
     
     player_context = {
         "player_name": "[Player]",
@@ -187,123 +222,51 @@ def generate_dynamic_encounter(player_stats, inventory, current_location="forest
         "recent_choices": []
     }
     
-    prompt = f"""
-Generate a fantasy encounter for a player with these stats:
-- Strength: {player_stats['Strength']}
-- Luck: {player_stats['Luck']} 
-- Agility: {player_stats['Agility']}
-- Inventory: {inventory}
-- Location: {current_location}
-
-Create:
-1. A brief 2-3 sentence encounter description
-2. Exactly 3 choices with different outcomes based on player stats
-3. Make choices favor different stats (strength, luck, agility)
-
-Format as:
-SCENE: [description]
-CHOICE1: [choice] (Strength-based)
-CHOICE2: [choice] (Luck-based) 
-CHOICE3: [choice] (Agility-based)
-
-and also, make it lore accurate from my book, after the players gets after it, go wild, and i mean it- • Prologue: A nurse, aware of an ancient prophecy, secretly swaps a newborn royal prince with a peasant boy born under mysterious circumstances, sending the true heir to the mines and setting the stage for unforeseen events.
-• Chapter 1: Zachor, the switched noble child, grows up in the brutal Mine of Slokia, enduring horrific abuse, witnessing his family's destruction, and developing a hardened resolve against a world that punishes weakness.
-• Chapter 2: During a devastating dragon attack on the mines, Zachor is flung into a mysterious, untouched jungle where he begins to navigate its strange, often peaceful, ecosystem while coming to terms with his isolated survival.
-• Chapter 3 (Verdant Hollow): Forced deeper into the jungle by its shifting paths, Zachor encounters wild animals, embracing a "psychotic", brutal fighting style born from his past trauma to survive its dangers and arriving at a mysterious scroll.
-• Chapter 4: The jungle relentlessly draws Zachor toward its heart, where he battles a tribe of cannibals, realizing he possesses a potent, wild side that allows him to conquer them, yet still struggles with his untamed magic.
-• Chapter 5 (Hollow Flames): Zachor is transported to a bizarre dimension where his "psychotic side" reveals himself as Hollow Flame, the Prophecy Energy trapped within him, and begins a brutal training regimen of endless running and death-revival cycles.
-• Chapter 6 (True Training): Under Hollow Flame's relentless instruction, Zachor endures countless deaths and revivals while fighting hordes of monsters, learning to strategize and exploit weaknesses, leading to him unleashing a devastating magical attack.
-• Chapter 7 (The Creature): Zachor faces a new threat of merging monsters and a powerful abomination that adapts to his fighting style, forcing him to strategically self-destruct repeatedly to defeat it, which finally transforms Hollow Flame's dimension into a lush, peaceful landscape.
-• Chapter 8 (Grass and Godhood): Hollow Flame reveals Zachor has accumulated 630 million monsters to fight, which manifest as a single colossal entity that vaporizes Zachor repeatedly until he learns to endure its poisonous breath and ultimately defeats it through a final strategic self-detonation.
-• Chapter 9 (The Center Stirs): Returning to the real jungle, Zachor is now exceptionally powerful and encounters Adrian and Lily, two adventurers, protecting them from adapted creatures while learning the jungle itself reacts to his presence.
-• Chapter 10 (Sister of Flame): Zachor, Adrian, and Lily arrive at the jungle's center, where Zachor is transported to a mindscape by Eleneth, Hollow Flame's powerful sister, who reveals his identity as the true noble heir and tries to recruit him, an offer he politely refuses.
-• Chapter 11 (The Offer): Adrian and Lily reveal their noble status, welcome Zachor into their family, and offer to sponsor his enrollment in the prestigious Noble Academy of Kings, a chance for him to realize his dream and change his fate.
-
-also give names for the stages/choices, as it gets saved in supabase and it really helps in saving the players data
-
-make rolls in fight/combat, e.g if you fight a goblin then give options like, pucnh is fro strenght, kick is for agility, and dodge is for luck, and then give the rolls, e.g if you punch a goblin, then the roll is 1d20 + strength, and if you kick a goblin, then the roll is 1d20 + agility, and if the player dodges, then the roll is 1d20 + luck
-
-make it so that the players stats are helpful (e.g if they have a lot of luck, they can find treasure with a lot of character_points)
-
-Make sure to include the following:
-- SCENE: [description]
-- CHOICE1: [choice] (Strength-based)
-- CHOICE2: [choice] (Luck-based)
-- CHOICE3: [choice] (Agility-based)
-
-also make a \n with in between choices and the scene, so that it is easy to read
-
-and never say "You encounter something mysterious in the forest..." its annoying, make it so that it is unique and interesting, e.g "You stumble upon a hidden cave, the air inside is thick with dust and the smell of ancient magic, the walls are lined with glowing runes that seem to pulse with an otherworldly energy, the cave is filled with the sounds of distant whispers and the occasional rustle of unseen creatures, you can feel the weight of history pressing down on you as you take your first steps into the cave, the air grows colder and the runes seem to glow brighter, you can't shake the feeling that you are not alone in this place" like creative, also as said before use the \n to make it easy to read
-
-Also make there be be lore and history in the encounters, e.g "You stumble upon a hidden cave, the air inside is thick with dust and the smell of ancient magic, the walls are lined with glowing runes that seem to pulse with an otherworldly energy" also there should be battles every few times, like goblins, orcs, undead knights or the hordes
-
-If the player has a high luck stat, and he chooses to explore, make there be a chance for him getting a secret quest, like a chest or a map he needs to find, and if he has a high agility stat, make there be a chance for him to escape from a battle, and if he has a high strength stat, make there be a chance for him to win a battle, and if he has low strenght stats, make there be a chance for him to lose a battle, and if he has low agility stats, make there be a chance for him to get caught in a battle, and if he has low luck stats, make there be a chance for him to miss out on a secret quest, like a chest or a map he needs to find. 
-
-also make it so that the encounters are unique, and not repetitive, e.g if the player has already fought a goblin, then make it so that the next encounter is not a goblin, but something else, like an orc or an undead knight or the hordes.
-
-and last but not least, DONT MAKE ANYTHING REPETETIVE, MAKE IT SO THAT THE PLAYER CAN HAVE A UNIQUE EXPERIENCE EVERY TIME THEY PLAY THE GAME AND NO TUTORIALS OR PLAYTHROUGHS CAN HELP THEM, MAKE IT SO THAT THEY HAVE TO PLAY THE GAME TO GET THE FULL EXPERIENCE
-"""
+    prompt = ENCOUNTER_PROMPT.render(
+        strength=player_stats['Strength'],
+        luck=player_stats['Luck'],
+        agility=player_stats['Agility'],
+        inventory=inventory,
+        location=current_location
+    )
     
     ai_response = get_ai_story(prompt, openai_key)
     if ai_response:
         return parse_ai_encounter(ai_response)
     else:
-        return generate_random_encounter(player_stats, inventory)
+        return generate_random_encounter(player_stats, inventory, current_location)
+
+def generate_dynamic_encounters(player_stats, inventory, current_location="forest", count=4):
+    """Generate several encounters in one completion; returns a list of encounters"""
+    openai_key = get_openai_key()
+    if not openai_key:
+        return [generate_random_encounter(player_stats, inventory, current_location)]
+
+    prompt = ENCOUNTER_BATCH_PROMPT.render(
+        strength=player_stats['Strength'],
+        luck=player_stats['Luck'],
+        agility=player_stats['Agility'],
+        inventory=inventory,
+        location=current_location,
+        count=count
+    )
+
+    ai_response = get_ai_story(prompt, openai_key, max_tokens=300 * count, call_site="encounter_batch")
+    encounters = parse_ai_encounters(ai_response) if ai_response else []
+    return encounters or [generate_random_encounter(player_stats, inventory, current_location)]
+
+def parse_ai_encounters(ai_text):
+    """Parse a batched AI response into complete encounters, skipping malformed ones"""
+    # A batch is cheap to top up, so only keep encounters the model finished
+    return [result.value for result in parse_records(ENCOUNTER_SCHEMA, ai_text) if result.status != "fallback"]
 
 def parse_ai_encounter(ai_text):
     """Parse AI response into usable encounter data"""
-    lines = ai_text.split('\n')
-    scene = ""
-    choices = []
-    
-    for line in lines:
-        if line.startswith("SCENE:"):
-            scene = line.replace("SCENE:", "").strip()
-        elif line.startswith("CHOICE"):
-            choice_text = line.split(":", 1)[1].strip() if ":" in line else line
-            choices.append(choice_text)
-    
-    return {
-        "scene": scene if scene else "You encounter something mysterious in the forest...",
-        "choices": choices if len(choices) >= 2 else [
-            "Fight with strength",
-            "Try your luck", 
-            "Use agility to escape"
-        ]
-    }
+    return parse_response(ENCOUNTER_SCHEMA, ai_text).value
 
-def generate_random_encounter(player_stats, inventory):
+def generate_random_encounter(player_stats, inventory, current_location="forest"):
     """Fallback random encounter generator"""
-    import random
-    
-    encounters = [
-        {
-            "scene": "A goblin jumps out from behind a tree, wielding a rusty dagger!",
-            "choices": [
-                "Attack with your weapon",
-                "Try to negotiate", 
-                "Dodge and counter-attack"
-            ]
-        },
-        {
-            "scene": "You find a mysterious glowing chest half-buried in the ground.",
-            "choices": [
-                "Force it open with strength",
-                "Trust your luck and open it",
-                "Carefully examine it first"
-            ]
-        },
-        {
-            "scene": "A wounded traveler sits by the path, asking for help.",
-            "choices": [
-                "Help them directly",
-                "Offer them an item from your inventory",
-                "Approach cautiously"
-            ]
-        }
-    ]
-    
-    return random.choice(encounters)
+    return generate_procedural_encounter(player_stats, inventory, current_location)
 
 def execute_choice_outcome(choice_index, player_stats, inventory):
     """Execute the outcome of a player's choice"""
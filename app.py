@@ -2,80 +2,213 @@ import streamlit as st
 import random
 import os
 import json
-from game_engine import generate_ai_story, process_choice
-from supabase import create_client, Client
+import time
+from functools import partial
+from game_engine import avoid_repeated_scene, generate_ai_story_stream
+from turn_pipeline import stream_turn
+from prefetch import TurnPrefetcher
+from history import HistoryCompactor
+from scene_index import SceneIndex
+from resources import get_resources
+from save_queue import get_save_queue
+from event_log import LocalStoryLog, StoryEvents, SupabaseStoryLog, load_story_tail
+from save_store import STREAMLIT_GAME, get_save_store, import_json_save, player_key
 
 # Supabase configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
 
-def init_supabase():
-    """Initialize Supabase client"""
+# This app's saves in the local save database
+LOCAL_SAVE_GAME = STREAMLIT_GAME
+# New scenes between uploads of a player's scene index to Supabase (override via environment)
+SCENE_INDEX_UPLOAD_EVERY = int(os.getenv("SCENE_INDEX_UPLOAD_EVERY", "10"))
+
+# Player name -> scenes added to their index when it was last uploaded; only the save worker uses it
+_uploaded_scene_index = {}
+
+def init_supabase(report=True):
+    """Initialize Supabase client; report=False skips the st messages, for threads outside the script"""
     if not SUPABASE_URL or not SUPABASE_KEY:
-        st.warning("⚠️ Supabase secrets not configured! Game data will be saved locally only.")
+        if report:
+            st.warning("⚠️ Supabase secrets not configured! Game data will be saved locally only.")
         return None
 
     try:
+        from supabase import create_client, Client
+
         supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
         return supabase
     except Exception as e:
-        st.error(f"❌ Failed to connect to Supabase: {e}")
+        if report:
+            st.error(f"❌ Failed to connect to Supabase: {e}")
+        else:
+            print(f"Failed to connect to Supabase: {e}")
         return None
 
-# Initialize Supabase client
-supabase_client = init_supabase()
+def _supabase_session(client):
+    """The HTTP session behind the client's table queries, when the SDK exposes one"""
+    return getattr(getattr(client, "postgrest", None), "session", None)
+
+def supabase_is_open(client):
+    """Health check for the cached client: its HTTP session has not been closed"""
+    session = _supabase_session(client)
+    return session is None or not getattr(session, "is_closed", False)
+
+def close_supabase(client):
+    session = _supabase_session(client)
+    if session is not None and hasattr(session, "close"):
+        session.close()
+
+def get_supabase_client(report=True):
+    """Return the Supabase client (None when unavailable), connecting on first use
+
+    The client lives in the process-wide resource cache, so reruns and other
+    sessions reuse it instead of connecting again. Background threads pass
+    report=False, since st messages only work on the script thread.
+    """
+    return get_resources().get(
+        "supabase", partial(init_supabase, report), key=(SUPABASE_URL, SUPABASE_KEY),
+        check=supabase_is_open, close=close_supabase
+    )
+
+def supabase_row(save):
+    """Row of the streamlit_saves table for a save snapshot"""
+    return {
+        "player_name": save["player_name"],
+        "strength": save["player_stats"]["Strength"],
+        "luck": save["player_stats"]["Luck"],
+        "agility": save["player_stats"]["Agility"],
+        "player_class": save["player_class"],
+        "character_health": save["character_health"],
+        "character_points": save["character_points"],
+        "story_history": json.dumps(save["story_history"]) if save["story_history"] is not None else None,
+        "event_count": save["event_count"],
+        "history_events": save["history_events"],
+        "current_story": save["current_story"],
+        "current_choices": json.dumps(save["current_choices"]),
+        "story_summary": save["story_summary"],
+        "scene_index": json.dumps(save["scene_index"]) if save["scene_index"] else None
+    }
 
-def save_game_to_supabase(player_name, player_stats, player_class, character_health, character_points, story_history, current_story, current_choices):
-    """Save game data to Supabase"""
+def scene_index_due(save):
+    """Whether a Supabase save should carry the scene index
+
+    The index is most of the row, and every turn adds a scene to it, so it
+    goes up with a player's first save, with the Save button, and after
+    every SCENE_INDEX_UPLOAD_EVERY new scenes. In between the upsert leaves
+    the column as it was; a load then misses at most those last scenes.
+    """
+    if not save["scene_index"] or save.get("upload_scene_index"):
+        return True
+    uploaded = _uploaded_scene_index.get(save["player_name"])
+    return uploaded is None or save["scene_index"].get("added", 0) - uploaded >= SCENE_INDEX_UPLOAD_EVERY
+
+def write_save(save):
+    """Save queue worker: the save always goes to the local database, then to Supabase when available
+
+    The local save and log are always complete. Supabase is best-effort:
+    its story events and its row are written separately, and the row's
+    event_count only covers the events Supabase actually has. Events it
+    missed are appended with a later save. The client is looked up when
+    the write runs, so a save that waited in the queue uses the current
+    client, not one replaced since it was queued.
+    """
+    supabase_client = get_supabase_client(report=False)
+    try:
+        write_save_local(save)
+    except Exception as e:
+        if not supabase_client:
+            raise
+        print(f"Error writing local save: {e}")
     if not supabase_client:
-        st.error("❌ Supabase client not available. Saving locally instead...")
-        save_game_local(player_name, player_stats, player_class, character_health, character_points, story_history, current_story, current_choices)
         return
 
+    row = supabase_row(save)
+    if not scene_index_due(save):
+        # Upserts only update the columns the row has
+        del row["scene_index"]
+    story_events = save["story_events"]
+    if story_events:
+        try:
+            row["event_count"] = story_events.write(
+                SupabaseStoryLog(supabase_client, save["player_name"]), end=save["event_count"]
+            )
+        except Exception as e:
+            # Still save the row; the events are in the local log and the next save retries them
+            print(f"Error appending story events to Supabase: {e}")
+            row["event_count"] = story_events.written(SupabaseStoryLog.kind)
     try:
-        # Convert complex data to JSON strings
-        story_history_json = json.dumps(story_history)
-        current_choices_json = json.dumps(current_choices)
-
-        data = {
-            "player_name": player_name,
-            "strength": player_stats["Strength"],
-            "luck": player_stats["Luck"],
-            "agility": player_stats["Agility"],
-            "player_class": player_class,
-            "character_health": character_health,
-            "character_points": character_points,
-            "story_history": story_history_json,
-            "current_story": current_story,
-            "current_choices": current_choices_json
-        }
-
-        # First try to check if player exists
-        existing = supabase_client.table('streamlit_saves').select('player_name').eq('player_name', player_name).execute()
+        supabase_client.table('streamlit_saves').upsert(row, on_conflict='player_name').execute()
+    except Exception:
+        # Reconnect on the next save in case the client itself went bad
+        get_resources().invalidate("supabase")
+        raise
+    if row.get("scene_index"):
+        _uploaded_scene_index[save["player_name"]] = save["scene_index"].get("added", 0)
+
+def save_game_to_supabase(player_name, player_stats, player_class, character_health, character_points, story_history, current_story, current_choices, story_summary="", scene_index=None, story_events=None, wait=False):
+    """Save game data to Supabase
+
+    The write happens on the background save queue, so this returns at once;
+    saves made before the queue gets to them collapse into one upsert of the
+    latest state. With wait=True (the Save button) it waits for the write and
+    reports the result.
+
+    Story events go to an append-only log through story_events (the
+    StoryEvents the turns were recorded in); the save itself only stores
+    where the log ends and how many of its last events are in story_history.
+    """
+    # Connect here, on the script thread, so a missing or failing connection is shown to the player
+    supabase_client = get_supabase_client()
+    save = {
+        "player_name": player_name,
+        "player_stats": dict(player_stats),
+        "player_class": player_class,
+        "character_health": character_health,
+        "character_points": character_points,
+        "story_events": story_events,
+        "event_count": story_events.count if story_events else None,
+        "history_events": len(story_history),
+        # Without an event log the whole history goes in the save, as before
+        "story_history": None if story_events else list(story_history),
+        "current_story": current_story,
+        # Copy: the game keeps changing this while the save waits
+        "current_choices": list(current_choices),
+        "story_summary": story_summary,
+        "scene_index": scene_index,
+        "upload_scene_index": wait
+    }
+    queue = get_save_queue()
+    queue.submit(player_name, write_save, save)
+    if not wait:
+        return
 
-        if existing.data:
-            # Update existing record
-            result = supabase_client.table('streamlit_saves').update(data).eq('player_name', player_name).execute()
+    if not queue.flush(player_name):
+        st.warning("⏳ Still saving in the background...")
+        return
+    status = queue.status(player_name)
+    if status["state"] == "saved":
+        if supabase_client:
+            st.success("✅ Game saved to cloud successfully!")
         else:
-            # Insert new record
-            result = supabase_client.table('streamlit_saves').insert(data).execute()
-
-        st.success("✅ Game saved to cloud successfully!")
-
-    except Exception as e:
-        error_message = str(e)
-        st.error(f"Failed to save to Supabase: {e}")
-
-        if "does not exist" in error_message:
-            st.error("❌ The 'streamlit_saves' table doesn't exist in your Supabase database.")
-            st.info("📋 **Instructions to create the table in Supabase:**")
-            st.write("1. Go to your **Supabase Dashboard**")
-            st.write("2. Navigate to **SQL Editor** (in the left sidebar)")
-            st.write("3. Click **New Query**")
-            st.write("4. Copy and paste this SQL command:")
-
-            # Show the create table command
-            st.code("""
+            st.error("❌ Supabase client not available. Saved locally instead.")
+    else:
+        show_save_error(status["error"])
+
+def show_save_error(error_message):
+    """Explain a failed cloud save; the game was saved locally as a backup"""
+    st.error(f"Failed to save to Supabase: {error_message}")
+
+    if "does not exist" in error_message:
+        st.error("❌ The 'streamlit_saves' table doesn't exist in your Supabase database.")
+        st.info("📋 **Instructions to create the table in Supabase:**")
+        st.write("1. Go to your **Supabase Dashboard**")
+        st.write("2. Navigate to **SQL Editor** (in the left sidebar)")
+        st.write("3. Click **New Query**")
+        st.write("4. Copy and paste this SQL command:")
+
+        # Show the create table command
+        st.code("""
 -- First, drop the existing table if it has wrong structure
 DROP TABLE IF EXISTS public.streamlit_saves;
 
@@ -92,6 +225,10 @@ CREATE TABLE public.streamlit_saves (
     story_history TEXT,
     current_story TEXT,
     current_choices TEXT,
+    story_summary TEXT,
+    scene_index TEXT,
+    event_count INTEGER,
+    history_events INTEGER,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -104,17 +241,49 @@ GRANT ALL ON public.streamlit_saves TO authenticated;
 GRANT ALL ON public.streamlit_saves TO anon;
 GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO authenticated;
 GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO anon;
-            """, language="sql")
-
-            st.write("5. Click **Run** to execute the query")
-            st.write("6. Try saving your game again!")
-        else:
-            st.info("The 'streamlit_saves' table may not exist in your Supabase database. Creating local backup...")
 
-        save_game_local(player_name, player_stats, player_class, character_health, character_points, story_history, current_story, current_choices)
+-- Story events, appended a turn at a time
+CREATE TABLE IF NOT EXISTS public.story_events (
+    player_name TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (player_name, seq)
+);
+ALTER TABLE public.story_events DISABLE ROW LEVEL SECURITY;
+GRANT ALL ON public.story_events TO authenticated;
+GRANT ALL ON public.story_events TO anon;
+        """, language="sql")
+
+        st.write("If the table already exists, adding the newer columns and the story_events table above is enough:")
+        st.code(
+            "ALTER TABLE public.streamlit_saves ADD COLUMN IF NOT EXISTS story_summary TEXT;\n"
+            "ALTER TABLE public.streamlit_saves ADD COLUMN IF NOT EXISTS scene_index TEXT;\n"
+            "ALTER TABLE public.streamlit_saves ADD COLUMN IF NOT EXISTS event_count INTEGER;\n"
+            "ALTER TABLE public.streamlit_saves ADD COLUMN IF NOT EXISTS history_events INTEGER;",
+            language="sql"
+        )
+
+        st.write("5. Click **Run** to execute the query")
+        st.write("6. Try saving your game again!")
+    else:
+        st.info("The 'streamlit_saves' table may not exist in your Supabase database. Saved a local backup instead.")
+
+def save_status_caption(player_name):
+    """One-line save indicator for the sidebar, read without waiting on the save"""
+    status = get_save_queue().status(player_name)
+    if status is None:
+        return None
+    if status["state"] == "pending":
+        return "⏳ Saving..."
+    if status["state"] == "failed":
+        return "⚠️ Cloud save failed, saved locally"
+    return f"💾 Saved at {time.strftime('%H:%M:%S', time.localtime(status['saved_at']))}"
 
 def load_game_from_supabase(player_name):
     """Load game data from Supabase"""
+    # A save still waiting on the queue would otherwise be missing from what we load
+    get_save_queue().flush(player_name)
+    supabase_client = get_supabase_client()
     if not supabase_client:
         return load_game_local(player_name)
 
@@ -131,7 +300,14 @@ def load_game_from_supabase(player_name):
                 "Agility": data["agility"]
             }
 
-            story_history = json.loads(data["story_history"]) if data["story_history"] else []
+            if data.get("event_count") is not None:
+                # Only the events still in the prompt window are read back from the log
+                story_history = load_story_tail(
+                    SupabaseStoryLog(supabase_client, player_name), data.get("history_events") or 0, data["event_count"]
+                )
+            else:
+                # Saved before the event log: the whole history is in the row
+                story_history = json.loads(data["story_history"]) if data.get("story_history") else []
             current_choices = json.loads(data["current_choices"]) if data["current_choices"] else []
 
             return {
@@ -141,8 +317,11 @@ def load_game_from_supabase(player_name):
                 "character_health": data["character_health"],
                 "character_points": data["character_points"],
                 "story_history": story_history,
+                "event_count": data.get("event_count"),
                 "current_story": data["current_story"],
-                "current_choices": current_choices
+                "current_choices": current_choices,
+                "story_summary": data.get("story_summary") or "",
+                "scene_index": json.loads(data["scene_index"]) if data.get("scene_index") else None
             }
         else:
             st.info("No saved game found in cloud.")
@@ -150,9 +329,10 @@ def load_game_from_supabase(player_name):
 
     except Exception as e:
         st.error(f"Failed to load from Supabase: {e}")
+        get_resources().invalidate("supabase")
         return load_game_local(player_name)
 
-def save_game_local(player_name, player_stats, player_class, character_health, character_points, story_history, current_story, current_choices):
+def save_game_local(player_name, player_stats, player_class, character_health, character_points, story_history, current_story, current_choices, story_summary="", scene_index=None):
     """Save game data locally"""
     save_data = {
         "player_name": player_name,
@@ -162,26 +342,124 @@ def save_game_local(player_name, player_stats, player_class, character_health, c
         "character_points": character_points,
         "story_history": story_history,
         "current_story": current_story,
-        "current_choices": current_choices
+        "current_choices": current_choices,
+        "story_summary": story_summary,
+        "scene_index": scene_index
     }
 
-    filename = f"streamlit_save_{player_name.lower().replace(' ', '_')}.json"
-    with open(filename, "w") as save_file:
-        json.dump(save_data, save_file)
+    write_save_local(save_data)
     st.success("Game saved locally!")
 
+def write_save_local(save_data):
+    """Write a save snapshot to the local save database, and its new story events to the local log"""
+    save_data = dict(save_data)
+    story_events = save_data.pop("story_events", None)
+    save_data.pop("upload_scene_index", None)
+    if story_events is not None:
+        # The save points at the end of what the local log holds
+        save_data["event_count"] = story_events.write(LocalStoryLog(save_data["player_name"]), end=save_data["event_count"])
+
+    get_save_store().save(LOCAL_SAVE_GAME, save_data["player_name"], save_data)
+
 def load_game_local(player_name):
-    """Load game data from local file"""
-    filename = f"streamlit_save_{player_name.lower().replace(' ', '_')}.json"
-    try:
-        with open(filename, "r") as file:
-            save_data = json.load(file)
-        st.success("Game loaded from local file!")
-        return save_data
-    except FileNotFoundError:
+    """Load game data from the local save database"""
+    store = get_save_store()
+    save_data = store.load(LOCAL_SAVE_GAME, player_name)
+    if save_data is None:
+        # Saves from before the database were one JSON file per player
+        save_data = import_json_save(store, LOCAL_SAVE_GAME, f"streamlit_save_{player_key(player_name)}.json", player_name)
+    if save_data is None:
         st.info("No local saved game found.")
         return None
 
+    if save_data.get("event_count") is not None:
+        save_data["story_history"] = load_story_tail(
+            LocalStoryLog(player_name), save_data.get("history_events") or 0, save_data["event_count"]
+        )
+    st.success("Game loaded from local save!")
+    return save_data
+
+def restore_story_events(loaded_data):
+    """Event log of a loaded game; a save from before the log starts one with its history"""
+    if loaded_data.get("event_count") is not None:
+        return StoryEvents(loaded_data["event_count"])
+    story_events = StoryEvents()
+    story_events.record(loaded_data.get("story_history", []))
+    return story_events
+
+def complete_turn(player_name, action, choice_index=None):
+    """Resolve an action, advance the story, auto-save and rerun"""
+    prefetcher = st.session_state.prefetcher
+    if choice_index is None:
+        choice_index = prefetcher.find_choice(st.session_state.story_history, action)
+
+    with st.spinner("Processing your action..."):
+        # Use the speculative turn for a listed choice if one is ready
+        turn = None
+        if choice_index is not None:
+            turn = prefetcher.take(st.session_state.story_history, choice_index)
+        else:
+            prefetcher.cancel_all()
+
+        if turn is None:
+            # Outcome narration and the next scene stream in concurrently
+            turn_stream = stream_turn(
+                player_name,
+                action,
+                st.session_state.player_stats,
+                st.session_state.story_history,
+                story_summary=st.session_state.history_compactor.summary
+            )
+            outcome_box = st.empty()
+            story_box = st.empty()
+            outcome_text = ""
+            story_text = ""
+            for kind, text in turn_stream:
+                if kind == "outcome":
+                    outcome_text += text
+                    outcome_box.markdown(outcome_text)
+                else:
+                    story_text += text
+                    story_box.markdown(story_text)
+            turn = (turn_stream.outcome, turn_stream.story, turn_stream.choices)
+        result, new_story, new_choices = turn
+        new_story, new_choices = avoid_repeated_scene(
+            player_name, st.session_state.player_stats, new_story, new_choices, st.session_state.scene_index
+        )
+
+        # Add to history
+        events = [f"You chose: {action}", result]
+        st.session_state.story_history.extend(events)
+        st.session_state.story_events.record(events)
+
+        # Fold events that left the prompt window into the running summary
+        st.session_state.story_history = st.session_state.history_compactor.compact(st.session_state.story_history)
+
+        st.session_state.current_story = new_story
+        st.session_state.current_choices = new_choices
+
+        # Clear action state
+        st.session_state.pending_action = None
+        st.session_state.action_analysis = None
+
+        # Auto-save after each choice
+        save_game_to_supabase(
+            st.session_state.player_name,
+            st.session_state.player_stats,
+            st.session_state.player_class,
+            st.session_state.character_health,
+            st.session_state.character_points,
+            st.session_state.story_history,
+            st.session_state.current_story,
+            st.session_state.current_choices,
+            st.session_state.history_compactor.summary,
+            st.session_state.scene_index.to_dict(),
+            st.session_state.story_events
+        )
+
+    # Force rerun to update display
+    st.rerun()
+
 st.title("Zachor: AI Text Adventure")
 
 # Initialize session state
@@ -195,6 +473,22 @@ if 'game_state' not in st.session_state:
     st.session_state.character_health = 100
     st.session_state.character_points = 0
 
+# Speculative turns for the choices currently on screen
+if 'prefetcher' not in st.session_state:
+    st.session_state.prefetcher = TurnPrefetcher()
+
+# Running summary of events older than the prompt window
+if 'history_compactor' not in st.session_state:
+    st.session_state.history_compactor = HistoryCompactor()
+
+# Every event of the story, appended to the save's event log a turn at a time
+if 'story_events' not in st.session_state:
+    st.session_state.story_events = StoryEvents()
+
+# Scenes this player has been shown, to catch near-repeats
+if 'scene_index' not in st.session_state:
+    st.session_state.scene_index = SceneIndex()
+
 # Get player name
 if 'player_name' not in st.session_state:
     st.session_state.player_name = ""
@@ -235,6 +529,9 @@ elif st.session_state.game_state == 'load_game':
                 st.session_state.character_health = loaded_data["character_health"]
                 st.session_state.character_points = loaded_data["character_points"]
                 st.session_state.story_history = loaded_data.get("story_history", [])
+                st.session_state.history_compactor = HistoryCompactor(loaded_data.get("story_summary", ""))
+                st.session_state.story_events = restore_story_events(loaded_data)
+                st.session_state.scene_index = SceneIndex.from_dict(loaded_data.get("scene_index"))
                 st.session_state.current_story = loaded_data.get("current_story", "")
                 st.session_state.current_choices = loaded_data.get("current_choices", [])
                 st.session_state.game_state = 'playing'
@@ -384,6 +681,17 @@ elif st.session_state.game_state == 'playing':
         with col3:
             st.metric("AGL", st.session_state.player_stats["Agility"])
 
+        repetition = st.session_state.scene_index.stats()
+        if repetition["checked"]:
+            st.caption(
+                f"Repeated scenes replaced: {repetition['repeats']} of {repetition['checked']} "
+                f"({repetition['repetition_rate']:.0%}), {repetition['regenerated']} rewritten ahead of time"
+            )
+
+        save_caption = save_status_caption(st.session_state.player_name)
+        if save_caption:
+            st.caption(save_caption)
+
     # Collapsible stat bars section in main area
     with st.expander("📊 Character Stat Bars", expanded=False):
         # Health bar with heart icon and visual progress
@@ -460,7 +768,11 @@ elif st.session_state.game_state == 'playing':
                 st.session_state.character_points,
                 st.session_state.story_history,
                 st.session_state.current_story,
-                st.session_state.current_choices
+                st.session_state.current_choices,
+                st.session_state.history_compactor.summary,
+                st.session_state.scene_index.to_dict(),
+                st.session_state.story_events,
+                wait=True
             )
 
         load_name = st.text_input("Load Game (Enter Name):", key="load_name_input")
@@ -474,26 +786,57 @@ elif st.session_state.game_state == 'playing':
                 st.session_state.character_health = loaded_data["character_health"]
                 st.session_state.character_points = loaded_data["character_points"]
                 st.session_state.story_history = loaded_data.get("story_history", [])
+                st.session_state.history_compactor = HistoryCompactor(loaded_data.get("story_summary", ""))
+                st.session_state.story_events = restore_story_events(loaded_data)
+                st.session_state.scene_index = SceneIndex.from_dict(loaded_data.get("scene_index"))
                 st.session_state.current_story = loaded_data.get("current_story", "")
                 st.session_state.current_choices = loaded_data.get("current_choices", [])
                 st.session_state.game_state = 'playing'
                 st.rerun()
 
+        if st.button("♻️ Reconnect Services", help="Drop the cached Supabase and OpenAI clients and connect again"):
+            import llm_client
+
+            get_resources().invalidate()
+            llm_client.close_clients()
+            st.success("Services will reconnect on next use.")
+
     # Generate initial story if not already generated
     if not st.session_state.current_story:
+        story_stream = generate_ai_story_stream(
+            player_name, 
+            st.session_state.player_stats, 
+            st.session_state.story_history,
+            story_summary=st.session_state.history_compactor.summary
+        )
         with st.spinner("Generating your adventure..."):
-            story, choices = generate_ai_story(
-                player_name, 
-                st.session_state.player_stats, 
-                st.session_state.story_history
-            )
-            st.session_state.current_story = story
-            st.session_state.current_choices = choices
+            st.write_stream(story_stream)
+        st.session_state.current_story, st.session_state.current_choices = avoid_repeated_scene(
+            player_name, st.session_state.player_stats, story_stream.story, story_stream.choices,
+            st.session_state.scene_index
+        )
+        st.rerun()
 
     # Display current story
     st.write("**Current Story:**")
     st.write(st.session_state.current_story)
 
+    # Pre-generate each listed choice while the player reads
+    st.session_state.prefetcher.prefetch(
+        player_name,
+        st.session_state.player_stats,
+        st.session_state.story_history,
+        st.session_state.current_choices,
+        story_summary=st.session_state.history_compactor.summary,
+        scene_index=st.session_state.scene_index
+    )
+
+    if st.session_state.current_choices:
+        st.write("**Suggested Actions:**")
+        for index, choice in enumerate(st.session_state.current_choices):
+            if st.button(choice, key=f"suggested_choice_{index}"):
+                complete_turn(player_name, choice, choice_index=index)
+
     # Display story history if exists
     if st.session_state.story_history:
         st.write("**Previous Events:**")
@@ -544,40 +887,7 @@ elif st.session_state.game_state == 'playing':
         with col1:
             if st.button("✅ Confirm Action", type="primary"):
                 # Process the confirmed action
-                with st.spinner("Processing your action..."):
-                    result = process_choice(player_name, st.session_state.pending_action, st.session_state.player_stats)
-
-                    # Add to history
-                    st.session_state.story_history.append(f"You chose: {st.session_state.pending_action}")
-                    st.session_state.story_history.append(result)
-
-                    # Generate new story continuation with context
-                    new_story, new_choices = generate_ai_story(
-                        player_name,
-                        st.session_state.player_stats,
-                        st.session_state.story_history
-                    )
-                    st.session_state.current_story = new_story
-                    st.session_state.current_choices = new_choices
-
-                    # Clear action state
-                    st.session_state.pending_action = None
-                    st.session_state.action_analysis = None
-
-                    # Auto-save after each choice
-                    save_game_to_supabase(
-                        st.session_state.player_name,
-                        st.session_state.player_stats,
-                        st.session_state.player_class,
-                        st.session_state.character_health,
-                        st.session_state.character_points,
-                        st.session_state.story_history,
-                        st.session_state.current_story,
-                        st.session_state.current_choices
-                    )
-
-                    # Force rerun to update display
-                    st.rerun()
+                complete_turn(player_name, st.session_state.pending_action)
 
         with col2:
             if st.button("❌ Cancel"):
@@ -593,9 +903,14 @@ elif st.session_state.game_state == 'playing':
 
         with col2:
             if st.button("New Adventure"):
-                # Reset the game completely
+                # Reset the game completely, after the last auto-save is written
+                st.session_state.prefetcher.cancel_all()
+                get_save_queue().flush(player_name)
                 st.session_state.game_state = 'name_entry'
                 st.session_state.story_history = []
+                st.session_state.history_compactor = HistoryCompactor()
+                st.session_state.story_events = StoryEvents()
+                st.session_state.scene_index = SceneIndex()
                 st.session_state.current_story = ""
                 st.session_state.current_choices = []
                 st.session_state.player_stats = {}
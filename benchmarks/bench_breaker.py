@@ -0,0 +1,79 @@
+"""Benchmark turns through an API outage with and without the circuit breaker.
+
+Plays analysis turns back to back against the stub server while it goes
+healthy -> failing (every request times out) -> healthy. Without the
+breaker each turn during the outage waits out the client timeout and every
+retry before falling back; with it, turns fall back locally as soon as the
+breaker opens, and a probe closes it again once the stub recovers.
+
+Usage: python -m benchmarks.bench_breaker [phase_seconds] [timeout_seconds]
+    e.g. python -m benchmarks.bench_breaker 8 1
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+STATS = {"Strength": 6, "Luck": 4, "Agility": 5}
+ACTIONS = ["attack the goblin", "sneak past quietly", "search the wreckage", "try to negotiate"]
+
+def play_phase(game_engine, phase_seconds):
+    latencies = []
+    deadline = time.perf_counter() + phase_seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        game_engine.analyze_player_action(f"{ACTIONS[len(latencies) % len(ACTIONS)]} #{time.time()}", STATS)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def report(phase, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(f"  {phase:<10} {len(ordered):4d} turns   p50 {statistics.median(ordered) * 1000:8.1f} ms   "
+          f"p95 {p95 * 1000:8.1f} ms")
+
+def main():
+    phase_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 8.0
+    timeout = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    os.environ["OPENAI_API_KEY"] = "sk-stub"
+    # Every turn should reach the API: unique actions, a scratch cache and no local model
+    scratch = tempfile.mkdtemp()
+    os.environ["ACTION_CACHE_PATH"] = os.path.join(scratch, "action_cache.db")
+    os.environ["ACTION_MODEL_PATH"] = os.path.join(scratch, "action_model.npz")
+    os.environ["ANALYSIS_LOG_PATH"] = os.path.join(scratch, "analysis_log.jsonl")
+
+    from stub_server import StubConfig, start_stub_server
+
+    config = StubConfig(latency="lognormal:0.05:0.3", timeout_seconds=timeout * 2, seed=1)
+    server, base_url = start_stub_server(config)
+
+    import circuit_breaker
+    import game_engine
+    import llm_client
+    import scheduler
+
+    llm_client.configure(base_url=base_url, timeout=timeout)
+    llm_client.CALL_TIMEOUTS["analysis"] = timeout
+    scheduler.configure(max_attempts=2)
+    print(f"analysis turns, {phase_seconds:.0f} s per phase, {timeout:.1f} s client timeout, 2 attempts per call")
+
+    never = 10 ** 9
+    for label, settings in (
+        ("no breaker", {"min_calls": never, "consecutive_failures": never}),
+        ("breaker", {})
+    ):
+        breaker = circuit_breaker.CircuitBreaker(open_seconds=phase_seconds / 4, **settings)
+        circuit_breaker._breaker = breaker
+        print(label)
+        for phase, error_timeout in (("healthy", 0.0), ("outage", 1.0), ("recovered", 0.0)):
+            config.error_timeout = error_timeout
+            report(phase, play_phase(game_engine, phase_seconds))
+        print(f"  breaker: {breaker.stats()}")
+
+    llm_client.close_clients()
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Microbenchmark the compiled keyword classifier against the old substring scans.
+
+Generates a large corpus of player actions and times classifications per
+second for the old any(word in text ...) checks and the compiled matcher,
+which also computes per-stat weights and a confidence score, then lists
+the actions whose stat differs from the old checks. First it checks that
+inflected and irregular forms match their keyword and look-alike words
+don't.
+
+Usage: python -m benchmarks.bench_classifier [actions]
+"""
+import random
+import sys
+import time
+
+from action_classifier import classify_action, get_classifier
+
+VERBS = ["attack", "sneak past", "search", "try to open", "run from", "smash", "dodge", "gamble with",
+         "climb over", "punch", "look at", "talk to", "pray to", "charge", "slip past", "inspect"]
+TARGETS = ["the goblin", "the orc leader", "a rusted chest", "the undead knight", "the cannibal drums",
+           "the shifting path", "a glowing rune", "the wounded traveler", "the flesh mage"]
+ADVERBS = ["", "quickly", "carefully", "with all my strength", "and hope for the best", "while nobody watches"]
+# Example actions listed per kind of stat change
+SHOW_CHANGES = 3
+# Words that must (stat) or must not (None) match a keyword
+INFLECTION_CASES = {
+    "fought": "Strength", "kicked down": "Strength", "grabbed": "Strength", "smashes": "Strength",
+    "ran": "Agility", "running": "Agility", "slipped": "Agility", "dodging": "Agility", "fleeing": "Agility",
+    "tries": "Luck", "tried": "Luck", "found": "Luck", "took a chance": "Luck",
+    "runes": None, "runner": None, "better": None, "openly": None, "hitter": None
+}
+
+def legacy_classify(action):
+    """The old analyze_action_fallback keyword checks"""
+    action_lower = action.lower()
+    if any(word in action_lower for word in ["fight", "attack", "punch", "strike", "force", "break", "smash", "lift", "push"]):
+        return "Strength"
+    elif any(word in action_lower for word in ["dodge", "run", "quick", "fast", "escape", "sneak", "climb", "jump", "stealth"]):
+        return "Agility"
+    elif any(word in action_lower for word in ["luck", "chance", "gamble", "risk", "try", "search", "find", "discover"]):
+        return "Luck"
+    return "Luck"
+
+def check_inflections():
+    """Each case matches the expected stat, or no keyword at all"""
+    classifier = get_classifier()
+    for text, stat in INFLECTION_CASES.items():
+        matched = [name for name, score in classifier.scores(text).items() if score]
+        assert matched == ([stat] if stat else []), f"{text!r} matched {matched}, expected {stat}"
+    print(f"inflection check passed: {len(INFLECTION_CASES)} forms and look-alikes")
+
+def timed(label, corpus, classify):
+    start = time.perf_counter()
+    for action in corpus:
+        classify(action)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<20} {len(corpus) / elapsed:12.0f} classifications/s   {elapsed / len(corpus) * 1e6:6.2f} us each")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rng = random.Random(1)
+    corpus = [
+        " ".join(filter(None, [rng.choice(VERBS), rng.choice(TARGETS), rng.choice(ADVERBS)]))
+        for _ in range(count)
+    ]
+
+    start = time.perf_counter()
+    get_classifier()
+    print(f"{count} actions, classifier compiled in {(time.perf_counter() - start) * 1000:.1f} ms")
+    check_inflections()
+
+    timed("legacy substrings", corpus, legacy_classify)
+    timed("compiled matcher", corpus, classify_action)
+
+    disagreements = sum(1 for action in corpus if legacy_classify(action) != classify_action(action)["primary_stat"])
+    print(f"stat differs from the legacy checks on {disagreements / count:.1%} of actions")
+
+    # Every distinct action whose stat changed, grouped by old -> new stat
+    changes = {}
+    for action in sorted(set(corpus)):
+        old, new = legacy_classify(action), classify_action(action)["primary_stat"]
+        if old != new:
+            changes.setdefault((old, new), []).append(action)
+    print(f"\n{sum(len(actions) for actions in changes.values())} of {len(set(corpus))} distinct actions changed stat:")
+    for (old, new), actions in sorted(changes.items(), key=lambda item: -len(item[1])):
+        print(f"  {old} -> {new}: {len(actions)}")
+        for action in actions[:SHOW_CHANGES]:
+            print(f"      {action}")
+
+if __name__ == "__main__":
+    main()
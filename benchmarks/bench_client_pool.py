@@ -0,0 +1,66 @@
+"""Compare per-turn latency of fresh OpenAI clients vs the shared pooled client.
+
+Runs against a local OpenAI-compatible stub server, so no API key or network
+is needed. A "turn" is the three calls app.py makes on Confirm Action:
+action analysis, choice outcome and the next story segment.
+
+Usage: python -m benchmarks.bench_client_pool [turns] [latency_ms]
+"""
+import statistics
+import sys
+import time
+
+import llm_client
+from stub_server import StubConfig, start_stub_server
+
+TURN_CALLS = [
+    ("analysis", "gpt-4o-mini"),
+    ("outcome", "gpt-4o-mini"),
+    ("story", "gpt-4o"),
+]
+
+def run_turn(get_client):
+    """Make the three calls of one turn and return the wall-clock time"""
+    start = time.perf_counter()
+    for call_site, model in TURN_CALLS:
+        client = get_client()
+        client.with_options(timeout=llm_client.CALL_TIMEOUTS[call_site]).chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": "benchmark"}],
+            max_tokens=10
+        )
+    return time.perf_counter() - start
+
+def summarize(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<16} mean {statistics.mean(samples) * 1000:7.2f} ms   "
+          f"p50 {statistics.median(samples) * 1000:7.2f} ms   p95 {p95 * 1000:7.2f} ms")
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+
+    import openai
+
+    server, base_url = start_stub_server(StubConfig(latency=f"fixed:{latency}"))
+
+    def fresh_client():
+        return openai.OpenAI(api_key="sk-bench", base_url=base_url)
+
+    def shared_client():
+        return llm_client.get_openai_client("sk-bench", base_url)
+
+    # Warm up imports and the shared pool before measuring
+    run_turn(fresh_client)
+    run_turn(shared_client)
+
+    print(f"{turns} turns x {len(TURN_CALLS)} calls, stub latency {latency * 1000:.0f} ms")
+    summarize("fresh client", [run_turn(fresh_client) for _ in range(turns)])
+    summarize("shared client", [run_turn(shared_client) for _ in range(turns)])
+
+    llm_client.close_clients()
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark story saves as an append-only event log vs rewriting the whole history.
+
+Plays a long story into a temporary directory and times the save after each
+turn both ways: json.dump of the full save file (the old save_game_local),
+and a StoryEvents write of just the new events to a LocalStoryLog. Also times
+rebuilding the prompt window from the log's tail on load.
+
+Usage: python -m benchmarks.bench_event_log [turns]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import event_log
+from event_log import LocalStoryLog, StoryEvents, load_story_tail
+from history import HISTORY_TAIL_EVENTS
+
+EVENT = "You step into the cold cavern. Water drips from the ceiling and something moves in the dark ahead. " * 2
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    checkpoints = {10, 100, 1000, turns}
+
+    with tempfile.TemporaryDirectory() as directory:
+        history = []
+        full_path = os.path.join(directory, "full.json")
+        log = LocalStoryLog("bench", directory)
+        story_events = StoryEvents()
+
+        print(f"{'turn':>6}  {'full rewrite':>12}  {'bytes':>10}  {'append':>9}  {'bytes':>6}")
+        for turn in range(1, turns + 1):
+            events = [f"You chose: option {turn}", f"{EVENT} ({turn})"]
+            history.extend(events)
+
+            start = time.perf_counter()
+            with open(full_path, "w") as f:
+                json.dump({"player_name": "bench", "story_history": history}, f)
+            full = time.perf_counter() - start
+
+            before = os.path.getsize(log.path) if os.path.exists(log.path) else 0
+            start = time.perf_counter()
+            story_events.record(events)
+            story_events.write(log)
+            append = time.perf_counter() - start
+
+            if turn in checkpoints:
+                print(f"{turn:>6}  {full * 1000:9.3f} ms  {os.path.getsize(full_path):>10}  "
+                      f"{append * 1000:6.3f} ms  {os.path.getsize(log.path) - before:>6}")
+
+        # Let the background compaction finish so the load doesn't wait on it
+        event_log._compact_executor.submit(lambda: None).result()
+        print(f"\nlog compacted to {os.path.getsize(log.path)} bytes")
+        start = time.perf_counter()
+        tail = load_story_tail(log, HISTORY_TAIL_EVENTS, story_events.count)
+        elapsed = time.perf_counter() - start
+        assert tail == history[-HISTORY_TAIL_EVENTS:], "tail does not match the history"
+        print(f"last {HISTORY_TAIL_EVENTS} events rebuilt from the log in {elapsed * 1000:.2f} ms "
+              f"(full file parse: ", end="")
+        start = time.perf_counter()
+        with open(full_path) as f:
+            json.load(f)
+        print(f"{(time.perf_counter() - start) * 1000:.2f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Benchmark story prompt size as the history is folded into a rolling summary.
+
+Plays turns through history.HistoryCompactor with the local summarizer (no
+API key needed). After each checkpoint it renders the story messages and
+reports the prompt size, checking that the prompt carries both the summary
+and the recent events.
+
+Usage: python -m benchmarks.bench_history [turns]
+"""
+import os
+import sys
+
+# The extractive fallback summary keeps this deterministic and offline
+os.environ.pop("OPENAI_API_KEY", None)
+
+import history
+from game_engine import build_story_messages
+from history import HISTORY_TAIL_EVENTS, HistoryCompactor
+
+STATS = {"Strength": 6, "Luck": 5, "Agility": 7}
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    checkpoints = {1, 10, 50, turns}
+    compactor = HistoryCompactor()
+    story_history = []
+
+    print(f"{'turn':>5}  {'events kept':>11}  {'summary chars':>13}  {'prompt chars':>12}")
+    for turn in range(1, turns + 1):
+        story_history += [f"You chose: path {turn}.", f"Turn {turn}: the trail bends past a mossy stone."]
+        story_history = compactor.compact(story_history)
+        # Let the background fold finish so every checkpoint sees a settled summary
+        history._summary_executor.submit(lambda: None).result()
+        story_history = compactor.compact(story_history)
+
+        if turn in checkpoints:
+            messages = build_story_messages("Bench", STATS, story_history, story_summary=compactor.summary)
+            prompt = "\n".join(message["content"] for message in messages)
+            assert story_history[-1] in prompt, "recent events missing from the story prompt"
+            if compactor.summary:
+                assert compactor.summary in prompt, "rolling summary missing from the story prompt"
+            print(f"{turn:>5}  {len(story_history):>11}  {len(compactor.summary):>13}  {len(prompt):>12}")
+
+    assert len(story_history) <= HISTORY_TAIL_EVENTS + history.HISTORY_FOLD_BATCH, "history was not compacted"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark the shared response parser against the legacy line parsers.
+
+Builds a corpus of encounter, analysis and story replies in the formats
+models actually drift into (markdown labels, "1)" numbering, wrapped lines,
+preambles, JSON, fenced and truncated JSON, outright refusals) and reports
+parse throughput and how many replies each parser recovers without falling
+back to canned text, over the whole corpus and over well-formed replies
+alone.
+
+Usage: python -m benchmarks.bench_parser [replies_per_variant]
+"""
+import random
+import sys
+import time
+
+from response_parser import ANALYSIS_SCHEMA, ENCOUNTER_SCHEMA, STORY_SCHEMA, ResponseParser, parse_response
+
+SCENE = "The canopy closes overhead like a fist, and the air turns thick with rot and copper."
+CHOICES = ["Charge the goblin chief", "Search the wreckage", "Slip along the branches"]
+
+ENCOUNTER_VARIANTS = {
+    "strict": f"SCENE: {SCENE}\n\nCHOICE1: {CHOICES[0]} (Strength-based)\nCHOICE2: {CHOICES[1]} (Luck-based)\nCHOICE3: {CHOICES[2]} (Agility-based)",
+    "markdown": f"**SCENE:** {SCENE}\n\n**CHOICE1:** {CHOICES[0]}\n**CHOICE2:** {CHOICES[1]}\n**CHOICE3:** {CHOICES[2]}",
+    "wrapped": f"SCENE: {SCENE[:40]}\n{SCENE[40:]}\n\nCHOICE 1: {CHOICES[0]}\nCHOICE 2: {CHOICES[1]}\nCHOICE 3: {CHOICES[2]}",
+    "numbered": f"Scene: {SCENE}\n\n1) {CHOICES[0]}\n2) {CHOICES[1]}\n3) {CHOICES[2]}",
+    "json": '{"scene": "%s", "choices": ["%s", "%s", "%s"]}' % (SCENE, *CHOICES),
+    "fenced_json": '```json\n{"scene": "%s", "choices": ["%s", "%s", "%s"],}\n```' % (SCENE, *CHOICES),
+    "truncated_json": '{"scene": "%s", "choices": ["%s", "%s", "%s' % (SCENE, *CHOICES),
+    "refusal": "I'm sorry, I can't continue this story.",
+}
+
+ANALYSIS_VARIANTS = {
+    "strict": "PRIMARY_STAT: Agility\nDIFFICULTY: Hard\nPREDICTION: Your footing is sure but the branches are not.\nSECONDARY: Luck",
+    "markdown": "**Primary Stat:** Agility\n**Difficulty:** Hard\n**Prediction:** Your footing is sure.\n**Secondary:** None",
+    "decorated": "PRIMARY_STAT: Agility (speed)\nDIFFICULTY: very hard\nPREDICTION: Your footing is sure\nbut the branches are not.\nSECONDARY: Luck, Strength",
+    "json": '{"primary_stat": "Agility", "difficulty": "Hard", "prediction": "Your footing is sure.", "secondary": ["Luck"]}',
+    "refusal": "That action is unclear.",
+}
+
+STORY_VARIANTS = {
+    "strict": f"{SCENE}\nA shadow moves between the vines.\n\n1. {CHOICES[0]}\n2. {CHOICES[1]}\n3. {CHOICES[2]}",
+    "numbered": f"{SCENE}\n\n1) {CHOICES[0]}\n2) {CHOICES[1]}\n3) {CHOICES[2]}",
+    "bold": f"{SCENE}\n\n**1.** {CHOICES[0]}\n**2.** {CHOICES[1]}\n**3.** {CHOICES[2]}",
+    "json": '{"story": "%s", "choices": ["%s", "%s", "%s"]}' % (SCENE, *CHOICES),
+    "two_choices": f"{SCENE}\n\n1. {CHOICES[0]}\n2. {CHOICES[1]}",
+}
+
+def legacy_encounter(text):
+    """The old ai.parse_ai_encounter; returns (scene, choices) or None when it fell back"""
+    scene, choices = "", []
+    for line in text.split('\n'):
+        if line.startswith("SCENE:"):
+            scene = line.replace("SCENE:", "").strip()
+        elif line.startswith("CHOICE"):
+            choices.append(line.split(":", 1)[1].strip() if ":" in line else line)
+    return (scene, choices) if scene and len(choices) >= 2 else None
+
+def legacy_analysis(text):
+    """The old game_engine.parse_action_analysis; None when the stat isn't usable"""
+    primary = None
+    for line in text.split('\n'):
+        if line.startswith("PRIMARY_STAT:"):
+            primary = line.split(":", 1)[1].strip()
+    return primary if primary in ("Strength", "Luck", "Agility") else None
+
+def legacy_story(text):
+    """The old split_story_choices; None when it fell back to default choices"""
+    if "1." in text and "2." in text and "3." in text:
+        parts = text.split("\n")
+        choices = [line.split(".", 1)[1].strip() for line in parts if line.strip().startswith(("1.", "2.", "3."))]
+        return choices[:3] if len(choices) >= 3 else None
+    return None
+
+def run(label, corpus, parse):
+    start = time.perf_counter()
+    recovered = sum(1 for text in corpus if parse(text))
+    elapsed = time.perf_counter() - start
+    megabytes = sum(len(text) for text in corpus) / 1e6
+    print(f"  {label:<22} {len(corpus) / elapsed:10.0f} replies/s  {megabytes / elapsed:6.1f} MB/s  "
+          f"recovered {recovered / len(corpus):6.1%}")
+
+def streamed(schema, text, rng):
+    """Feed a reply in random 1-12 character chunks, as a stream would arrive"""
+    parser = ResponseParser(schema)
+    position = 0
+    while position < len(text):
+        step = rng.randint(1, 12)
+        parser.feed(text[position:position + step])
+        position += step
+    return parser.finish()
+
+def main():
+    per_variant = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(1)
+
+    suites = [
+        ("encounter", ENCOUNTER_SCHEMA, ENCOUNTER_VARIANTS, legacy_encounter),
+        ("analysis", ANALYSIS_SCHEMA, ANALYSIS_VARIANTS, legacy_analysis),
+        ("story", STORY_SCHEMA, STORY_VARIANTS, legacy_story),
+    ]
+    for name, schema, variants, legacy in suites:
+        corpus = [text for text in variants.values() for _ in range(per_variant)]
+        rng.shuffle(corpus)
+        print(f"{name}: {len(variants)} variants x {per_variant}")
+        run("legacy parser", corpus, legacy)
+        run("response_parser", corpus, lambda text: parse_response(schema, text).status != "fallback")
+        run("response_parser (stream)", corpus, lambda text: streamed(schema, text, rng).status != "fallback")
+        # Well-formed replies take the strict fast path
+        strict = [variants["strict"]] * per_variant
+        run("legacy, strict only", strict, legacy)
+        run("parser, strict only", strict, lambda text: parse_response(schema, text).status != "fallback")
+
+        for variant, text in variants.items():
+            result = parse_response(schema, text)
+            legacy_ok = "yes" if legacy(text) else "no"
+            print(f"    {variant:<16} legacy {legacy_ok:<4} new {result.status:<9} {', '.join(result.repairs)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark the latency-budgeted model router through a provider slowdown.
+
+Plays outcome turns back to back against the stub server while its latency
+goes healthy -> slow -> healthy, once with no latency budget and once with
+the router's SLO. With the budget, turns during the slowdown get the local
+fallback outcome instead of waiting on the model, and the router goes back
+to the model once its slow samples age out of the window. First it checks
+that a slow best tier covered by a cheaper one is probed and chosen again
+once it recovers.
+
+Usage: python -m benchmarks.bench_router [slo_seconds] [phase_seconds]
+    e.g. python -m benchmarks.bench_router 0.5 10
+"""
+import os
+import statistics
+import sys
+import time
+
+# Pause between turns, as a player reads the last outcome
+THINK_SECONDS = 0.05
+PHASES = [("healthy", "lognormal:0.08:0.3"), ("slow", "lognormal:1.2:0.3"), ("recovered", "lognormal:0.08:0.3")]
+
+def play_phase(game_engine, router, phase_seconds):
+    """Run turns for phase_seconds; returns [(latency, used_model)]"""
+    roll = {"stat_used": "Strength", "stat_value": 5, "dice_roll": 12, "stat_bonus": 0,
+            "total_roll": 12, "success_level": "success"}
+    turns = []
+    deadline = time.perf_counter() + phase_seconds
+    while time.perf_counter() < deadline:
+        before = router.stats()["outcome"]["decisions"].get("fallback", 0)
+        start = time.perf_counter()
+        game_engine.process_choice("Bench", "Attack the goblin", roll=roll)
+        latency = time.perf_counter() - start
+        turns.append((latency, router.stats()["outcome"]["decisions"].get("fallback", 0) == before))
+        time.sleep(THINK_SECONDS)
+    return turns
+
+def report(phase, turns):
+    latencies = sorted(latency for latency, _ in turns)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    fallbacks = sum(1 for _, used_model in turns if not used_model)
+    print(f"  {phase:<10} {len(turns):4d} turns   p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+          f"p95 {p95 * 1000:7.1f} ms   local fallback {fallbacks:4d} ({fallbacks / len(turns):.0%})")
+
+def check_tier_recovery(model_router):
+    """A slow best tier is probed while a cheaper one covers for it, and is chosen again once it recovers"""
+    probe_seconds = model_router.ROUTER_PROBE_SECONDS
+    model_router.ROUTER_PROBE_SECONDS = 0.0
+    try:
+        router = model_router.ModelRouter({"story": model_router.RouteConfig(8.0, [("gpt-4o", 400), ("gpt-4o-mini", 400)])})
+        for _ in range(model_router.ROUTER_MIN_SAMPLES):
+            router.observe("story", "gpt-4o", 400, 20.0)
+        assert router.route("story") == ("gpt-4o", 400), "slow best tier was not probed"
+        router.observe("story", "gpt-4o", 400, 1.0)
+        assert router.route("story") == ("gpt-4o", 400), "recovered best tier was not chosen again"
+        assert router.stats()["story"]["decisions"] == {"probe": 1, "gpt-4o:400": 1}
+    finally:
+        model_router.ROUTER_PROBE_SECONDS = probe_seconds
+    print("tier recovery check passed: a slow gpt-4o is probed and chosen again once fast")
+
+def main():
+    slo = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    phase_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+
+    os.environ["OPENAI_API_KEY"] = "sk-stub"
+    os.environ.setdefault("ROUTER_WINDOW_SECONDS", str(phase_seconds / 5))
+    os.environ.setdefault("ROUTER_PROBE_SECONDS", str(phase_seconds / 10))
+
+    from stub_server import StubConfig, start_stub_server
+
+    config = StubConfig(seed=1)
+    server, base_url = start_stub_server(config)
+
+    import game_engine
+    import llm_client
+    import model_router
+
+    llm_client.configure(base_url=base_url)
+    check_tier_recovery(model_router)
+    print(f"outcome turns, {phase_seconds:.0f} s per phase, router window {model_router.ROUTER_WINDOW_SECONDS:.1f} s, "
+          f"probe every {model_router.ROUTER_PROBE_SECONDS:.1f} s")
+
+    for label, budget in (("no budget", float("inf")), (f"SLO {slo:.2f} s", slo)):
+        router = model_router.ModelRouter({"outcome": model_router.RouteConfig(budget, [("gpt-4o-mini", 200)])})
+        model_router._router = router
+        print(label)
+        for phase, latency in PHASES:
+            config.latency = latency
+            report(phase, play_phase(game_engine, router, phase_seconds))
+
+    print("router decisions:", model_router.router_stats()["outcome"]["decisions"])
+    llm_client.close_clients()
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark the binary save format against plain JSON saves.
+
+Builds saves like app.py's at several story lengths. The longer ones carry a
+full story_history, as saves did before the event log. For each length the
+report shows the JSON and binary sizes and three timings:
+- a full JSON parse, which the stats page used to pay for
+- decoding only the stats section
+- decoding every section
+
+Usage: python -m benchmarks.bench_save_format [repeats]
+"""
+import json
+import sys
+import time
+
+from save_format import decode_save, encode_save
+
+EVENT = "You step into the cold cavern. Water drips from the ceiling and something moves in the dark ahead."
+
+def make_save(events):
+    return {
+        "player_name": "Bench",
+        "player_stats": {"Strength": 7, "Luck": 5, "Agility": 6},
+        "player_class": "Warrior",
+        "character_health": 80,
+        "character_points": 340,
+        "story_history": [f"{EVENT} ({index})" for index in range(events)],
+        "current_story": "You stand at the mouth of a cave. " * 8,
+        "current_choices": ["Enter the cave", "Search the ground", "Turn back"],
+        "story_summary": "The hero crossed the forest and fought a troll. " * 10,
+        "scene_index": {"scenes": ["a" * 44] * 200, "checked": 120, "repeats": 9}
+    }
+
+def timed(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{'events':>7}  {'json':>9}  {'binary':>9}  {'json parse':>11}  {'stats only':>11}  {'all sections':>12}")
+    for events in (6, 100, 1000, 5000):
+        data = make_save(events)
+        text = json.dumps(data)
+        blob = encode_save(data)
+        assert decode_save(blob) == data, "round trip changed the save"
+
+        json_us = timed(lambda: json.loads(text), repeats)
+        stats_us = timed(lambda: decode_save(blob, ("stats",)), repeats)
+        all_us = timed(lambda: decode_save(blob), repeats)
+        print(f"{events:>7}  {len(text) / 1024:7.1f} K  {len(blob) / 1024:7.1f} K  "
+              f"{json_us:8.1f} us  {stats_us:8.1f} us  {all_us:9.1f} us")
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        encode_save(data)
+    print(f"\nencoding the largest save: {(time.perf_counter() - start) / repeats * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark the write-behind save queue against synchronous saves.
+
+A fake Supabase table sleeps for a simulated round trip on every request.
+The old auto-save did a select and then an update (two round trips) inside
+the turn. The queued save hands the snapshot to the worker, which upserts
+once. The report shows the time each turn spends saving, and how many
+writes reach the table when turns come faster than the coalescing window.
+
+Usage: python -m benchmarks.bench_save_queue [turns] [round_trip_ms]
+"""
+import sys
+import time
+
+from save_queue import SaveQueue
+
+class FakeTable:
+    """Stands in for supabase_client.table(...): every execute() is one round trip"""
+
+    def __init__(self, round_trip):
+        self.round_trip = round_trip
+        self.requests = 0
+        self.rows = {}
+        self._op = None
+
+    def select(self, *columns):
+        self._op = ("select",)
+        return self
+
+    def update(self, row):
+        self._op = ("write", row)
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self._op = ("write", row)
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        time.sleep(self.round_trip)
+        self.requests += 1
+        if self._op[0] == "write":
+            self.rows[self._op[1]["player_name"]] = self._op[1]
+
+def snapshot(turn):
+    return {"player_name": "bench", "character_points": turn, "story_history": ["event"] * (2 * turn)}
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    round_trip = (float(sys.argv[2]) if len(sys.argv) > 2 else 80) / 1000
+
+    table = FakeTable(round_trip)
+    start = time.perf_counter()
+    for turn in range(turns):
+        table.select("player_name").eq("player_name", "bench").execute()
+        table.update(snapshot(turn)).eq("player_name", "bench").execute()
+    elapsed = time.perf_counter() - start
+    print(f"synchronous select + update: {elapsed / turns * 1000:7.2f} ms per turn, {table.requests} requests")
+
+    for gap in (0.0, 0.3):
+        table = FakeTable(round_trip)
+        queue = SaveQueue()
+        blocked = 0.0
+        for turn in range(turns):
+            start = time.perf_counter()
+            queue.submit("bench", lambda row: table.upsert(row, on_conflict="player_name").execute(), snapshot(turn))
+            blocked += time.perf_counter() - start
+            time.sleep(gap)
+        queue.flush()
+        assert table.rows["bench"]["character_points"] == turns - 1, "latest save did not win"
+        print(f"queued upsert, {gap * 1000:3.0f} ms between turns: {blocked / turns * 1000:7.3f} ms per turn, "
+              f"{table.requests} requests ({queue.stats()['coalesced']} saves coalesced)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark the SQLite local save store with many stored players.
+
+Fills a temporary database with `players` saves shaped like app.py's, then
+measures transactional saves per second (each save is its own commit, as
+the game makes them) and the latency of loading a random player.
+
+Usage: python -m benchmarks.bench_save_store [players] [samples]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from save_store import SaveStore
+
+def save_data(name, rng):
+    return {
+        "player_name": name,
+        "player_stats": {"Strength": rng.randint(1, 10), "Luck": rng.randint(1, 10), "Agility": rng.randint(1, 10)},
+        "player_class": rng.choice(["Warrior", "Rogue", "Mage"]),
+        "character_health": 100,
+        "character_points": rng.randint(0, 500),
+        "event_count": rng.randint(0, 400),
+        "history_events": 6,
+        "current_story": "You stand at the mouth of a cave. " * 8,
+        "current_choices": ["Enter the cave", "Search the ground", "Turn back"],
+        "story_summary": "The hero crossed the forest and fought a troll. " * 10,
+        "scene_index": None
+    }
+
+def percentile(samples, share):
+    return sorted(samples)[int(len(samples) * share) - 1]
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(1)
+    names = [f"Player {index}" for index in range(players)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SaveStore(os.path.join(directory, "saves.db"))
+        start = time.perf_counter()
+        for offset in range(0, players, 10000):
+            store.save_many("streamlit", [(name, save_data(name, rng)) for name in names[offset:offset + 10000]])
+        print(f"{store.count('streamlit')} players stored in {time.perf_counter() - start:.1f} s, "
+              f"database {os.path.getsize(store.path) / 1e6:.0f} MB")
+
+        start = time.perf_counter()
+        for _ in range(samples):
+            name = rng.choice(names)
+            store.save("streamlit", name, save_data(name, rng))
+        elapsed = time.perf_counter() - start
+        print(f"saves: {samples / elapsed:,.0f} per second ({elapsed / samples * 1e6:.0f} us each, one transaction per save)")
+
+        latencies = []
+        for _ in range(samples):
+            name = rng.choice(names)
+            start = time.perf_counter()
+            data = store.load("streamlit", name)
+            latencies.append(time.perf_counter() - start)
+            assert data["player_name"] == name
+        print(f"loads: p50 {percentile(latencies, 0.5) * 1e6:.0f} us, p95 {percentile(latencies, 0.95) * 1e6:.0f} us, "
+              f"p99 {percentile(latencies, 0.99) * 1e6:.0f} us")
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark the near-duplicate scene index.
+
+Fills a player's index with procedural scenes, then reports how long a
+check takes, how many fresh scenes it flags as repeats (and how many get
+through when the generator redraws flagged ones), how many lightly
+reworded copies of shown scenes it catches, and how big the index is in a
+save.
+
+Usage: python -m benchmarks.bench_scenes [scenes]
+"""
+import json
+import random
+import sys
+import time
+
+from procedural_encounters import generate_procedural_encounter, get_grammar
+from scene_index import SCENE_INDEX_CAPACITY, SceneIndex
+
+LOCATIONS = ["dark forest", "jungle", "cave", "ruins", "mine", "swamp"]
+
+def reword(scene, rng, share=0.15):
+    """Swap a share of the words, as a model repeating itself tends to"""
+    words = scene.split()
+    for index in rng.sample(range(len(words)), max(1, int(len(words) * share))):
+        words[index] = rng.choice(["the", "dark", "old", "cold", "a", "strange", "silent"])
+    return " ".join(words)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(1)
+    grammar = get_grammar()
+    scenes = [
+        grammar.generate({"Strength": 5, "Luck": 5, "Agility": 5}, ["sword"], rng.choice(LOCATIONS), rng)["scene"]
+        for _ in range(count)
+    ]
+
+    index = SceneIndex()
+    start = time.perf_counter()
+    for scene in scenes:
+        index.check(scene)
+        index.add(scene)
+    elapsed = time.perf_counter() - start
+    stats = index.stats()
+    print(f"{count} scenes checked and added in {elapsed:.2f} s, {elapsed / count * 1e6:.0f} us each "
+          f"(index holds {stats['scenes']}, capacity {SCENE_INDEX_CAPACITY})")
+    print(f"procedural scenes flagged as repeats: {stats['repeats']} ({stats['repetition_rate']:.1%})")
+
+    # The same draws, but handing the generator the index so it redraws repeats before returning
+    redrawn = SceneIndex()
+    still_repeated = 0
+    for _ in range(count):
+        scene = generate_procedural_encounter(
+            {"Strength": 5, "Luck": 5, "Agility": 5}, ["sword"], rng.choice(LOCATIONS), rng=rng, scene_index=redrawn
+        )["scene"]
+        still_repeated += redrawn.is_repeat(scene)
+        redrawn.add(scene)
+    print(f"with the index passed to the generator, repeats shown: {still_repeated} ({still_repeated / count:.1%})")
+
+    recent = scenes[-SCENE_INDEX_CAPACITY:]
+    reworded = [reword(scene, rng) for scene in recent]
+    start = time.perf_counter()
+    caught = sum(index.is_repeat(scene) for scene in reworded)
+    elapsed = time.perf_counter() - start
+    print(f"reworded copies caught: {caught} of {len(reworded)} ({caught / len(reworded):.1%}), "
+          f"{elapsed / len(reworded) * 1e6:.0f} us per check")
+
+    saved = json.dumps(index.to_dict())
+    start = time.perf_counter()
+    restored = SceneIndex.from_dict(json.loads(saved))
+    elapsed = time.perf_counter() - start
+    print(f"saved index: {len(saved) / 1024:.1f} KiB, restored in {elapsed * 1000:.1f} ms")
+    assert all(restored.is_repeat(scene) for scene in recent), "restored index lost scenes"
+
+if __name__ == "__main__":
+    main()
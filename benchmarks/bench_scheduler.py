@@ -0,0 +1,69 @@
+"""Benchmark a burst of players against a rate-limited stub server.
+
+Runs the same burst twice: once with a single attempt per call (the old
+behaviour, where a 429 falls straight through to canned text) and once
+through the scheduler with retries, backoff and coalescing.
+
+Usage: python -m benchmarks.bench_scheduler [players] [error_429_rate] [rpm]
+    e.g. python -m benchmarks.bench_scheduler 60 0.2 600
+"""
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stub_server import StubConfig, start_stub_server
+
+ACTIONS = ["attack the goblin", "sneak past quietly", "search the wreckage", "try to negotiate"]
+
+def run_burst(llm_client, players):
+    def turn(index):
+        start = time.perf_counter()
+        try:
+            llm_client.create_chat_completion(
+                call_site="outcome",
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": f"Player {index} chose to {ACTIONS[index % len(ACTIONS)]}"}],
+                max_tokens=100
+            )
+            return True, time.perf_counter() - start
+        except Exception:
+            return False, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=players) as pool:
+        return list(pool.map(turn, range(players)))
+
+def report(label, results, stats):
+    latencies = sorted(latency for ok, latency in results if ok)
+    succeeded = len(latencies)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)] if latencies else 0.0
+    print(f"{label:<12} {succeeded}/{len(results)} succeeded   "
+          f"p50 {statistics.median(latencies) * 1000 if latencies else 0:7.1f} ms   p95 {p95 * 1000:7.1f} ms   "
+          f"retries {stats['retries']}   max queue {stats['max_queue_depth']}")
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    error_429 = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    rpm = float(sys.argv[3]) if len(sys.argv) > 3 else 600
+
+    server, base_url = start_stub_server(StubConfig(latency="lognormal:0.2:0.3", error_429=error_429, seed=1))
+    os.environ["OPENAI_API_KEY"] = "sk-stub"
+
+    import llm_client
+    import scheduler
+
+    llm_client.configure(base_url=base_url)
+    print(f"{players} players, {error_429:.0%} injected 429s, {rpm:.0f} RPM")
+
+    scheduler.configure(rpm=rpm, max_attempts=1)
+    report("no retries", run_burst(llm_client, players), scheduler.get_scheduler().stats())
+
+    scheduler.configure(rpm=rpm, max_attempts=scheduler.OPENAI_RETRY_ATTEMPTS)
+    report("scheduler", run_burst(llm_client, players), scheduler.get_scheduler().stats())
+
+    llm_client.close_clients()
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Benchmark cold start of each entry point.
+
+For every entry point a fresh interpreter imports it under -X importtime.
+The report shows the total import time and the slowest imports, and flags
+heavy libraries (openai, httpx, supabase, numpy, pandas, tiktoken) that
+were loaded before anything was shown.
+
+Time to first render is measured as follows:
+- Streamlit scripts (app.py, game_ui.py) run once headless through
+  streamlit.testing.v1.AppTest when streamlit is installed. Otherwise only
+  the script's own imports are timed.
+- CLI modules (Main.py, ai.py) are ready to print once imported, so their
+  first render is the wall time of `python -c "import <module>"` minus
+  the bare interpreter start.
+
+Usage: python -m benchmarks.bench_startup [runs]
+"""
+import ast
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = [("app.py", "streamlit"), ("game_ui.py", "streamlit"), ("Main.py", "cli"), ("ai.py", "cli")]
+HEAVY = ("openai", "httpx", "supabase", "numpy", "pandas", "tiktoken")
+
+APP_TEST = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+AppTest.from_file({path!r}, default_timeout=60).run()
+print(imported - start, time.perf_counter() - start)
+"""
+
+def run(code, *flags):
+    """Run code in a fresh interpreter from the repo root; returns (wall seconds, completed process)"""
+    start = time.perf_counter()
+    done = subprocess.run([sys.executable, *flags, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    return time.perf_counter() - start, done
+
+def importtime(statement):
+    """(cumulative us, module name, imported directly) for each import -X importtime reports"""
+    _, done = run(statement, "-X", "importtime")
+    if done.returncode:
+        raise RuntimeError(done.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in done.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():  # Skips the header line
+            rows.append((int(cumulative), name.strip(), not name.startswith("  ")))
+    return rows
+
+def import_profile(statement, startup):
+    """Total import time in ms, the five slowest direct imports and the heavy packages loaded
+
+    Modules the bare interpreter already imports at startup (site, encodings)
+    are left out.
+    """
+    total = 0.0
+    top = []
+    heavy = set()
+    for cumulative, name, direct in importtime(statement):
+        if name.split(".")[0] in HEAVY:
+            heavy.add(name.split(".")[0])
+        if direct and name not in startup:
+            total += cumulative / 1000
+            top.append((cumulative / 1000, name))
+    return total, sorted(top, reverse=True)[:5], sorted(heavy)
+
+def script_imports(path, skip=("streamlit",)):
+    """`import a, b` statement for a script's top-level imports, leaving out `skip`"""
+    with open(os.path.join(ROOT, path), "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return "import " + ", ".join(dict.fromkeys(module for module in modules if module.split(".")[0] not in skip))
+
+def has_streamlit():
+    return run("import streamlit")[1].returncode == 0
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    streamlit = has_streamlit()
+    baseline = median([run("pass")[0] for _ in range(runs)])
+    startup = {name for _, name, _ in importtime("pass")}
+    print(f"interpreter start: {baseline * 1000:.0f} ms (median of {runs}), streamlit {'installed' if streamlit else 'not installed'}")
+
+    for path, kind in ENTRY_POINTS:
+        module = path[:-3]
+        if kind == "streamlit" and not streamlit:
+            statement = script_imports(path)
+            label = "imports (without streamlit)"
+        else:
+            statement = f"import {module}"
+            label = "import"
+        try:
+            total, top, heavy = import_profile(statement, startup)
+        except RuntimeError as e:
+            print(f"\n{path}: could not import: {e}")
+            continue
+
+        print(f"\n{path}: {label} {total:.0f} ms, heavy libraries loaded: {', '.join(heavy) or 'none'}")
+        for cumulative, name in top:
+            print(f"    {cumulative:8.1f} ms  {name}")
+
+        if kind == "cli":
+            first = median([run(statement)[0] for _ in range(runs)]) - baseline
+            print(f"    time to first render: {first * 1000:.0f} ms")
+        elif streamlit:
+            timings = []
+            for _ in range(runs):
+                _, done = run(APP_TEST.format(path=path))
+                if done.returncode:
+                    print(f"    AppTest run failed: {done.stderr.strip().splitlines()[-1]}")
+                    break
+                timings.append([float(value) for value in done.stdout.split()[-2:]])
+            if timings:
+                streamlit_import, first = median(timings)
+                print(f"    time to first render: {first * 1000:.0f} ms "
+                      f"({streamlit_import * 1000:.0f} ms of it importing streamlit)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark the full turn pipeline offline against the local stub server.
+
+Compares three ways of running a Confirm Action turn:
+- sequential: process_choice, then generate_ai_story (the original flow)
+- concurrent: turn_pipeline.run_turn
+- streaming: turn_pipeline.stream_turn, timed to the first story chunk and to the end
+
+Usage: python -m benchmarks.bench_turn_pipeline [turns] [latency_spec] [token_delay]
+    e.g. python -m benchmarks.bench_turn_pipeline 20 lognormal:0.3:0.3 0.005
+"""
+import os
+import statistics
+import sys
+import time
+
+from stub_server import StubConfig, start_stub_server
+
+PLAYER = "Zachor"
+STATS = {"Strength": 7, "Luck": 5, "Agility": 6}
+ACTIONS = ["attack the goblin", "sneak past quietly", "search the wreckage", "try to negotiate"]
+
+def summarize(label, samples):
+    samples = sorted(samples)
+    p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+    print(f"{label:<22} mean {statistics.mean(samples) * 1000:8.1f} ms   "
+          f"p50 {statistics.median(samples) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms")
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = sys.argv[2] if len(sys.argv) > 2 else "fixed:0.2"
+    token_delay = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+
+    server, base_url = start_stub_server(StubConfig(latency=latency, token_delay=token_delay, seed=1))
+    os.environ["OPENAI_API_KEY"] = "sk-stub"
+
+    import game_engine
+    import llm_client
+    import turn_pipeline
+
+    llm_client.configure(base_url=base_url)
+    game_engine.openai_api_key = "sk-stub"
+
+    history = ["You woke in the jungle.", "A shadow moved between the vines."]
+    sequential, concurrent, first_chunk, streamed = [], [], [], []
+
+    for turn in range(turns):
+        action = ACTIONS[turn % len(ACTIONS)]
+
+        start = time.perf_counter()
+        result = game_engine.process_choice(PLAYER, action, STATS)
+        game_engine.generate_ai_story(PLAYER, STATS, history + [f"You chose: {action}", result])
+        sequential.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        turn_pipeline.run_turn(PLAYER, action, STATS, history)
+        concurrent.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        first = None
+        for kind, text in turn_pipeline.stream_turn(PLAYER, action, STATS, history):
+            if kind == "story" and first is None:
+                first = time.perf_counter() - start
+        streamed.append(time.perf_counter() - start)
+        first_chunk.append(first if first is not None else streamed[-1])
+
+    print(f"{turns} turns, stub latency {latency}, token delay {token_delay * 1000:.0f} ms")
+    summarize("sequential turn", sequential)
+    summarize("concurrent turn", concurrent)
+    summarize("streamed first word", first_chunk)
+    summarize("streamed full turn", streamed)
+
+    llm_client.close_clients()
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Offline evaluation of the local action model against logged LLM analyses.
+
+Splits the analysis log into train and test sets, trains the model, and for
+a range of confidence thresholds reports how many test actions the model
+would answer on its own, how often it agrees with the LLM on those, and
+how much LLM latency that saves.
+
+Usage:
+    python -m benchmarks.eval_action_model [--log analysis_log.jsonl]
+    python -m benchmarks.eval_action_model --stub 3000   # build a log from the stub server first
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+import action_model
+from action_model import ActionModel, load_examples
+
+THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95)
+
+def build_stub_log(path, count, seed=1):
+    """Write a synthetic analysis log by sending generated actions to the stub server"""
+    from benchmarks.bench_classifier import ADVERBS, TARGETS, VERBS
+    from stub_server import StubConfig, start_stub_server
+
+    server, base_url = start_stub_server(StubConfig(seed=seed))
+    # The stub answers instantly; log the latency a real gpt-4o-mini call would have had
+    real_latency = StubConfig(latency="lognormal:0.6:0.3", seed=seed)
+    os.environ["OPENAI_API_KEY"] = "sk-stub"
+
+    import llm_client
+    import scheduler
+    from prompts import ANALYSIS_PROMPT
+    from response_parser import ANALYSIS_SCHEMA, parse_response
+
+    llm_client.configure(base_url=base_url)
+    # The stub has no rate limits to respect
+    scheduler.configure(rpm=1e9, tpm=1e12)
+    action_model.ANALYSIS_LOG_PATH = path
+    rng = random.Random(seed)
+    for _ in range(count):
+        action = " ".join(filter(None, [rng.choice(VERBS), rng.choice(TARGETS), rng.choice(ADVERBS)]))
+        stats = {stat: rng.randint(1, 10) for stat in action_model.STATS}
+        messages = [{"role": "user", "content": ANALYSIS_PROMPT.render(
+            action=action, strength=stats["Strength"], luck=stats["Luck"], agility=stats["Agility"]
+        )}]
+        response = llm_client.create_chat_completion(call_site="analysis", model="gpt-4o-mini", messages=messages)
+        result = parse_response(ANALYSIS_SCHEMA, response.choices[0].message.content)
+        action_model.log_analysis(action, stats, result.value, real_latency.sample_latency())
+    llm_client.close_clients()
+    server.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=action_model.ANALYSIS_LOG_PATH)
+    parser.add_argument("--stub", type=int, default=0, help="first generate this many analyses from the stub server")
+    parser.add_argument("--test-share", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.stub:
+        build_stub_log(args.log, args.stub)
+
+    examples = load_examples(args.log)
+    random.Random(0).shuffle(examples)
+    split = int(len(examples) * (1 - args.test_share))
+    train, test = examples[:split], examples[split:]
+    if not train or not test:
+        raise SystemExit(f"Need more analyses in {args.log} (found {len(examples)})")
+
+    start = time.perf_counter()
+    model = ActionModel.fit([example[:4] for example in train])
+    print(f"{len(train)} train / {len(test)} test analyses, {len(model.vocab)} features, "
+          f"trained in {time.perf_counter() - start:.2f} s")
+
+    predictions = []
+    timings = []
+    for action, stats, _, _, _ in test:
+        start = time.perf_counter()
+        predictions.append(model.predict(action, stats))
+        timings.append(time.perf_counter() - start)
+    llm_latency = statistics.mean(example[4] for example in test) if test else 0.0
+    print(f"model predict {statistics.mean(timings) * 1e6:.0f} us per action, "
+          f"logged LLM analysis {llm_latency:.0f} ms per action")
+
+    stat_agreement = sum(p["primary_stat"] == e[2] for p, e in zip(predictions, test)) / len(test)
+    difficulty_agreement = sum(p["difficulty"] == e[3] for p, e in zip(predictions, test)) / len(test)
+    print(f"agreement on every action: stat {stat_agreement:.1%}, difficulty {difficulty_agreement:.1%}")
+
+    print(f"{'threshold':>9} {'answered':>9} {'stat agree':>11} {'diff agree':>11} {'LLM ms saved':>13}")
+    for threshold in THRESHOLDS:
+        answered = [
+            (p, e) for p, e in zip(predictions, test)
+            if p["stat_confidence"] >= threshold and p["difficulty_confidence"] >= action_model.ACTION_MODEL_DIFFICULTY_THRESHOLD
+        ]
+        if answered:
+            stat_ok = sum(p["primary_stat"] == e[2] for p, e in answered) / len(answered)
+            difficulty_ok = sum(p["difficulty"] == e[3] for p, e in answered) / len(answered)
+        else:
+            stat_ok = difficulty_ok = 0.0
+        saved = sum(e[4] for _, e in answered)
+        print(f"{threshold:>9.2f} {len(answered) / len(test):>9.1%} {stat_ok:>11.1%} {difficulty_ok:>11.1%} "
+              f"{saved:>13.0f}")
+
+if __name__ == "__main__":
+    main()
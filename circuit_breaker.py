@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from collections import deque
+
+from scheduler import retry_delay
+
+# Failure-rate window and trip settings (override via environment)
+CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "60"))
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+# Fewer attempts than this in the window never trip the breaker
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "4"))
+# This many failures in a row trip the breaker however healthy the window was
+CIRCUIT_CONSECUTIVE_FAILURES = int(os.getenv("CIRCUIT_CONSECUTIVE_FAILURES", "3"))
+# How long the breaker stays open before letting probe requests through
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+# Probe requests allowed at once while half-open
+CIRCUIT_PROBES = int(os.getenv("CIRCUIT_PROBES", "1"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """The OpenAI dependency is failing; the call was not attempted"""
+
+def is_outage(error):
+    """Errors that say the API is down or overloaded, rather than that the request was bad"""
+    try:
+        return retry_delay(error) is not None
+    except ImportError:
+        return False
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker over a sliding failure-rate window
+
+    Closed: every attempt goes through, and the breaker opens once at least
+    CIRCUIT_MIN_CALLS attempts in the last CIRCUIT_WINDOW_SECONDS have a
+    failure rate of CIRCUIT_FAILURE_RATE or more, or after
+    CIRCUIT_CONSECUTIVE_FAILURES failures in a row. Open: attempts fail at
+    once with CircuitOpenError. After CIRCUIT_OPEN_SECONDS it goes
+    half-open and lets CIRCUIT_PROBES attempts through; a successful probe
+    closes it again, a failed one reopens it.
+    """
+
+    def __init__(self, window_seconds=CIRCUIT_WINDOW_SECONDS, failure_rate=CIRCUIT_FAILURE_RATE,
+                 min_calls=CIRCUIT_MIN_CALLS, consecutive_failures=CIRCUIT_CONSECUTIVE_FAILURES,
+                 open_seconds=CIRCUIT_OPEN_SECONDS, probes=CIRCUIT_PROBES):
+        self.window_seconds = window_seconds
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.consecutive_failures = consecutive_failures
+        self.open_seconds = open_seconds
+        self.probes = probes
+        self.state = CLOSED
+        self._outcomes = deque()  # (timestamp, failed)
+        self._failure_streak = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+        self._metrics = {"trips": 0, "rejected": 0, "probes": 0, "last_error": None}
+
+    def before_call(self):
+        """Raise CircuitOpenError unless this attempt may go to the API"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self._metrics["rejected"] += 1
+                    raise CircuitOpenError(f"OpenAI circuit open, retrying in {self._retry_in():.0f}s")
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._probes_in_flight >= self.probes:
+                    self._metrics["rejected"] += 1
+                    raise CircuitOpenError("OpenAI circuit half-open, probe already in flight")
+                self._probes_in_flight += 1
+                self._metrics["probes"] += 1
+
+    def record_success(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._outcomes.clear()
+                self.state = CLOSED
+                print("OpenAI circuit closed - API is answering again")
+            self._add(False)
+
+    def record_failure(self, error=None):
+        with self._lock:
+            if error is not None:
+                self._metrics["last_error"] = f"{type(error).__name__}: {error}"[:200]
+            if self.state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._trip()
+                return
+            self._add(True)
+            if self.state == CLOSED:
+                calls, failures = self._counts()
+                if ((calls >= self.min_calls and failures / calls >= self.failure_rate)
+                        or self._failure_streak >= self.consecutive_failures):
+                    self._trip()
+
+    def record(self, error):
+        """Record how an attempt ended; non-outage errors mean the API answered"""
+        if is_outage(error):
+            self.record_failure(error)
+        else:
+            self.record_success()
+
+    def stats(self):
+        """State, recent failure rate and counters for dashboards"""
+        with self._lock:
+            calls, failures = self._counts()
+            return {
+                "state": self.state,
+                "calls": calls,
+                "failures": failures,
+                "failure_rate": failures / calls if calls else 0.0,
+                "retry_in": self._retry_in() if self.state == OPEN else 0.0,
+                "trips": self._metrics["trips"],
+                "rejected": self._metrics["rejected"],
+                "probes": self._metrics["probes"],
+                "last_error": self._metrics["last_error"]
+            }
+
+    def reset(self):
+        """Close the breaker and forget recent outcomes"""
+        with self._lock:
+            self.state = CLOSED
+            self._outcomes.clear()
+            self._failure_streak = 0
+            self._probes_in_flight = 0
+
+    def _trip(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._failure_streak = 0
+        self._metrics["trips"] += 1
+        print(f"OpenAI circuit opened - using local fallbacks for {self.open_seconds:.0f}s")
+
+    def _retry_in(self):
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def _add(self, failed):
+        self._outcomes.append((time.monotonic(), failed))
+        self._failure_streak = self._failure_streak + 1 if failed else 0
+
+    def _counts(self):
+        cutoff = time.monotonic() - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+        failures = sum(1 for _, failed in self._outcomes if failed)
+        return len(self._outcomes), failures
+
+# One breaker for the OpenAI dependency, shared by the whole process
+_breaker = CircuitBreaker()
+
+def get_breaker():
+    """Return the process-wide OpenAI circuit breaker"""
+    return _breaker
+
+def breaker_stats():
+    """State and failure rate of the shared breaker"""
+    return _breaker.stats()
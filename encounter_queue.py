@@ -0,0 +1,173 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from procedural_encounters import generate_procedural_encounter
+from scheduler import background_worker
+from stat_buckets import stat_buckets
+
+# Encounters requested per completion, and the queue length that triggers a refill
+ENCOUNTER_BATCH_SIZE = int(os.getenv("ENCOUNTER_BATCH_SIZE", "4"))
+ENCOUNTER_LOW_WATER = int(os.getenv("ENCOUNTER_LOW_WATER", "1"))
+
+# Workers shared by every session's queue (override via environment). A queue
+# runs at most one refill at a time, so this is how many sessions can refill at once.
+ENCOUNTER_REFILL_WORKERS = int(os.getenv("ENCOUNTER_REFILL_WORKERS", "4"))
+
+_refill_executor = ThreadPoolExecutor(
+    max_workers=ENCOUNTER_REFILL_WORKERS, thread_name_prefix="encounters", initializer=background_worker
+)
+
+def inventory_items(inventory):
+    """Normalized set of items held"""
+    return frozenset(str(item).strip().lower() for item in inventory or [])
+
+class EncounterQueue:
+    """Queue of pre-generated encounters, refilled a batch at a time in the background
+
+    Each batch remembers the stat buckets and inventory it was written for.
+    Queued encounters are dropped when a stat moves to another bucket or an
+    item the batch was written with is lost, since its choices may depend on
+    them. Picking up new items does not invalidate the queue. With a
+    scene_index, queued encounters that repeat a scene the player has seen
+    are skipped, and a procedural encounter is served if none is left.
+    """
+
+    def __init__(self, generate, location="dark forest", batch_size=ENCOUNTER_BATCH_SIZE,
+                 low_water=ENCOUNTER_LOW_WATER, scene_index=None):
+        # generate(player_stats, inventory, location, count) -> list of encounters
+        self.generate = generate
+        self.location = location
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.scene_index = scene_index
+        self.served = 0
+        self.repeats_skipped = 0
+        self.batches = 0
+        self.invalidated = 0
+        self.waits = 0
+        self._queue = deque()
+        self._written_for = None  # (stat buckets, items) of the queued encounters
+        self._refill = None  # (future, written_for) of the running refill
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def prime(self, player_stats, inventory):
+        """Start generating the first batch before it is needed"""
+        with self._lock:
+            self._drop_if_stale(player_stats, inventory)
+            if not self._queue:
+                self._start_refill(player_stats, inventory)
+
+    def next(self, player_stats, inventory):
+        """Return the next encounter for the player's current stats and inventory
+
+        Blocks only when the queue is empty. Starts a background refill once
+        the queue runs low.
+        """
+        with self._lock:
+            self._drop_if_stale(player_stats, inventory)
+            future = None if self._queue else self._start_refill(player_stats, inventory)
+
+        if future is not None:
+            self.waits += 1
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error generating encounters: {e}")
+
+        with self._lock:
+            self._drop_if_stale(player_stats, inventory)
+            skipped = self.repeats_skipped
+            encounter = self._pop_fresh()
+            if len(self._queue) <= self.low_water:
+                self._start_refill(player_stats, inventory)
+
+        if encounter is None and self.repeats_skipped > skipped:
+            # Everything queued repeated an earlier scene
+            encounter = generate_procedural_encounter(player_stats, inventory, self.location, scene_index=self.scene_index)
+        if encounter is None:
+            # The batch came back empty or went stale while we waited
+            encounter = self.generate(dict(player_stats), list(inventory), self.location, 1)[0]
+        if self.scene_index is not None:
+            self.scene_index.add(encounter["scene"])
+        self.served += 1
+        return encounter
+
+    def close(self):
+        """Drop queued encounters and ignore any refill still running"""
+        with self._lock:
+            self._generation += 1
+            if self._refill:
+                self._refill[0].cancel()
+            self._refill = None
+            self._queue.clear()
+            self._written_for = None
+
+    def stats(self):
+        """Queue length and counters for this session"""
+        return {
+            "queued": len(self._queue),
+            "served": self.served,
+            "batches": self.batches,
+            "invalidated": self.invalidated,
+            "waits": self.waits,
+            "repeats_skipped": self.repeats_skipped,
+            "refilling": self._refill is not None
+        }
+
+    def _pop_fresh(self):
+        """Next queued encounter, skipping ones that repeat a scene the player has seen"""
+        while self._queue:
+            encounter = self._queue.popleft()
+            if self.scene_index is None or not self.scene_index.check(encounter["scene"]):
+                return encounter
+            self.repeats_skipped += 1
+        return None
+
+    def _is_stale(self, written_for, player_stats, inventory):
+        buckets, items = written_for
+        return buckets != stat_buckets(player_stats) or not items <= inventory_items(inventory)
+
+    def _drop_if_stale(self, player_stats, inventory):
+        """Discard queued and in-flight encounters written for a different player state"""
+        if self._written_for and self._is_stale(self._written_for, player_stats, inventory):
+            self.invalidated += len(self._queue)
+            self._queue.clear()
+            self._written_for = None
+        if self._refill and self._is_stale(self._refill[1], player_stats, inventory):
+            self._generation += 1
+            self._refill[0].cancel()
+            self._refill = None
+
+    def _start_refill(self, player_stats, inventory):
+        """Submit a batch request unless one is already running; returns its future"""
+        if self._refill is None:
+            written_for = (stat_buckets(player_stats), inventory_items(inventory))
+            # Snapshot the state: the game keeps mutating its stats and inventory
+            future = _refill_executor.submit(
+                self._fill, self._generation, written_for, dict(player_stats), list(inventory)
+            )
+            self._refill = (future, written_for)
+        return self._refill[0]
+
+    def _fill(self, generation, written_for, player_stats, inventory):
+        encounters = []
+        try:
+            encounters = self.generate(player_stats, inventory, self.location, self.batch_size)
+        finally:
+            with self._lock:
+                # Skip results invalidated while they were being generated
+                if generation == self._generation:
+                    self._refill = None
+                    if encounters:
+                        self.batches += 1
+                        self._queue.extend(encounters)
+                        self._written_for = self._merge(self._written_for, written_for)
+
+    def _merge(self, current, written_for):
+        """Queued encounters may depend on any item held when either batch was written"""
+        if current is None:
+            return written_for
+        return written_for[0], current[1] | written_for[1]
@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from save_store import player_key
+from scheduler import background_worker
+
+# Where local story logs live (override via environment)
+STORY_LOG_DIR = os.getenv("STORY_LOG_DIR", ".")
+# Events kept once a log is compacted; older ones live on in the story summary
+STORY_LOG_KEEP_EVENTS = int(os.getenv("STORY_LOG_KEEP_EVENTS", "500"))
+# Compact a log after this many events have been appended since the last compaction
+STORY_LOG_COMPACT_EVERY = int(os.getenv("STORY_LOG_COMPACT_EVERY", "200"))
+
+STORY_EVENTS_TABLE = "story_events"
+
+# One background worker compacts logs in order
+_compact_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="story-log", initializer=background_worker
+)
+
+# Appends and compactions of the same local file must not interleave
+_path_locks = {}
+_path_locks_lock = threading.Lock()
+
+def _lock_for(path):
+    with _path_locks_lock:
+        return _path_locks.setdefault(path, threading.Lock())
+
+def _read_tail_lines(path, count, block_size=8192):
+    """Last `count` lines of a file, read backwards from the end in blocks"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    return [line for line in data.splitlines() if line.strip()][-count:]
+
+def log_filename(player_name):
+    """story_log_<player key>.jsonl; path separators are escaped so any name stays one file in the log directory"""
+    key = player_key(player_name).replace("%", "%25").replace("/", "%2F").replace("\\", "%5C")
+    return f"story_log_{key}.jsonl"
+
+class LocalStoryLog:
+    """Story events of one player as a JSON-lines file, one {"seq", "event"} object per line"""
+
+    kind = "local"
+
+    def __init__(self, player_name, directory=None):
+        self.path = os.path.join(directory or STORY_LOG_DIR, log_filename(player_name))
+
+    def append(self, records):
+        """Append (seq, event) records"""
+        lines = "".join(json.dumps({"seq": seq, "event": event}) + "\n" for seq, event in records)
+        with _lock_for(self.path):
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+    def tail(self, count, end=None):
+        """Events with seq below `end` (all when None), oldest first, at most the last `count`"""
+        if count <= 0 or not os.path.exists(self.path):
+            return []
+        # A retried append can repeat records; read a little extra so duplicates don't shorten the tail
+        with _lock_for(self.path):
+            lines = _read_tail_lines(self.path, count * 2 + 8)
+        events = {}
+        for line in lines:
+            record = json.loads(line)
+            if end is None or record["seq"] < end:
+                events[record["seq"]] = record["event"]
+        return [events[seq] for seq in sorted(events)[-count:]]
+
+    def compact(self, keep_from):
+        """Rewrite the log without records older than seq keep_from, dropping duplicates"""
+        if not os.path.exists(self.path):
+            return
+        with _lock_for(self.path):
+            events = {}
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        if record["seq"] >= keep_from:
+                            events[record["seq"]] = record["event"]
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps({"seq": seq, "event": events[seq]}) + "\n" for seq in sorted(events))
+            os.replace(temp_path, self.path)
+
+class SupabaseStoryLog:
+    """Story events of one player as rows of the story_events table, unique on (player_name, seq)"""
+
+    kind = "supabase"
+
+    def __init__(self, client, player_name):
+        self.client = client
+        self.player_name = player_name
+
+    def append(self, records):
+        rows = [{"player_name": self.player_name, "seq": seq, "event": event} for seq, event in records]
+        # Upsert, so a retried append doesn't fail on rows that already made it
+        self.client.table(STORY_EVENTS_TABLE).upsert(rows, on_conflict="player_name,seq").execute()
+
+    def tail(self, count, end=None):
+        if count <= 0:
+            return []
+        query = self.client.table(STORY_EVENTS_TABLE).select("seq, event").eq("player_name", self.player_name)
+        if end is not None:
+            query = query.lt("seq", end)
+        result = query.order("seq", desc=True).limit(count).execute()
+        return [row["event"] for row in reversed(result.data or [])]
+
+    def compact(self, keep_from):
+        self.client.table(STORY_EVENTS_TABLE).delete().eq("player_name", self.player_name).lt("seq", keep_from).execute()
+
+class StoryEvents:
+    """A player's story as an append-only event log
+
+    record() numbers new events and keeps the most recent ones; write()
+    appends to a log only the events it doesn't have yet, so a save costs
+    the same on turn 500 as on turn 1. Each kind of log (local, Supabase)
+    keeps its own position: an append that fails leaves that log behind
+    without costing any other log its events, and the next write catches
+    it up. Old events are compacted away in the background once a log has
+    grown by STORY_LOG_COMPACT_EVERY events.
+    """
+
+    def __init__(self, count=0):
+        self.count = count  # Events recorded so far; the next one gets this seq
+        self._records = []  # The last STORY_LOG_KEEP_EVENTS (seq, event) records
+        self._start = count  # Where logs are assumed to end until this object writes to them
+        self._written = {}  # log kind -> events that log holds
+        self._compacted_at = {}
+        self._lock = threading.Lock()
+
+    def record(self, events):
+        """Number and keep new events for the logs' next write()"""
+        with self._lock:
+            for event in events:
+                self._records.append((self.count, event))
+                self.count += 1
+            # A log further behind than this would compact the older events away anyway
+            del self._records[:-STORY_LOG_KEEP_EVENTS]
+
+    def written(self, kind):
+        """How many events the logs of this kind hold, as far as this object knows"""
+        with self._lock:
+            return self._written.get(kind, self._start)
+
+    def write(self, log, end=None):
+        """Append the events log is missing, up to seq `end` when given; returns how many events it now holds
+
+        Raises if the append fails; that log's position doesn't move, so
+        its events are written again next time.
+        """
+        with self._lock:
+            start = self._written.get(log.kind, self._start)
+            records = [
+                record for record in self._records
+                if record[0] >= start and (end is None or record[0] < end)
+            ]
+        if records:
+            log.append(records)
+
+        with self._lock:
+            written = max(self._written.get(log.kind, self._start), records[-1][0] + 1 if records else start)
+            self._written[log.kind] = written
+            compacted_at = self._compacted_at.get(log.kind, self._start)
+            due = written - compacted_at >= STORY_LOG_COMPACT_EVERY
+            if due:
+                self._compacted_at[log.kind] = written
+        if due:
+            _compact_executor.submit(self._compact, log, written - STORY_LOG_KEEP_EVENTS)
+        return written
+
+    def _compact(self, log, keep_from):
+        if keep_from <= 0:
+            return
+        try:
+            log.compact(keep_from)
+        except Exception as e:
+            print(f"Error compacting story log: {e}")
+
+def load_story_tail(log, count, end=None):
+    """Rebuild the last `count` events of a saved story, or [] if the log can't be read"""
+    try:
+        return log.tail(count, end)
+    except Exception as e:
+        print(f"Error reading story log: {e}")
+        return []
@@ -1,7 +1,15 @@
 
 import os
-import openai
 import re
+import sqlite3
+import time
+from llm_client import LOCAL_FALLBACK_ERRORS, create_chat_completion, stream_chat_completion
+from action_cache import get_action_cache
+from action_classifier import classify_action
+from action_model import log_analysis, predict_confident
+from procedural_encounters import generate_procedural_encounter
+from prompts import STORY_PROMPT, ANALYSIS_PROMPT, OUTCOME_PROMPT
+from response_parser import ANALYSIS_SCHEMA, STORY_SCHEMA, ResponseParser, parse_response
 
 # Get API key from environment
 openai_api_key = os.environ.get('OPENAI_API_KEY')
@@ -14,29 +22,34 @@ def analyze_player_action(action, player_stats):
         # Fallback analysis without AI
         return analyze_action_fallback(action, player_stats)
     
+    # Repeat actions at similar stat levels are answered from the disk cache
+    cache = get_action_cache()
+    if cache:
+        try:
+            cached = cache.get(action, player_stats)
+        except sqlite3.Error as e:
+            # A locked or damaged cache is just a miss
+            print(f"Action cache lookup failed: {e}")
+            cached = None
+        if cached:
+            return cached
+    
+    # Obvious actions are answered by the local model, ambiguous ones go to the LLM
+    prediction = predict_confident(action, player_stats)
+    if prediction:
+        return analysis_from_prediction(prediction, player_stats)
+    
     try:
-        client = openai.OpenAI(api_key=openai_api_key)
-        
-        prompt = f"""Analyze this player action for a dark fantasy RPG: "{action}"
-
-Player Stats:
-- Strength: {player_stats['Strength']}
-- Luck: {player_stats['Luck']}
-- Agility: {player_stats['Agility']}
-
-Determine:
-1. Primary stat needed (Strength, Luck, or Agility)
-2. Difficulty level (Easy, Medium, Hard, Very Hard)
-3. Brief outcome prediction based on player's stat level
-4. Any secondary stats that might help
-
-Respond in this exact format:
-PRIMARY_STAT: [stat name]
-DIFFICULTY: [difficulty level]
-PREDICTION: [2-3 sentence prediction]
-SECONDARY: [optional secondary stats, comma separated or "None"]"""
+        prompt = ANALYSIS_PROMPT.render(
+            action=action,
+            strength=player_stats['Strength'],
+            luck=player_stats['Luck'],
+            agility=player_stats['Agility']
+        )
         
-        response = client.chat.completions.create(
+        started = time.perf_counter()
+        response = create_chat_completion(
+            call_site="analysis",
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
@@ -44,8 +57,21 @@ SECONDARY: [optional secondary stats, comma separated or "None"]"""
         )
         
         analysis_text = response.choices[0].message.content
-        return parse_action_analysis(analysis_text, player_stats)
+        result = parse_response(ANALYSIS_SCHEMA, analysis_text)
+        analysis = result.value
+        if result.status != "fallback":
+            # Training data for the local action model
+            log_analysis(action, player_stats, analysis, time.perf_counter() - started)
+            # A malformed reply is not worth keeping for a week
+            if cache:
+                try:
+                    cache.put(action, player_stats, analysis)
+                except sqlite3.Error as e:
+                    print(f"Action cache write failed: {e}")
+        return analysis
         
+    except LOCAL_FALLBACK_ERRORS:
+        return analyze_action_fallback(action, player_stats)
     except Exception as e:
         print(f"Error analyzing action: {e}")
         return analyze_action_fallback(action, player_stats)
@@ -53,48 +79,46 @@ SECONDARY: [optional secondary stats, comma separated or "None"]"""
 def parse_action_analysis(analysis_text, player_stats):
     """Parse AI analysis response into structured data"""
     try:
-        lines = analysis_text.split('\n')
-        
-        primary_stat = "Luck"  # default
-        difficulty = "Medium"
-        prediction = "Unknown outcome"
-        secondary_stats = []
-        
-        for line in lines:
-            if line.startswith("PRIMARY_STAT:"):
-                primary_stat = line.split(":", 1)[1].strip()
-            elif line.startswith("DIFFICULTY:"):
-                difficulty = line.split(":", 1)[1].strip()
-            elif line.startswith("PREDICTION:"):
-                prediction = line.split(":", 1)[1].strip()
-            elif line.startswith("SECONDARY:"):
-                secondary_text = line.split(":", 1)[1].strip()
-                if secondary_text.lower() != "none":
-                    secondary_stats = [s.strip() for s in secondary_text.split(",")]
-        
-        return {
-            "primary_stat": primary_stat,
-            "difficulty": difficulty,
-            "outcome_prediction": prediction,
-            "secondary_stats": secondary_stats
-        }
+        return parse_response(ANALYSIS_SCHEMA, analysis_text).value
     except Exception as e:
         print(f"Error parsing analysis: {e}")
         return analyze_action_fallback("", player_stats)
 
+def analysis_from_prediction(prediction, player_stats):
+    """Build an analysis dict from a local model prediction"""
+    primary_stat = prediction["primary_stat"]
+    return {
+        "primary_stat": primary_stat,
+        "difficulty": prediction["difficulty"],
+        "outcome_prediction": describe_chances(primary_stat, player_stats.get(primary_stat, 5)),
+        "secondary_stats": [
+            stat for stat, probability in prediction["stat_probs"].items()
+            if stat != primary_stat and probability >= 0.25
+        ],
+        "confidence": prediction["stat_confidence"]
+    }
+
+def describe_chances(primary_stat, stat_value):
+    """One-line prediction from how high the relevant stat is"""
+    if stat_value >= 8:
+        return f"With your high {primary_stat} ({stat_value}), you have an excellent chance of success!"
+    elif stat_value >= 6:
+        return f"Your {primary_stat} ({stat_value}) gives you a good chance of success."
+    elif stat_value >= 4:
+        return f"Your {primary_stat} ({stat_value}) makes this challenging but possible."
+    else:
+        return f"With low {primary_stat} ({stat_value}), this action is quite risky."
+
 def analyze_action_fallback(action, player_stats):
     """Fallback action analysis without AI"""
-    action_lower = action.lower()
-    
-    # Determine primary stat based on keywords
-    if any(word in action_lower for word in ["fight", "attack", "punch", "strike", "force", "break", "smash", "lift", "push"]):
-        primary_stat = "Strength"
-    elif any(word in action_lower for word in ["dodge", "run", "quick", "fast", "escape", "sneak", "climb", "jump", "stealth"]):
-        primary_stat = "Agility"
-    elif any(word in action_lower for word in ["luck", "chance", "gamble", "risk", "try", "search", "find", "discover"]):
-        primary_stat = "Luck"
-    else:
-        primary_stat = "Luck"  # default
+    # Determine primary stat based on weighted keywords
+    classification = classify_action(action)
+    primary_stat = classification["primary_stat"]
+    top_score = classification["scores"][primary_stat]
+    secondary_stats = [
+        stat for stat, score in classification["scores"].items()
+        if stat != primary_stat and score and score >= top_score / 2
+    ]
     
     # Determine difficulty
     if len(action.split()) <= 2:
@@ -107,37 +131,25 @@ def analyze_action_fallback(action, player_stats):
     stat_value = player_stats.get(primary_stat, 5)
     
     # Generate prediction
-    if stat_value >= 8:
-        prediction = f"With your high {primary_stat} ({stat_value}), you have an excellent chance of success!"
-    elif stat_value >= 6:
-        prediction = f"Your {primary_stat} ({stat_value}) gives you a good chance of success."
-    elif stat_value >= 4:
-        prediction = f"Your {primary_stat} ({stat_value}) makes this challenging but possible."
-    else:
-        prediction = f"With low {primary_stat} ({stat_value}), this action is quite risky."
+    prediction = describe_chances(primary_stat, stat_value)
     
     return {
         "primary_stat": primary_stat,
         "difficulty": difficulty,
         "outcome_prediction": prediction,
-        "secondary_stats": []
+        "secondary_stats": secondary_stats,
+        "confidence": classification["confidence"]
     }
 
-def process_choice(player_name, choice, player_stats=None):
-    """Process player's choice and return result using OpenAI API with stat-based outcomes"""
+def roll_for_choice(choice, player_stats=None):
+    """Pick the stat a choice uses and roll 1d20 + stat for it"""
     import random
     
     if not player_stats:
         player_stats = {"Strength": 5, "Luck": 5, "Agility": 5}
     
     # Determine which stat to use based on choice keywords
-    stat_used = "Luck"  # default
-    if any(word in choice.lower() for word in ["fight", "attack", "punch", "strike", "force"]):
-        stat_used = "Strength"
-    elif any(word in choice.lower() for word in ["dodge", "run", "quick", "fast", "escape", "sneak"]):
-        stat_used = "Agility"
-    elif any(word in choice.lower() for word in ["luck", "chance", "gamble", "risk", "try"]):
-        stat_used = "Luck"
+    stat_used = classify_action(choice)["primary_stat"]
     
     # Roll dice (1d20 + stat)
     dice_roll = random.randint(1, 20)
@@ -156,42 +168,105 @@ def process_choice(player_name, choice, player_stats=None):
     else:
         success_level = "failure"
     
+    return {
+        "stat_used": stat_used,
+        "dice_roll": dice_roll,
+        "stat_bonus": stat_bonus,
+        "total_roll": total_roll,
+        "success_level": success_level
+    }
+
+def describe_roll(choice, roll):
+    """Summarize a roll result as story context for the next scene"""
+    return (f"The player just chose to '{choice}' using {roll['stat_used']} "
+            f"(rolled {roll['dice_roll']} + {roll['stat_bonus']} = {roll['total_roll']}), "
+            f"a {roll['success_level'].replace('_', ' ')}.")
+
+def fallback_outcome(player_name, choice, roll):
+    """Canned outcome narration used without the API"""
+    stat_used = roll["stat_used"]
+    success_level = roll["success_level"]
+    roll_text = f"\n🎲 Rolling {stat_used}: {roll['dice_roll']} + {roll['stat_bonus']} = {roll['total_roll']}"
+    
+    if success_level == "critical_success":
+        return f"{player_name} {choice.lower()}s with incredible success! The outcome exceeds all expectations.{roll_text}"
+    elif success_level == "great_success":
+        return f"{player_name} {choice.lower()}s very successfully! Everything goes better than planned.{roll_text}"
+    elif success_level == "success":
+        return f"{player_name} {choice.lower()}s successfully and continues the adventure.{roll_text}"
+    elif success_level == "partial_success":
+        return f"{player_name} {choice.lower()}s with mixed results. There are both benefits and drawbacks.{roll_text}"
+    else:
+        return f"{player_name} {choice.lower()}s but things don't go as planned. The situation becomes more challenging.{roll_text}"
+
+def build_outcome_prompt(choice, roll):
+    """Prompt for narrating the outcome of a rolled choice"""
+    return OUTCOME_PROMPT.render(choice=choice, **roll)
+
+def outcome_roll_text(roll):
+    """Roll summary appended to AI outcome narration"""
+    return f"\n\n🎲 **{roll['stat_used']} Roll:** {roll['dice_roll']} + {roll['stat_bonus']} = {roll['total_roll']} ({roll['success_level'].replace('_', ' ').title()})"
+
+def process_choice(player_name, choice, player_stats=None, roll=None):
+    """Process player's choice and return result using OpenAI API with stat-based outcomes"""
+    if roll is None:
+        roll = roll_for_choice(choice, player_stats)
+    
     if not openai_api_key:
         # Fallback responses with roll results
-        roll_text = f"\n🎲 Rolling {stat_used}: {dice_roll} + {stat_bonus} = {total_roll}"
-        
-        if success_level == "critical_success":
-            return f"{player_name} {choice.lower()}s with incredible success! The outcome exceeds all expectations.{roll_text}"
-        elif success_level == "great_success":
-            return f"{player_name} {choice.lower()}s very successfully! Everything goes better than planned.{roll_text}"
-        elif success_level == "success":
-            return f"{player_name} {choice.lower()}s successfully and continues the adventure.{roll_text}"
-        elif success_level == "partial_success":
-            return f"{player_name} {choice.lower()}s with mixed results. There are both benefits and drawbacks.{roll_text}"
-        else:
-            return f"{player_name} {choice.lower()}s but things don't go as planned. The situation becomes more challenging.{roll_text}"
+        return fallback_outcome(player_name, choice, roll)
     
     try:
-        client = openai.OpenAI(api_key=openai_api_key)
-        prompt = f"You are Zachor, a dark fantasy protagonist. You chose to '{choice}' using your {stat_used} (rolled {dice_roll} + {stat_bonus} = {total_roll}). This was a {success_level}. Continue the story in a dark fantasy tone with 2-3 sentences, incorporating the roll result and success level. Include the roll information at the end."
-        
-        response = client.chat.completions.create(
+        response = create_chat_completion(
+            call_site="outcome",
             model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
+            messages=[{"role": "user", "content": build_outcome_prompt(choice, roll)}],
             temperature=0.8,
             max_tokens=200
         )
         
         result = response.choices[0].message.content
-        roll_text = f"\n\n🎲 **{stat_used} Roll:** {dice_roll} + {stat_bonus} = {total_roll} ({success_level.replace('_', ' ').title()})"
-        
-        return result + roll_text
+        return result + outcome_roll_text(roll)
         
+    except LOCAL_FALLBACK_ERRORS:
+        return fallback_outcome(player_name, choice, roll)
     except Exception as e:
         print(f"Error processing choice: {e}")
-        roll_text = f"\n🎲 Rolling {stat_used}: {dice_roll} + {stat_bonus} = {total_roll}"
+        roll_text = f"\n🎲 Rolling {roll['stat_used']}: {roll['dice_roll']} + {roll['stat_bonus']} = {roll['total_roll']}"
         return f"{player_name} {choice.lower()}s and continues the adventure...{roll_text}"
 
+def process_choice_stream(player_name, choice, player_stats=None, roll=None):
+    """Streaming version of process_choice: yields the outcome text in chunks"""
+    if roll is None:
+        roll = roll_for_choice(choice, player_stats)
+    
+    if not openai_api_key:
+        yield fallback_outcome(player_name, choice, roll)
+        return
+    
+    streamed = False
+    try:
+        for text in stream_completion_text(
+            "outcome",
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": build_outcome_prompt(choice, roll)}],
+            temperature=0.8,
+            max_tokens=200
+        ):
+            streamed = True
+            yield text
+        yield outcome_roll_text(roll)
+        
+    except LOCAL_FALLBACK_ERRORS:
+        yield fallback_outcome(player_name, choice, roll)
+    except Exception as e:
+        print(f"Error processing choice: {e}")
+        roll_text = f"\n🎲 Rolling {roll['stat_used']}: {roll['dice_roll']} + {roll['stat_bonus']} = {roll['total_roll']}"
+        if streamed:
+            yield roll_text
+        else:
+            yield f"{player_name} {choice.lower()}s and continues the adventure...{roll_text}"
+
 def display_stat_bars(player_stats, health, points):
     """Display visual stat bars in console format"""
     print("=" * 50)
@@ -304,10 +379,70 @@ def display_action_analysis_with_bars(action, player_stats, health, points):
     print(f"Success Est: [{success_bar}] {success_percentage:.1f}%")
     print("=" * 60)
 
-def generate_ai_story(player_name, player_stats=None, story_history=None, current_context=""):
-    """Generate AI story using OpenAI API with context"""
+# Choices used when the model's reply can't be split into story + choices
+DEFAULT_STORY_CHOICES = STORY_SCHEMA.defaults["choices"]
+
+def fallback_story(player_name, player_stats=None, location="jungle", scene_index=None):
+    """Procedural story segment used without the AI, or when it fails or can't answer in time
+
+    With the player's scene_index, scenes they have already seen are redrawn.
+    """
+    encounter = generate_procedural_encounter(player_stats, location=location, scene_index=scene_index)
+    return encounter["scene"], encounter["choices"]
+
+def avoid_repeated_scene(player_name, player_stats, story, choices, scene_index, location="jungle"):
+    """Return the (story, choices) to show, swapping a near-repeat of an earlier scene for a procedural one
+
+    The shown scene is added to the player's scene index.
+    """
+    if scene_index is None:
+        return story, choices
+    if scene_index.check(story):
+        print("🔁 Scene repeats an earlier one, using a procedural scene instead")
+        story, choices = fallback_story(player_name, player_stats, location, scene_index)
+    scene_index.add(story)
+    return story, choices
+
+def build_story_messages(player_name, player_stats, story_history, current_context="", story_summary=""):
+    """Build the chat messages for the next story segment"""
+    # Build context from story history
+    context_text = ""
+    if story_summary:
+        # Older events, folded into a running summary by history.HistoryCompactor
+        context_text += f"\n\nThe story so far: {story_summary}"
+    if story_history:
+        recent_events = story_history[-6:]  # Last 6 events for context
+        context_text += f"\n\nRecent events in the story:\n" + "\n".join(recent_events)
+    
+    # Fold in what just happened this turn (e.g. a roll computed locally)
+    if current_context:
+        context_text += f"\n\nWhat just happened: {current_context}\nOpen the new scene with the consequences of this outcome."
+    
+    return STORY_PROMPT.messages(
+        player_name=player_name,
+        strength=player_stats['Strength'],
+        luck=player_stats['Luck'],
+        agility=player_stats['Agility'],
+        context=context_text
+    )
+
+def split_story_choices(story_text):
+    """Split a story reply into (main_story, choices)
+
+    Falls back to the full text with stat-based default choices when fewer
+    than three choices can be recovered.
+    """
+    result = parse_response(STORY_SCHEMA, story_text).value
+    return result["story"], result["choices"]
+
+def generate_ai_story(player_name, player_stats=None, story_history=None, current_context="", story_summary="", scene_index=None):
+    """Generate AI story using OpenAI API with context
+
+    With a scene_index, a story that repeats a scene the player has seen is
+    written once more before falling back to a procedural scene.
+    """
     if not openai_api_key:
-        return "No AI story available - API key not configured", ["Continue on your own", "Explore the area", "Rest"]
+        return fallback_story(player_name, player_stats, scene_index=scene_index)
     
     if not player_stats:
         player_stats = {"Strength": 5, "Luck": 5, "Agility": 5}
@@ -316,74 +451,115 @@ def generate_ai_story(player_name, player_stats=None, story_history=None, curren
         story_history = []
     
     try:
-        client = openai.OpenAI(api_key=openai_api_key)
-        
-        # Build context from story history
-        context_text = ""
-        if story_history:
-            recent_events = story_history[-6:]  # Last 6 events for context
-            context_text = f"\n\nRecent events in the story:\n" + "\n".join(recent_events)
-        
-        # Build stats context
-        stats_text = f"\nPlayer Stats - Strength: {player_stats['Strength']}, Luck: {player_stats['Luck']}, Agility: {player_stats['Agility']}"
-        
-        # Create dynamic prompt based on context
-        prompt = f"""You are an AI storyteller for Zachor, a dark fantasy text adventure. The protagonist is {player_name}.
+        response = create_chat_completion(
+            call_site="story",
+            model="gpt-4o",
+            messages=build_story_messages(player_name, player_stats, story_history, current_context, story_summary),
+            temperature=0.9,
+            max_tokens=400
+        )
 
-LORE CONTEXT: Zachor was switched at birth - a noble child raised in the brutal Mine of Slokia. After surviving a dragon attack, he found himself in a mysterious jungle with shifting paths and magical creatures. He has an inner power called "Hollow Flame" and his true noble heritage awaits discovery.
+        story_text = response.choices[0].message.content
+        story, choices = split_story_choices(story_text)
+        if scene_index is not None and scene_index.is_repeat(story):
+            return regenerate_repeated_story(
+                player_name, player_stats, story_history, current_context, story_summary, scene_index, story
+            )
+        return story, choices
+    
+    except LOCAL_FALLBACK_ERRORS:
+        return fallback_story(player_name, player_stats, scene_index=scene_index)
+    except Exception as e:
+        print(f"Error generating AI story: {e}")
+        return fallback_story(player_name, player_stats, scene_index=scene_index)
 
-{stats_text}
-{context_text}
+def regenerate_repeated_story(player_name, player_stats, story_history, current_context, story_summary, scene_index, repeated):
+    """Write a story again after it repeated an earlier scene; a procedural scene if it repeats again"""
+    scene_index.record_regenerated()
+    print("🔁 Story repeats an earlier scene, writing it again")
+    messages = build_story_messages(player_name, player_stats, story_history, current_context, story_summary)
+    messages[-1]["content"] += f"\n\nThe player has already seen this scene, write a different one: {repeated[:300]}"
+    response = create_chat_completion(
+        call_site="story",
+        model="gpt-4o",
+        messages=messages,
+        temperature=1.0,
+        max_tokens=400
+    )
+    story, choices = split_story_choices(response.choices[0].message.content)
+    if scene_index.is_repeat(story):
+        return fallback_story(player_name, player_stats, scene_index=scene_index)
+    return story, choices
 
-Generate a NEW story continuation that:
-1. Follows logically from recent events
-2. Introduces fresh challenges/encounters (never repeat scenarios)
-3. Creates 3 unique choices that utilize different stats
-4. Uses vivid, dark fantasy descriptions
-5. Advances the overarching narrative toward the jungle's heart
+class StoryStream:
+    """Iterates over story text as it streams in; .story and .choices are set once it finishes
 
-Make each choice distinctly different:
-- One should favor Strength (combat/force)
-- One should favor Luck (chance/discovery) 
-- One should favor Agility (speed/stealth)
+    The chunks go through the shared response parser, which holds back
+    lines that might be a numbered choice until they are complete, so only
+    the story body is yielded. The (story, choices) fallback is used when
+    there are no chunks, or the stream fails before any text arrives.
+    """
 
-Format: Story description first, then exactly:
-1. [Strength-based choice]
-2. [Luck-based choice] 
-3. [Agility-based choice]
+    def __init__(self, chunks=None, fallback=None):
+        self._chunks = chunks
+        self._fallback = fallback
+        self.story = ""
+        self.choices = []
+        self.done = False
 
-Make this story segment completely unique - no repeated encounters or generic scenarios."""
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a creative dark fantasy storyteller who creates unique, non-repetitive adventures with meaningful stat-based choices."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.9,
-            max_tokens=400
-        )
+    def _use_fallback(self):
+        self.story, self.choices = self._fallback[0], list(self._fallback[1])
+        self.done = True
+        return self.story
 
-        story_text = response.choices[0].message.content
+    def __iter__(self):
+        if self._chunks is None:
+            yield self._use_fallback()
+            return
 
-        # Parse the story text to extract main story and choices
-        if story_text and "1." in story_text and "2." in story_text and "3." in story_text:
-            parts = story_text.split("\n")
-            main_story = "\n".join(part for part in parts if not part.strip().startswith(("1.", "2.", "3.")))
-            choices = [line.split(".", 1)[1].strip() for line in parts if line.strip().startswith(("1.", "2.", "3."))]
-            return main_story.strip(), choices[:3]  # Ensure only 3 choices
-        else:
-            # If parsing fails, return the full text with stat-based default choices
-            return story_text or "Adventure awaits...", [
-                "Use brute force to overcome the obstacle",
-                "Trust in fate and take a risky chance", 
-                "Use speed and cunning to find another way"
-            ]
+        parser = ResponseParser(STORY_SCHEMA)
+        received = False
+        try:
+            for chunk in self._chunks:
+                received = True
+                text = parser.feed(chunk)
+                if text:
+                    yield text
+        except LOCAL_FALLBACK_ERRORS:
+            # Raised before the API call, so nothing has been received yet
+            yield self._use_fallback()
+            return
+        except Exception as e:
+            print(f"Error streaming AI story: {e}")
+            if not received:
+                yield self._use_fallback()
+                return
+
+        tail = parser.close()
+        if tail:
+            yield tail
+        result = parser.finish().value
+        self.story, self.choices = result["story"], result["choices"]
+        self.done = True
+
+def stream_completion_text(call_site, **kwargs):
+    """Yield the text deltas of a streamed chat completion"""
+    for chunk in stream_chat_completion(call_site=call_site, **kwargs):
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def generate_ai_story_stream(player_name, player_stats=None, story_history=None, current_context="", story_summary=""):
+    """Streaming version of generate_ai_story: returns a StoryStream of text chunks"""
+    if not player_stats:
+        player_stats = {"Strength": 5, "Luck": 5, "Agility": 5}
     
-    except Exception as e:
-        print(f"Error generating AI story: {e}")
-        return "No AI story available - API error occurred", [
-            "Press forward with determination",
-            "Search for hidden opportunities", 
-            "Move quickly and quietly"
-        ]
+    if not openai_api_key:
+        return StoryStream(fallback=fallback_story(player_name, player_stats))
+    
+    return StoryStream(stream_completion_text(
+        "story",
+        model="gpt-4o",
+        messages=build_story_messages(player_name, player_stats, story_history or [], current_context, story_summary),
+        temperature=0.9,
+        max_tokens=400
+    ), fallback=fallback_story(player_name, player_stats))
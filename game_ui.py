@@ -2,26 +2,35 @@
 import streamlit as st
 import json
 import os
-from game_engine import display_stat_bars, display_action_analysis_with_bars
+import time
+from save_store import STREAMLIT_GAME, get_save_store, player_key
+from telemetry import get_telemetry, load_events, summarize
 
 def load_game_stats(player_name=None):
     """Load player stats from saved game or return defaults"""
     if player_name:
-        # Try to load from saved game file
-        filename = f"streamlit_save_{player_name.lower().replace(' ', '_')}.json"
-        if os.path.exists(filename):
+        try:
+            # Only the stats section of the save is decoded, not the story
+            save_data = get_save_store().load(STREAMLIT_GAME, player_name, sections=("stats",))
+        except Exception as e:
+            print(f"Error reading local saves: {e}")
+            save_data = None
+        # Saves from before the save database are one JSON file per player
+        filename = f"streamlit_save_{player_key(player_name)}.json"
+        if save_data is None and os.path.exists(filename):
             try:
                 with open(filename, "r") as file:
                     save_data = json.load(file)
-                return {
-                    "player_name": save_data.get("player_name", player_name),
-                    "health": save_data.get("character_health", 100),
-                    "points": save_data.get("character_points", 0),
-                    "player_class": save_data.get("player_class", "Unknown"),
-                    "stats": save_data.get("player_stats", {"Strength": 5, "Luck": 5, "Agility": 5})
-                }
             except:
                 pass
+        if save_data is not None:
+            return {
+                "player_name": save_data.get("player_name", player_name),
+                "health": save_data.get("character_health", 100),
+                "points": save_data.get("character_points", 0),
+                "player_class": save_data.get("player_class", "Unknown"),
+                "stats": save_data.get("player_stats", {"Strength": 5, "Luck": 5, "Agility": 5})
+            }
     
     # Default stats if no save found
     return {
@@ -68,6 +77,89 @@ def display_stat_bar_ui(stat_name, stat_value, max_stat=10):
     with col2:
         st.write(f"{stat_value}/{max_stat}")
 
+def display_service_health():
+    """Show the OpenAI circuit breaker state"""
+    from circuit_breaker import breaker_stats
+
+    health = breaker_stats()
+    labels = {"closed": "🟢 Closed", "half_open": "🟡 Half-open (probing)", "open": "🔴 Open"}
+    
+    st.write("### AI Service Health")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Circuit", labels.get(health["state"], health["state"]))
+    with col2:
+        st.metric("Failure Rate", f"{health['failure_rate']:.0%}", help=f"{health['failures']} of {health['calls']} recent calls")
+    with col3:
+        st.metric("Trips", health["trips"])
+    with col4:
+        st.metric("Local Fallbacks", health["rejected"], help="Calls answered locally while the circuit was open")
+    
+    if health["state"] == "open":
+        st.warning(f"OpenAI is failing - using local fallbacks, retrying in {health['retry_in']:.0f}s")
+    if health["last_error"]:
+        st.caption(f"Last error: {health['last_error']}")
+
+def display_telemetry_summary():
+    """LLM call latency, token usage and parse outcomes from the telemetry log"""
+    import pandas as pd
+    
+    st.title("📈 LLM Telemetry")
+    
+    # The log is rotated and only its tail is read, so "All recent" stops at the newest few MB
+    windows = {"Last hour": 3600, "Last 24 hours": 24 * 3600, "All recent": None}
+    window = st.selectbox("Time range:", list(windows))
+    since = time.time() - windows[window] if windows[window] else None
+    
+    # Include this process's own calls, then read everything that has been flushed
+    telemetry = get_telemetry()
+    telemetry.flush()
+    events = load_events(telemetry.path, since=since) if telemetry.path else []
+    summary = summarize(events) if telemetry.path else telemetry.summary()
+    
+    if not summary:
+        st.info("No LLM calls recorded yet. Play a few turns in `app.py` and refresh.")
+        return
+    
+    calls = sum(row["calls"] for row in summary.values())
+    tokens = sum(row["prompt_tokens"] + row["completion_tokens"] for row in summary.values())
+    parsed = sum(sum(row["parse"].values()) for row in summary.values())
+    fallbacks = sum(row["parse"]["fallback"] for row in summary.values())
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Calls", calls)
+    with col2:
+        st.metric("Errors", sum(row["errors"] for row in summary.values()))
+    with col3:
+        st.metric("Tokens", f"{tokens:,}")
+    with col4:
+        st.metric("Parse Fallbacks", f"{fallbacks / parsed:.1%}" if parsed else "-")
+    
+    st.write("### By Call Site")
+    st.dataframe(pd.DataFrame([
+        {
+            "call site / model": key,
+            "calls": row["calls"],
+            "errors": row["errors"],
+            "skipped": row["skipped"],
+            "p50 ms": row["p50_ms"],
+            "p95 ms": row["p95_ms"],
+            "p99 ms": row["p99_ms"],
+            "first token p50 ms": row["first_token_p50_ms"],
+            "avg tokens": round(row["avg_tokens"]),
+            "parse ok / repaired / fallback": "{ok} / {repaired} / {fallback}".format(**row["parse"])
+        }
+        for key, row in summary.items()
+    ]), hide_index=True)
+    
+    st.write("### Latency Histogram")
+    key = st.selectbox("Call site:", list(summary))
+    buckets = summary[key]["histogram"]
+    if buckets:
+        st.bar_chart(pd.DataFrame({"calls": [count for _, count in buckets]}, index=[bound for bound, _ in buckets]))
+        st.caption("Calls per latency bucket; each bar is labelled with its upper bound in ms.")
+
 def main():
     st.set_page_config(
         page_title="Zachor: Character Stats",
@@ -75,6 +167,11 @@ def main():
         layout="wide"
     )
     
+    page = st.sidebar.radio("Page", ["Character Stats", "LLM Telemetry"])
+    if page == "LLM Telemetry":
+        display_telemetry_summary()
+        return
+    
     st.title("⚔️ Zachor: Echoes of the Hollow")
     st.subheader("Character Status Dashboard")
     
@@ -126,6 +223,8 @@ def main():
             # Capture the output of the game engine function
             import io
             from contextlib import redirect_stdout
+            # The game engine (and the LLM client behind it) loads only when a tool is used
+            from game_engine import display_stat_bars
             
             output = io.StringIO()
             with redirect_stdout(output):
@@ -148,6 +247,7 @@ def main():
         with st.expander("Analysis Results", expanded=True):
             import io
             from contextlib import redirect_stdout
+            from game_engine import display_action_analysis_with_bars
             
             output = io.StringIO()
             with redirect_stdout(output):
@@ -156,6 +256,9 @@ def main():
             analysis_output = output.getvalue()
             st.code(analysis_output, language=None)
     
+    st.write("---")
+    display_service_health()
+    
     # Refresh button
     if st.button("🔄 Refresh Stats"):
         st.rerun()
@@ -0,0 +1,111 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import game_engine
+from llm_client import create_chat_completion
+from prompts import SUMMARY_PROMPT
+from scheduler import background_worker
+
+# Events kept verbatim in prompts; older ones are folded into the summary
+HISTORY_TAIL_EVENTS = int(os.getenv("HISTORY_TAIL_EVENTS", "6"))
+# Fold as soon as a turn (two events) falls out of the verbatim tail
+HISTORY_FOLD_BATCH = int(os.getenv("HISTORY_FOLD_BATCH", "2"))
+# Hard cap on the running summary, so prompts stay at a fixed size
+SUMMARY_CHAR_LIMIT = int(os.getenv("SUMMARY_CHAR_LIMIT", "1200"))
+
+# One background worker folds summaries in order
+_summary_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="summary", initializer=background_worker
+)
+
+# Finished folds keyed by (previous summary, folded events), so reloading a
+# save or retrying a fold never pays for the same summary twice
+_summary_cache = OrderedDict()
+_summary_cache_lock = threading.Lock()
+SUMMARY_CACHE_SIZE = 256
+
+def _fold_key(summary, events):
+    digest = hashlib.sha1(summary.encode("utf-8"))
+    for event in events:
+        digest.update(b"\x1f")
+        digest.update(event.encode("utf-8"))
+    return digest.hexdigest()
+
+def fallback_summary(summary, events):
+    """Local summary without the API: first sentence of each event, newest kept"""
+    sentences = []
+    for event in events:
+        first = event.strip().split("\n", 1)[0]
+        first = first.split(". ", 1)[0].strip()
+        if first:
+            sentences.append(first.rstrip(".") + ".")
+    combined = " ".join(filter(None, [summary] + sentences))
+    return combined[-SUMMARY_CHAR_LIMIT:]
+
+def summarize_events(summary, events):
+    """Fold events into the running summary, using the LLM when available"""
+    key = _fold_key(summary, events)
+    with _summary_cache_lock:
+        if key in _summary_cache:
+            _summary_cache.move_to_end(key)
+            return _summary_cache[key]
+
+    new_summary = None
+    if game_engine.openai_api_key:
+        try:
+            response = create_chat_completion(
+                call_site="summary",
+                model="gpt-4o-mini",
+                messages=SUMMARY_PROMPT.messages(
+                    summary=summary or "(nothing yet)",
+                    events="\n".join(events)
+                ),
+                temperature=0.2,
+                max_tokens=250
+            )
+            new_summary = (response.choices[0].message.content or "").strip()[:SUMMARY_CHAR_LIMIT]
+        except Exception as e:
+            print(f"Error summarizing story history: {e}")
+
+    if not new_summary:
+        new_summary = fallback_summary(summary, events)
+
+    with _summary_cache_lock:
+        _summary_cache[key] = new_summary
+        while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+    return new_summary
+
+class HistoryCompactor:
+    """Keeps story_history bounded by folding older events into a running summary
+
+    Folds run on a background thread. The caller applies a finished fold with
+    compact(), which drops the folded events from the front of the history.
+    """
+
+    def __init__(self, summary=""):
+        self.summary = summary or ""
+        self._pending = None  # (folded event count, future)
+        self._lock = threading.Lock()
+
+    def compact(self, story_history):
+        """Apply any finished fold and start a new one if needed; returns the trimmed history"""
+        with self._lock:
+            if self._pending and self._pending[1].done():
+                folded, future = self._pending
+                self._pending = None
+                try:
+                    self.summary = future.result()
+                    story_history = story_history[folded:]
+                except Exception as e:
+                    print(f"Error compacting story history: {e}")
+
+            foldable = len(story_history) - HISTORY_TAIL_EVENTS
+            if self._pending is None and foldable >= HISTORY_FOLD_BATCH:
+                events = list(story_history[:foldable])
+                self._pending = (foldable, _summary_executor.submit(summarize_events, self.summary, events))
+
+        return story_history
@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from circuit_breaker import CircuitOpenError, get_breaker
+from model_router import LatencyBudgetExceeded, get_router
+from prompts import record_usage
+from scheduler import get_scheduler
+from telemetry import get_telemetry
+
+# Shared OpenAI client configuration (override via environment)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+OPENAI_POOL_SIZE = int(os.getenv("OPENAI_POOL_SIZE", "10"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+# The scheduler retries through the rate limiter, so the SDK's own retries are off by default
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "0"))
+
+# Per-call timeouts in seconds, keyed by call site
+CALL_TIMEOUTS = {
+    "story": float(os.getenv("OPENAI_STORY_TIMEOUT", "30")),
+    "outcome": float(os.getenv("OPENAI_OUTCOME_TIMEOUT", "15")),
+    "analysis": float(os.getenv("OPENAI_ANALYSIS_TIMEOUT", "10")),
+    "encounter": float(os.getenv("OPENAI_ENCOUNTER_TIMEOUT", "30")),
+    "encounter_batch": float(os.getenv("OPENAI_ENCOUNTER_BATCH_TIMEOUT", "60")),
+    "summary": float(os.getenv("OPENAI_SUMMARY_TIMEOUT", "30")),
+}
+
+# Raised instead of calling the API; callers answer with their local fallback
+LOCAL_FALLBACK_ERRORS = (LatencyBudgetExceeded, CircuitOpenError)
+
+# One client per (api_key, base_url), shared by every thread in the process
+_clients = {}
+_clients_lock = threading.Lock()
+
+def _build_client(api_key, base_url):
+    """Create an OpenAI client backed by a keep-alive connection pool"""
+    import httpx
+    import openai
+
+    http_client = openai.DefaultHttpxClient(
+        limits=httpx.Limits(
+            max_connections=OPENAI_POOL_SIZE,
+            max_keepalive_connections=OPENAI_POOL_SIZE,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY
+        ),
+        timeout=OPENAI_TIMEOUT
+    )
+    return openai.OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=http_client,
+        timeout=OPENAI_TIMEOUT,
+        max_retries=OPENAI_MAX_RETRIES
+    )
+
+def get_openai_client(api_key=None, base_url=None):
+    """Return the shared OpenAI client, creating it on first use
+
+    A client that has been closed (e.g. by a shutdown hook) is rebuilt
+    rather than handed out.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = base_url or OPENAI_BASE_URL
+    key = (api_key, base_url)
+
+    client = _clients.get(key)
+    if client is not None and not client.is_closed():
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed():
+            client = _build_client(api_key, base_url)
+            _clients[key] = client
+    return client
+
+def _client_for_call(call_site, timeout, api_key):
+    """Shared client with the timeout for this call site applied"""
+    client = get_openai_client(api_key)
+
+    if timeout is None:
+        timeout = CALL_TIMEOUTS.get(call_site)
+    if timeout is not None:
+        client = client.with_options(timeout=timeout)
+    return client
+
+def estimate_tokens(kwargs):
+    """Rough token cost of a request: prompt characters / 4 plus the completion cap"""
+    prompt_chars = sum(len(message.get("content") or "") for message in kwargs.get("messages", []))
+    return prompt_chars // 4 + (kwargs.get("max_tokens") or 512)
+
+def coalescing_key(call_site, api_key, kwargs):
+    """Identical requests share one in-flight call"""
+    payload = json.dumps([call_site, api_key, kwargs], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def _apply_route(call_site, kwargs):
+    """Let the model router pick model and max_tokens; raises LatencyBudgetExceeded to degrade"""
+    router = get_router()
+    model, max_tokens = router.route(call_site, kwargs.get("model"), kwargs.get("max_tokens"))
+    if model is not None:
+        kwargs["model"] = model
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    return router
+
+def _is_slow_failure(error):
+    """Timeouts count against a model's latency, other failures say nothing about it"""
+    import openai
+
+    return isinstance(error, openai.APITimeoutError)
+
+def _record_call(call_site, kwargs, seconds, usage=None, error=None, first_token=None, streamed=False):
+    """Send one call's outcome to the telemetry recorder"""
+    if error is None:
+        status = "ok"
+    elif isinstance(error, LOCAL_FALLBACK_ERRORS):
+        status = "skipped"
+    else:
+        status = "error"
+    get_telemetry().record_call(
+        call_site, kwargs.get("model"), seconds, usage=usage, status=status, error=error,
+        first_token=first_token, streamed=streamed
+    )
+
+def create_chat_completion(call_site=None, timeout=None, api_key=None, priority=None, **kwargs):
+    """Run a chat completion on the shared client through the rate-limit scheduler
+
+    Raises one of LOCAL_FALLBACK_ERRORS without calling the API when no
+    model for this call site is expected to meet its latency SLO, or while
+    the circuit breaker is open.
+    """
+    requested = time.perf_counter()
+    billed = []  # Usage of the call this request made; coalesced requests made none
+    try:
+        router = _apply_route(call_site, kwargs)
+        breaker = get_breaker()
+        client = _client_for_call(call_site, timeout, api_key)
+        scheduler = get_scheduler()
+        estimated = estimate_tokens(kwargs)
+
+        def call():
+            # Checked per attempt, so retries stop as soon as the breaker opens
+            breaker.before_call()
+            started = time.perf_counter()
+            try:
+                response = client.chat.completions.create(**kwargs)
+            except Exception as e:
+                breaker.record(e)
+                if _is_slow_failure(e):
+                    router.observe(call_site, kwargs.get("model"), kwargs.get("max_tokens"), time.perf_counter() - started)
+                raise
+            breaker.record_success()
+            router.observe(call_site, kwargs.get("model"), kwargs.get("max_tokens"), time.perf_counter() - started)
+            usage = getattr(response, "usage", None)
+            billed.append(usage)
+            record_usage(call_site, usage)
+            if usage is not None and usage.total_tokens:
+                scheduler.settle(estimated, usage.total_tokens)
+            return response
+
+        response = scheduler.run(
+            call, tokens=estimated, priority=priority,
+            key=coalescing_key(call_site, api_key, kwargs)
+        )
+    except Exception as e:
+        _record_call(call_site, kwargs, time.perf_counter() - requested, error=e)
+        raise
+    _record_call(call_site, kwargs, time.perf_counter() - requested, usage=billed[-1] if billed else None)
+    return response
+
+def stream_chat_completion(call_site=None, timeout=None, api_key=None, priority=None, **kwargs):
+    """Run a streamed chat completion on the shared client, yielding chunks as they arrive
+
+    Only opening the stream is retried; a stream that fails part-way raises.
+    Raises one of LOCAL_FALLBACK_ERRORS on first iteration, before any API
+    call, when no model is expected to meet the call site's SLO or while the
+    circuit breaker is open.
+    """
+    requested = time.perf_counter()
+    usage = None
+    first_token = None
+    failure = None
+    try:
+        router = _apply_route(call_site, kwargs)
+        breaker = get_breaker()
+        client = _client_for_call(call_site, timeout, api_key)
+        scheduler = get_scheduler()
+        estimated = estimate_tokens(kwargs)
+        kwargs.setdefault("stream_options", {"include_usage": True})
+        started = None
+
+        def open_stream():
+            nonlocal started
+            breaker.before_call()
+            # Time from the accepted attempt, not the rate-limit wait before it
+            started = time.perf_counter()
+            try:
+                return client.chat.completions.create(stream=True, **kwargs)
+            except Exception as e:
+                breaker.record(e)
+                if _is_slow_failure(e):
+                    router.observe(call_site, kwargs.get("model"), kwargs.get("max_tokens"), time.perf_counter() - started)
+                raise
+
+        stream = scheduler.run(open_stream, tokens=estimated, priority=priority)
+    except Exception as e:
+        _record_call(call_site, kwargs, time.perf_counter() - requested, error=e, streamed=True)
+        raise
+
+    completed = False
+    try:
+        for chunk in stream:
+            if first_token is None and chunk.choices and chunk.choices[0].delta.content:
+                first_token = time.perf_counter() - requested
+            # The final chunk carries token usage and no choices
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+                record_usage(call_site, usage)
+                if usage.total_tokens:
+                    scheduler.settle(estimated, usage.total_tokens)
+            yield chunk
+        completed = True
+    except Exception as e:
+        failure = e
+        if _is_slow_failure(e):
+            router.observe(call_site, kwargs.get("model"), kwargs.get("max_tokens"), time.perf_counter() - started)
+        raise
+    finally:
+        # Hand the connection back to the pool even if the caller stops early
+        stream.close()
+        # A stream the caller abandoned was still answering
+        if failure is None:
+            breaker.record_success()
+        else:
+            breaker.record(failure)
+        _record_call(
+            call_site, kwargs, time.perf_counter() - requested, usage=usage, error=failure,
+            first_token=first_token, streamed=True
+        )
+    if completed:
+        # Whole-stream time, so the router compares like with like against non-streamed calls
+        router.observe(call_site, kwargs.get("model"), kwargs.get("max_tokens"), time.perf_counter() - started)
+
+def configure(pool_size=None, timeout=None, base_url=None, max_retries=None):
+    """Change the pool settings and drop existing clients so they get rebuilt"""
+    global OPENAI_POOL_SIZE, OPENAI_TIMEOUT, OPENAI_BASE_URL, OPENAI_MAX_RETRIES
+
+    if pool_size is not None:
+        OPENAI_POOL_SIZE = pool_size
+    if timeout is not None:
+        OPENAI_TIMEOUT = timeout
+    if base_url is not None:
+        OPENAI_BASE_URL = base_url
+    if max_retries is not None:
+        OPENAI_MAX_RETRIES = max_retries
+
+    close_clients()
+
+def close_clients():
+    """Close every pooled client and its connections"""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            print(f"Error closing OpenAI client: {e}")
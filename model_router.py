@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+from collections import deque
+
+# How long and how many observed latencies count towards a tier's estimate
+ROUTER_WINDOW_SECONDS = float(os.getenv("ROUTER_WINDOW_SECONDS", "300"))
+ROUTER_WINDOW_SIZE = int(os.getenv("ROUTER_WINDOW_SIZE", "50"))
+# Percentile of recent latencies compared against the SLO
+ROUTER_PERCENTILE = float(os.getenv("ROUTER_PERCENTILE", "0.9"))
+# A tier with fewer samples than this is still being explored, so it is tried
+ROUTER_MIN_SAMPLES = int(os.getenv("ROUTER_MIN_SAMPLES", "3"))
+# While degraded, let one call through to the best tier this often to notice recovery
+ROUTER_PROBE_SECONDS = float(os.getenv("ROUTER_PROBE_SECONDS", "15"))
+
+class LatencyBudgetExceeded(Exception):
+    """No model tier for this call site is expected to finish within its SLO"""
+
+class RouteConfig:
+    """Latency SLO for a call site and its model tiers, best first"""
+
+    def __init__(self, slo, tiers):
+        self.slo = slo
+        self.tiers = tiers  # [(model, max_tokens)]
+
+def _slo(call_site, default):
+    return float(os.getenv(f"ROUTER_SLO_{call_site.upper()}", default))
+
+# Call sites without an entry (e.g. background summaries) keep the caller's model
+ROUTES = {
+    "story": RouteConfig(_slo("story", "8"), [("gpt-4o", 400), ("gpt-4o-mini", 400), ("gpt-4o-mini", 250)]),
+    "outcome": RouteConfig(_slo("outcome", "4"), [("gpt-4o-mini", 200), ("gpt-4o-mini", 120)]),
+    "analysis": RouteConfig(_slo("analysis", "3"), [("gpt-4o-mini", 200), ("gpt-4o-mini", 120)]),
+    "encounter": RouteConfig(_slo("encounter", "6"), [("gpt-4o-mini", 300), ("gpt-4o-mini", 200)]),
+}
+
+class ModelRouter:
+    """Picks a model and max_tokens per call from recent latencies against an SLO
+
+    Each (call site, model, max_tokens) tier keeps a time-bounded window of
+    observed latencies, never fewer than its last ROUTER_MIN_SAMPLES. route() returns the first tier whose recent p90 fits
+    the SLO, or raises LatencyBudgetExceeded so the caller can use its local
+    fallback straight away. A better tier that misses the SLO gets one call
+    every ROUTER_PROBE_SECONDS anyway, whether a cheaper tier or the local
+    fallback is covering for it, so a recovered model is picked up again.
+    """
+
+    def __init__(self, routes=None):
+        self.routes = ROUTES if routes is None else routes
+        self._samples = {}  # (call_site, model, max_tokens) -> deque of (timestamp, seconds)
+        self._decisions = {}  # call_site -> {"model:max_tokens", "probe" or "fallback": count}
+        self._last_call = {}  # (call_site, model, max_tokens) -> when it was last routed to or answered
+        self._probing = set()  # tiers with a probe in flight
+        self._lock = threading.Lock()
+
+    def route(self, call_site, model=None, max_tokens=None):
+        """Return (model, max_tokens) for a call; unrouted call sites keep the caller's values"""
+        config = self.routes.get(call_site)
+        if config is None:
+            return model, max_tokens
+
+        now = time.time()
+        with self._lock:
+            degraded = []  # Better tiers that miss the SLO, best first
+            for tier_model, tier_tokens in config.tiers:
+                key = (call_site, tier_model, tier_tokens)
+                estimate = self._estimate(key, now)
+                if estimate is None or estimate <= config.slo:
+                    # A better tier that went slow gets a probe now and then, or it would never be tried again
+                    probe = self._probe(call_site, degraded, now)
+                    if probe is not None:
+                        return probe
+                    self._count(call_site, f"{tier_model}:{tier_tokens}")
+                    self._last_call[key] = now
+                    return tier_model, tier_tokens
+                degraded.append(key)
+
+            probe = self._probe(call_site, degraded[:1], now)
+            if probe is not None:
+                return probe
+            self._count(call_site, "fallback")
+
+        raise LatencyBudgetExceeded(f"no model for {call_site} fits its {config.slo:.1f}s SLO")
+
+    def observe(self, call_site, model, max_tokens, seconds):
+        """Record how long a routed call took"""
+        config = self.routes.get(call_site)
+        if config is None:
+            return
+        key = (call_site, model, max_tokens)
+        with self._lock:
+            window = self._samples.setdefault(key, deque(maxlen=ROUTER_WINDOW_SIZE))
+            if key in self._probing:
+                self._probing.discard(key)
+                if seconds <= config.slo:
+                    # The model has recovered; forget the slow samples that degraded it
+                    window.clear()
+            window.append((time.time(), seconds))
+            self._last_call[key] = time.time()
+
+    def stats(self):
+        """Per call site: SLO, decision counts and each tier's recent latency"""
+        now = time.time()
+        report = {}
+        with self._lock:
+            for call_site, config in self.routes.items():
+                tiers = {}
+                for model, max_tokens in config.tiers:
+                    window = self._fresh((call_site, model, max_tokens), now)
+                    tiers[f"{model}:{max_tokens}"] = {
+                        "samples": len(window),
+                        "p50": _percentile(window, 0.5),
+                        "p90": _percentile(window, ROUTER_PERCENTILE)
+                    }
+                report[call_site] = {
+                    "slo": config.slo,
+                    "decisions": dict(self._decisions.get(call_site, {})),
+                    "tiers": tiers
+                }
+        return report
+
+    def _probe(self, call_site, degraded, now):
+        """Route to the first degraded tier not tried for ROUTER_PROBE_SECONDS, if any"""
+        for key in degraded:
+            if now - self._last_call.get(key, 0.0) >= ROUTER_PROBE_SECONDS:
+                self._count(call_site, "probe")
+                self._last_call[key] = now
+                self._probing.add(key)
+                return key[1], key[2]
+        return None
+
+    def _fresh(self, key, now):
+        window = self._samples.get(key)
+        if not window:
+            return []
+        # The newest few samples are kept however old, so a tier that has gone
+        # quiet because it was too slow stays degraded until a probe says otherwise
+        while len(window) > ROUTER_MIN_SAMPLES and now - window[0][0] > ROUTER_WINDOW_SECONDS:
+            window.popleft()
+        return [seconds for _, seconds in window]
+
+    def _estimate(self, key, now):
+        """Recent p90 latency for a tier, or None while it has too few samples"""
+        window = self._fresh(key, now)
+        if len(window) < ROUTER_MIN_SAMPLES:
+            return None
+        return _percentile(window, ROUTER_PERCENTILE)
+
+    def _count(self, call_site, decision):
+        decisions = self._decisions.setdefault(call_site, {})
+        decisions[decision] = decisions.get(decision, 0) + 1
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+# Shared router for the whole process
+_router = ModelRouter()
+
+def get_router():
+    """Return the process-wide model router"""
+    return _router
+
+def router_stats():
+    """Routing decisions and recent latency per call site and model tier"""
+    return _router.stats()
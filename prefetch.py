@@ -0,0 +1,170 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import game_engine
+from scheduler import background_worker
+from turn_pipeline import start_turn
+
+# Extra tokens a session may have spent on speculative turns at once
+PREFETCH_TOKEN_BUDGET = int(os.getenv("PREFETCH_TOKEN_BUDGET", "20000"))
+# The budget refills at this rate, so speculation resumes in long sessions
+PREFETCH_REFILL_PER_MINUTE = float(os.getenv("PREFETCH_REFILL_PER_MINUTE", "4800"))
+# Hard cap on speculative tokens over a whole session; time never gives these back
+PREFETCH_SESSION_TOKENS = int(os.getenv("PREFETCH_SESSION_TOKENS", "150000"))
+# Rough cost of one speculative turn, split by call: outcome narration and the next story segment
+PREFETCH_OUTCOME_TOKENS = int(os.getenv("PREFETCH_OUTCOME_TOKENS", "400"))
+PREFETCH_STORY_TOKENS = int(os.getenv("PREFETCH_STORY_TOKENS", "1200"))
+PREFETCH_TURN_TOKENS = PREFETCH_OUTCOME_TOKENS + PREFETCH_STORY_TOKENS
+
+# Background pool kept separate so speculation never delays a real turn
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PREFETCH_WORKERS", "3")),
+    thread_name_prefix="prefetch",
+    initializer=background_worker
+)
+
+def history_hash(story_history):
+    """Stable hash of the story so far, used to key speculative turns"""
+    digest = hashlib.sha1()
+    for event in story_history or []:
+        digest.update(event.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+def normalize_choice(text):
+    """Lowercase and collapse whitespace so typed actions can match a listed choice"""
+    return " ".join((text or "").lower().split()).strip(" .!")
+
+class TurnPrefetcher:
+    """Pre-generates the outcome and next scene for each offered choice
+
+    Two limits apply: tokens_spent is what speculation has in flight, within
+    token_budget and refilled over time; tokens_total is everything spent
+    this session, which stops speculation for good at session_budget.
+    Cancelled calls that never started count towards neither.
+    """
+
+    def __init__(self, token_budget=PREFETCH_TOKEN_BUDGET, refill_per_minute=PREFETCH_REFILL_PER_MINUTE,
+                 session_budget=PREFETCH_SESSION_TOKENS):
+        self.token_budget = token_budget
+        self.refill_per_second = refill_per_minute / 60.0
+        self.session_budget = session_budget
+        self.tokens_spent = 0
+        self.tokens_total = 0
+        self._refilled = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}  # (history_hash, choice_index) -> (choice, roll, outcome_future, story_future)
+        self._lock = threading.Lock()
+
+    def prefetch(self, player_name, player_stats, story_history, choices, story_summary="", scene_index=None):
+        """Start speculative turns for every listed choice, within the budget
+
+        With the player's scene_index, a speculative scene that repeats an
+        earlier one is rewritten in the background, before anyone waits on it.
+        """
+        if not game_engine.openai_api_key:
+            return  # The local fallbacks are already instant
+
+        current = history_hash(story_history)
+        self._cancel_except(current)
+
+        with self._lock:
+            self._refill()
+            for index, choice in enumerate(choices or []):
+                key = (current, index)
+                if key in self._entries:
+                    continue
+                if self.tokens_spent + PREFETCH_TURN_TOKENS > self.token_budget:
+                    break
+                if self.tokens_total + PREFETCH_TURN_TOKENS > self.session_budget:
+                    break
+
+                self.tokens_spent += PREFETCH_TURN_TOKENS
+                self.tokens_total += PREFETCH_TURN_TOKENS
+                self._entries[key] = (choice,) + start_turn(
+                    player_name, choice, player_stats, story_history,
+                    executor=_prefetch_executor, story_summary=story_summary, scene_index=scene_index
+                )
+
+    def find_choice(self, story_history, action):
+        """Return the index of the prefetched choice matching a typed action, or None"""
+        current = history_hash(story_history)
+        wanted = normalize_choice(action)
+        with self._lock:
+            for (entry_hash, index), entry in self._entries.items():
+                if entry_hash == current and normalize_choice(entry[0]) == wanted:
+                    return index
+        return None
+
+    def take(self, story_history, choice_index):
+        """Return (outcome_text, new_story, new_choices) for a prefetched choice, or None
+
+        Waits for the speculative turn if it is still running. Every other
+        branch for this point in the story is cancelled.
+        """
+        current = history_hash(story_history)
+        with self._lock:
+            entry = self._entries.pop((current, choice_index), None)
+
+        self.cancel_all()
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        choice, roll, outcome_future, story_future = entry
+        try:
+            outcome = outcome_future.result()
+            new_story, new_choices = story_future.result()
+        except Exception as e:
+            print(f"Error in prefetched turn: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return outcome, new_story, new_choices
+
+    def cancel_all(self):
+        """Drop every speculative turn"""
+        self._cancel_except(None)
+
+    def _cancel_except(self, keep_hash):
+        """Cancel branches from other points in the story, refunding unstarted ones"""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] != keep_hash]
+            for key in stale:
+                choice, roll, outcome_future, story_future = self._entries.pop(key)
+                # Running calls cannot be interrupted; their results are just ignored.
+                # Cancel both, so a started outcome call doesn't keep the story call queued.
+                outcome_cancelled = outcome_future.cancel()
+                story_cancelled = story_future.cancel()
+                if outcome_cancelled:
+                    self.tokens_spent -= PREFETCH_OUTCOME_TOKENS
+                    self.tokens_total -= PREFETCH_OUTCOME_TOKENS
+                if story_cancelled:
+                    self.tokens_spent -= PREFETCH_STORY_TOKENS
+                    self.tokens_total -= PREFETCH_STORY_TOKENS
+                # Refills may already have given this budget back
+                self.tokens_spent = max(0, self.tokens_spent)
+
+    def _refill(self):
+        """Give back budget for the time since the last refill"""
+        now = time.monotonic()
+        self.tokens_spent = max(0, self.tokens_spent - (now - self._refilled) * self.refill_per_second)
+        self._refilled = now
+
+    def stats(self):
+        """Hit/miss counters and budget usage for this session"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "pending": len(self._entries),
+            "tokens_spent": round(self.tokens_spent),
+            "token_budget": self.token_budget,
+            "tokens_total": self.tokens_total,
+            "session_budget": self.session_budget
+        }
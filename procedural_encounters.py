@@ -0,0 +1,178 @@
+import bisect
+import json
+import os
+import random
+import re
+import threading
+
+from scene_index import least_similar
+
+# Weighted scene and choice grammar, editable without touching code (override via environment)
+ENCOUNTER_GRAMMAR_PATH = os.getenv(
+    "ENCOUNTER_GRAMMAR_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "encounter_grammar.json")
+)
+
+# Choice order matches ai.execute_choice_outcome: Strength, Luck, Agility
+CHOICE_STATS = ("Strength", "Luck", "Agility")
+DEFAULT_LOCATION = "forest"
+# Inventory items that read as weapons in choices like "Attack with your sword"
+WEAPON_WORDS = ("sword", "axe", "dagger", "knife", "blade", "spear", "club", "mace", "hammer", "bow", "staff", "bat")
+
+SYMBOL = re.compile(r"\{(\w+)\}")
+
+class _Alternatives:
+    """Weighted alternatives for one grammar symbol, precompiled for fast sampling"""
+
+    def __init__(self, options):
+        self.templates = []
+        self.cumulative = []
+        total = 0.0
+        for option in options:
+            weight, text = (option if isinstance(option, list) else (1, option))
+            total += float(weight)
+            self.cumulative.append(total)
+            # Alternate literal text and symbol names: ["The ", "trees", " close in"]
+            self.templates.append(SYMBOL.split(text))
+        self.total = total
+
+    def pick(self, rng):
+        index = bisect.bisect(self.cumulative, rng.random() * self.total)
+        return self.templates[min(index, len(self.templates) - 1)]
+
+class EncounterGrammar:
+    """Assembles encounters from weighted grammars over locations, enemies and lore
+
+    A scene is a location opening, a scene for a weighted encounter kind
+    (battle, discovery, stranger, hazard, omen) and sometimes a lore motif.
+    Each kind has choice grammars per stat, so every encounter offers one
+    Strength, one Luck and one Agility choice. Enemies come from
+    combat.enemy_types, weighted towards ones the player can handle.
+    Everything is precompiled, so generating is pure in-memory sampling.
+    """
+
+    def __init__(self, grammar, enemies=()):
+        self.rules = {name: _Alternatives(options) for name, options in grammar["rules"].items()}
+        self.locations = {
+            name: {symbol: _Alternatives(options) for symbol, options in rules.items()}
+            for name, rules in grammar["locations"].items()
+        }
+        self.kinds = []
+        self._kind_weights = []
+        total = 0.0
+        for name, kind in grammar["kinds"].items():
+            total += float(kind.get("weight", 1))
+            self._kind_weights.append(total)
+            self.kinds.append((name, _Alternatives(kind["scene"]), [_Alternatives(kind[stat]) for stat in CHOICE_STATS]))
+        self._kind_total = total
+        self.enemies = [enemy["name"] for enemy in enemies]
+        self._enemy_hp = [(enemy["min_hp"] + enemy["max_hp"]) / 2 for enemy in enemies]
+
+    def location_for(self, location):
+        """Grammar location for a free-form location name, e.g. "dark forest" -> forest"""
+        text = (location or "").lower()
+        for name in self.locations:
+            if name in text:
+                return name
+        return DEFAULT_LOCATION if DEFAULT_LOCATION in self.locations else next(iter(self.locations))
+
+    def generate(self, player_stats=None, inventory=None, location=DEFAULT_LOCATION, rng=None):
+        """Return {"scene", "choices", "choice_stats", "kind"} for one encounter"""
+        rng = rng or random
+        player_stats = player_stats or {}
+        place = self.locations[self.location_for(location)]
+        bindings = self._bindings(player_stats, inventory, rng)
+
+        index = bisect.bisect(self._kind_weights, rng.random() * self._kind_total)
+        kind, scene, choices = self.kinds[min(index, len(self.kinds) - 1)]
+
+        parts = [
+            self._expand(place["opening"].pick(rng), place, bindings, rng),
+            self._expand(scene.pick(rng), place, bindings, rng),
+            self._expand(self.rules["motif"].pick(rng), place, bindings, rng) if "motif" in self.rules else ""
+        ]
+        return {
+            "scene": " ".join(_capitalize(part) for part in parts if part),
+            "choices": [_capitalize(self._expand(alternatives.pick(rng), place, bindings, rng)) for alternatives in choices],
+            "choice_stats": list(CHOICE_STATS),
+            "kind": kind
+        }
+
+    def _bindings(self, player_stats, inventory, rng):
+        """Per-encounter values: the enemy, and the player's weapon if they carry one"""
+        bindings = {}
+        if self.enemies:
+            enemy = self.enemies[self._pick_enemy(player_stats, rng)]
+            bindings["enemy"] = enemy
+            bindings["enemy_a"] = f"{'an' if enemy[0] in 'AEIOU' else 'a'} {enemy}"
+            bindings["enemy_pack"] = f"{rng.choice(('Three', 'Four', 'A pack of', 'Half a dozen'))} {enemy}s"
+        weapons = [
+            item for item in (inventory or [])
+            if isinstance(item, str) and any(word in item.lower() for word in WEAPON_WORDS)
+        ]
+        bindings["weapon"] = f"your {rng.choice(weapons)}" if weapons else "your bare hands"
+        return bindings
+
+    def _pick_enemy(self, player_stats, rng):
+        """Weighted towards enemies whose health suits the player's total stats"""
+        power = sum(value for value in player_stats.values() if isinstance(value, (int, float))) or 15
+        target = power * 4
+        weights = [1.0 / (1.0 + abs(hp - target) / target) ** 2 for hp in self._enemy_hp]
+        roll = rng.random() * sum(weights)
+        for index, weight in enumerate(weights):
+            roll -= weight
+            if roll <= 0:
+                return index
+        return len(weights) - 1
+
+    def _expand(self, template, place, bindings, rng, depth=0):
+        out = []
+        for position, piece in enumerate(template):
+            if position % 2 == 0:
+                out.append(piece)
+            elif piece in bindings:
+                out.append(bindings[piece])
+            elif depth < 8 and (piece in place or piece in self.rules):
+                alternatives = place.get(piece) or self.rules[piece]
+                out.append(self._expand(alternatives.pick(rng), place, bindings, rng, depth + 1))
+            else:
+                out.append("{" + piece + "}")
+        return "".join(out)
+
+def _capitalize(text):
+    return text[:1].upper() + text[1:] if text else text
+
+def load_grammar(path=ENCOUNTER_GRAMMAR_PATH):
+    """Read the encounter grammar data file"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# Shared grammar, compiled on first use
+_grammar = None
+_grammar_lock = threading.Lock()
+
+def get_grammar():
+    """Return the process-wide encounter grammar"""
+    global _grammar
+    if _grammar is None:
+        with _grammar_lock:
+            if _grammar is None:
+                from combat import enemy_types
+
+                _grammar = EncounterGrammar(load_grammar(), enemy_types)
+    return _grammar
+
+def generate_procedural_encounter(player_stats=None, inventory=None, location=DEFAULT_LOCATION, seed=None, rng=None,
+                                  scene_index=None):
+    """Generate one encounter locally; pass seed (or an rng) for a reproducible one
+
+    With the player's scene_index, an encounter whose scene repeats one
+    they have seen is redrawn (see scene_index.least_similar).
+    """
+    if rng is None and seed is not None:
+        rng = random.Random(seed)
+    grammar = get_grammar()
+    if scene_index is None:
+        return grammar.generate(player_stats, inventory, location, rng)
+    return least_similar(
+        scene_index, lambda: grammar.generate(player_stats, inventory, location, rng), scene_of=lambda item: item["scene"]
+    )
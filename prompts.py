@@ -0,0 +1,280 @@
+import string
+import threading
+
+# Prompt templates. Each prompt is an immutable prefix (instructions, lore,
+# output format) followed by a short variable suffix, so consecutive requests
+# share the longest possible prefix and the provider's prompt cache can hit.
+
+def count_tokens(text):
+    """Token count for a prompt, using tiktoken when it is installed"""
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    # Roughly four characters per token for English text
+    return max(1, len(text) // 4)
+
+_encoder = None
+_encoder_loaded = False
+
+def _get_encoder():
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoder = None
+    return _encoder
+
+# Per-prompt token accounting and templates, keyed by template name
+_stats = {}
+_templates = {}
+_stats_lock = threading.Lock()
+
+class PromptTemplate:
+    """A prompt split into a static prefix and a variable suffix, compiled once"""
+
+    def __init__(self, name, prefix, suffix, system=None):
+        self.name = name
+        self.system = system
+        self.prefix = prefix
+        self.suffix = suffix
+        # Pre-split the suffix into (literal, field) pairs so rendering is a join
+        self._parts = [(literal, field) for literal, field, _, _ in string.Formatter().parse(suffix)]
+        self.fields = [field for _, field in self._parts if field]
+        self._prefix_tokens = None
+        _templates[name] = self
+        _stats[name] = {
+            "renders": 0,
+            "estimated_suffix_tokens": 0,
+            "calls": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0
+        }
+
+    @property
+    def prefix_tokens(self):
+        """Tokens in the static part, counted on first use since loading tiktoken is slow"""
+        if self._prefix_tokens is None:
+            self._prefix_tokens = count_tokens((self.system or "") + self.prefix)
+        return self._prefix_tokens
+
+    def render(self, **values):
+        """Return the user prompt: static prefix followed by the filled-in suffix"""
+        suffix = "".join(
+            literal + (str(values[field]) if field else "")
+            for literal, field in self._parts
+        )
+        with _stats_lock:
+            stats = _stats[self.name]
+            stats["renders"] += 1
+            stats["estimated_suffix_tokens"] += max(1, len(suffix) // 4)
+        return self.prefix + suffix
+
+    def messages(self, **values):
+        """Return chat messages with the static parts first"""
+        messages = []
+        if self.system:
+            messages.append({"role": "system", "content": self.system})
+        messages.append({"role": "user", "content": self.render(**values)})
+        return messages
+
+def record_usage(name, usage):
+    """Add a response's reported prompt and cached-prefix tokens to a template's stats"""
+    if usage is None or name not in _stats:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) if details else 0
+    with _stats_lock:
+        stats = _stats[name]
+        stats["calls"] += 1
+        stats["prompt_tokens"] += usage.prompt_tokens or 0
+        stats["cached_tokens"] += cached or 0
+
+def prompt_token_report():
+    """Per-template token counts: static prefix size, averages and cache hit ratio"""
+    report = {}
+    prefix_tokens = {name: template.prefix_tokens for name, template in _templates.items()}
+    with _stats_lock:
+        for name, stats in _stats.items():
+            renders = stats["renders"]
+            calls = stats["calls"]
+            report[name] = {
+                "renders": renders,
+                "prefix_tokens": prefix_tokens[name],
+                "avg_estimated_prompt_tokens": (
+                    prefix_tokens[name] + stats["estimated_suffix_tokens"] / renders if renders else 0
+                ),
+                "calls": calls,
+                "avg_prompt_tokens": stats["prompt_tokens"] / calls if calls else 0,
+                "cached_token_ratio": stats["cached_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0
+            }
+    return report
+
+ENCOUNTER_SYSTEM = "You are a helpful fantasy story generator."
+
+ENCOUNTER_PROMPT = PromptTemplate(
+    "encounter",
+    system=ENCOUNTER_SYSTEM,
+    prefix="""
+Generate a fantasy encounter for the player described at the end of this message.
+
+Create:
+1. A brief 2-3 sentence encounter description
+2. Exactly 3 choices with different outcomes based on player stats
+3. Make choices favor different stats (strength, luck, agility)
+
+Format as:
+SCENE: [description]
+CHOICE1: [choice] (Strength-based)
+CHOICE2: [choice] (Luck-based) 
+CHOICE3: [choice] (Agility-based)
+
+and also, make it lore accurate from my book, after the players gets after it, go wild, and i mean it- • Prologue: A nurse, aware of an ancient prophecy, secretly swaps a newborn royal prince with a peasant boy born under mysterious circumstances, sending the true heir to the mines and setting the stage for unforeseen events.
+• Chapter 1: Zachor, the switched noble child, grows up in the brutal Mine of Slokia, enduring horrific abuse, witnessing his family's destruction, and developing a hardened resolve against a world that punishes weakness.
+• Chapter 2: During a devastating dragon attack on the mines, Zachor is flung into a mysterious, untouched jungle where he begins to navigate its strange, often peaceful, ecosystem while coming to terms with his isolated survival.
+• Chapter 3 (Verdant Hollow): Forced deeper into the jungle by its shifting paths, Zachor encounters wild animals, embracing a "psychotic", brutal fighting style born from his past trauma to survive its dangers and arriving at a mysterious scroll.
+• Chapter 4: The jungle relentlessly draws Zachor toward its heart, where he battles a tribe of cannibals, realizing he possesses a potent, wild side that allows him to conquer them, yet still struggles with his untamed magic.
+• Chapter 5 (Hollow Flames): Zachor is transported to a bizarre dimension where his "psychotic side" reveals himself as Hollow Flame, the Prophecy Energy trapped within him, and begins a brutal training regimen of endless running and death-revival cycles.
+• Chapter 6 (True Training): Under Hollow Flame's relentless instruction, Zachor endures countless deaths and revivals while fighting hordes of monsters, learning to strategize and exploit weaknesses, leading to him unleashing a devastating magical attack.
+• Chapter 7 (The Creature): Zachor faces a new threat of merging monsters and a powerful abomination that adapts to his fighting style, forcing him to strategically self-destruct repeatedly to defeat it, which finally transforms Hollow Flame's dimension into a lush, peaceful landscape.
+• Chapter 8 (Grass and Godhood): Hollow Flame reveals Zachor has accumulated 630 million monsters to fight, which manifest as a single colossal entity that vaporizes Zachor repeatedly until he learns to endure its poisonous breath and ultimately defeats it through a final strategic self-detonation.
+• Chapter 9 (The Center Stirs): Returning to the real jungle, Zachor is now exceptionally powerful and encounters Adrian and Lily, two adventurers, protecting them from adapted creatures while learning the jungle itself reacts to his presence.
+• Chapter 10 (Sister of Flame): Zachor, Adrian, and Lily arrive at the jungle's center, where Zachor is transported to a mindscape by Eleneth, Hollow Flame's powerful sister, who reveals his identity as the true noble heir and tries to recruit him, an offer he politely refuses.
+• Chapter 11 (The Offer): Adrian and Lily reveal their noble status, welcome Zachor into their family, and offer to sponsor his enrollment in the prestigious Noble Academy of Kings, a chance for him to realize his dream and change his fate.
+
+also give names for the stages/choices, as it gets saved in supabase and it really helps in saving the players data
+
+make rolls in fight/combat, e.g if you fight a goblin then give options like, pucnh is fro strenght, kick is for agility, and dodge is for luck, and then give the rolls, e.g if you punch a goblin, then the roll is 1d20 + strength, and if you kick a goblin, then the roll is 1d20 + agility, and if the player dodges, then the roll is 1d20 + luck
+
+make it so that the players stats are helpful (e.g if they have a lot of luck, they can find treasure with a lot of character_points)
+
+Make sure to include the following:
+- SCENE: [description]
+- CHOICE1: [choice] (Strength-based)
+- CHOICE2: [choice] (Luck-based)
+- CHOICE3: [choice] (Agility-based)
+
+also make a \n with in between choices and the scene, so that it is easy to read
+
+and never say "You encounter something mysterious in the forest..." its annoying, make it so that it is unique and interesting, e.g "You stumble upon a hidden cave, the air inside is thick with dust and the smell of ancient magic, the walls are lined with glowing runes that seem to pulse with an otherworldly energy, the cave is filled with the sounds of distant whispers and the occasional rustle of unseen creatures, you can feel the weight of history pressing down on you as you take your first steps into the cave, the air grows colder and the runes seem to glow brighter, you can't shake the feeling that you are not alone in this place" like creative, also as said before use the \n to make it easy to read
+
+Also make there be be lore and history in the encounters, e.g "You stumble upon a hidden cave, the air inside is thick with dust and the smell of ancient magic, the walls are lined with glowing runes that seem to pulse with an otherworldly energy" also there should be battles every few times, like goblins, orcs, undead knights or the hordes
+
+If the player has a high luck stat, and he chooses to explore, make there be a chance for him getting a secret quest, like a chest or a map he needs to find, and if he has a high agility stat, make there be a chance for him to escape from a battle, and if he has a high strength stat, make there be a chance for him to win a battle, and if he has low strenght stats, make there be a chance for him to lose a battle, and if he has low agility stats, make there be a chance for him to get caught in a battle, and if he has low luck stats, make there be a chance for him to miss out on a secret quest, like a chest or a map he needs to find. 
+
+Vary the enemies and places from one encounter to the next.
+""",
+    suffix="""
+Player for this encounter:
+- Strength: {strength}
+- Luck: {luck}
+- Agility: {agility}
+- Inventory: {inventory}
+- Location: {location}
+"""
+)
+
+# Same static prefix as ENCOUNTER_PROMPT so single and batched requests share the cache
+ENCOUNTER_BATCH_PROMPT = PromptTemplate(
+    "encounter_batch",
+    system=ENCOUNTER_SYSTEM,
+    prefix=ENCOUNTER_PROMPT.prefix,
+    suffix="""
+Player for these encounters:
+- Strength: {strength}
+- Luck: {luck}
+- Agility: {agility}
+- Inventory: {inventory}
+- Location: {location}
+
+Write {count} separate encounters for this player, each in the SCENE/CHOICE1/CHOICE2/CHOICE3 format above.
+Every encounter must be different from the others. Put a line containing only --- between encounters.
+"""
+)
+
+STORY_PROMPT = PromptTemplate(
+    "story",
+    system="You are a creative dark fantasy storyteller who creates unique, non-repetitive adventures with meaningful stat-based choices.",
+    prefix="""You are an AI storyteller for Zachor, a dark fantasy text adventure.
+
+LORE CONTEXT: Zachor was switched at birth - a noble child raised in the brutal Mine of Slokia. After surviving a dragon attack, he found himself in a mysterious jungle with shifting paths and magical creatures. He has an inner power called "Hollow Flame" and his true noble heritage awaits discovery.
+
+Generate a NEW story continuation that:
+1. Follows logically from recent events
+2. Introduces a fresh challenge or encounter
+3. Creates 3 unique choices that utilize different stats
+4. Uses vivid, dark fantasy descriptions
+5. Advances the overarching narrative toward the jungle's heart
+
+Make each choice distinctly different:
+- One should favor Strength (combat/force)
+- One should favor Luck (chance/discovery) 
+- One should favor Agility (speed/stealth)
+
+Format: Story description first, then exactly:
+1. [Strength-based choice]
+2. [Luck-based choice] 
+3. [Agility-based choice]
+""",
+    suffix="""
+The protagonist is {player_name}.
+Player Stats - Strength: {strength}, Luck: {luck}, Agility: {agility}{context}"""
+)
+
+ANALYSIS_PROMPT = PromptTemplate(
+    "analysis",
+    prefix="""Analyze a player action for a dark fantasy RPG.
+
+Determine:
+1. Primary stat needed (Strength, Luck, or Agility)
+2. Difficulty level (Easy, Medium, Hard, Very Hard)
+3. Brief outcome prediction based on player's stat level
+4. Any secondary stats that might help
+
+Respond in this exact format:
+PRIMARY_STAT: [stat name]
+DIFFICULTY: [difficulty level]
+PREDICTION: [2-3 sentence prediction]
+SECONDARY: [optional secondary stats, comma separated or "None"]
+""",
+    suffix="""
+Action: "{action}"
+
+Player Stats:
+- Strength: {strength}
+- Luck: {luck}
+- Agility: {agility}"""
+)
+
+OUTCOME_PROMPT = PromptTemplate(
+    "outcome",
+    prefix="You are Zachor, a dark fantasy protagonist. Continue the story in a dark fantasy tone with 2-3 sentences, incorporating the roll result and success level. Include the roll information at the end.\n\n",
+    suffix="You chose to '{choice}' using your {stat_used} (rolled {dice_roll} + {stat_bonus} = {total_roll}). This was a {success_level}."
+)
+
+SUMMARY_PROMPT = PromptTemplate(
+    "summary",
+    system="You keep a concise running summary of a dark fantasy text adventure.",
+    prefix="""Update the story summary with the new events below.
+
+Rules:
+- Keep every fact that matters later: names, allies, enemies, items, wounds, promises, places and unresolved threads.
+- Drop dice rolls, flavor text and anything already resolved that will not matter again.
+- Write in past tense, third person, at most 150 words.
+- Reply with the updated summary only.
+""",
+    suffix="""
+Current summary:
+{summary}
+
+New events:
+{events}"""
+)
+
+# Registry of every template, keyed by call site
+PROMPTS = {
+    template.name: template
+    for template in (ENCOUNTER_PROMPT, ENCOUNTER_BATCH_PROMPT, STORY_PROMPT, ANALYSIS_PROMPT, OUTCOME_PROMPT, SUMMARY_PROMPT)
+}
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+
+# How often a cached resource's health check runs, at most (override via environment)
+RESOURCE_CHECK_SECONDS = float(os.getenv("RESOURCE_CHECK_SECONDS", "30"))
+
+class _Entry:
+    def __init__(self, value, key, close):
+        self.value = value
+        self.key = key
+        self.close = close
+        self.created = time.monotonic()
+        self.checked = self.created
+
+class ResourceCache:
+    """Process-wide clients and compiled data, built once and shared by every rerun and session
+
+    Streamlit re-executes app.py on every interaction, but imported modules
+    stay loaded, so resources held here survive reruns. get() builds a
+    resource on first use and rebuilds it when its key changes (e.g. rotated
+    secrets), when its health check fails (run at most every
+    RESOURCE_CHECK_SECONDS), or after invalidate().
+    """
+
+    def __init__(self, check_seconds=RESOURCE_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._entries = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, factory, key=None, check=None, close=None):
+        """Return the resource called `name`, building it with factory() when needed
+
+        check(value) -> bool says whether a cached value is still usable;
+        close(value) is called on values that are replaced or invalidated.
+        """
+        with self._lock:
+            metrics = self._metrics.setdefault(
+                name, {"builds": 0, "hits": 0, "checks": 0, "failed_checks": 0, "last_error": None}
+            )
+            entry = self._entries.get(name)
+            if entry is not None and entry.key == key and self._healthy(entry, check, metrics):
+                metrics["hits"] += 1
+                return entry.value
+
+            if entry is not None:
+                self._close(entry, metrics)
+            value = factory()
+            self._entries[name] = _Entry(value, key, close)
+            metrics["builds"] += 1
+            return value
+
+    def invalidate(self, name=None):
+        """Drop one resource, or all of them, so the next get() builds it again"""
+        with self._lock:
+            names = [name] if name is not None else list(self._entries)
+            for resource in names:
+                entry = self._entries.pop(resource, None)
+                if entry is not None:
+                    self._close(entry, self._metrics.get(resource, {}))
+
+    def stats(self):
+        """Per-resource age and counters for dashboards"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: dict(metrics, cached=name in self._entries,
+                           age=now - self._entries[name].created if name in self._entries else None)
+                for name, metrics in self._metrics.items()
+            }
+
+    def _healthy(self, entry, check, metrics):
+        if check is None or entry.value is None or time.monotonic() - entry.checked < self.check_seconds:
+            return True
+        entry.checked = time.monotonic()
+        metrics["checks"] += 1
+        try:
+            if check(entry.value):
+                return True
+        except Exception as e:
+            metrics["last_error"] = f"{type(e).__name__}: {e}"[:200]
+        metrics["failed_checks"] += 1
+        return False
+
+    def _close(self, entry, metrics):
+        if entry.close is None or entry.value is None:
+            return
+        try:
+            entry.close(entry.value)
+        except Exception as e:
+            metrics["last_error"] = f"{type(e).__name__}: {e}"[:200]
+
+# Shared by every Streamlit session in the process
+_resources = ResourceCache()
+
+def get_resources():
+    """Return the process-wide resource cache"""
+    return _resources
+
+def resource_stats():
+    """Age and build/check counters of the shared resources"""
+    return _resources.stats()
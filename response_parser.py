@@ -0,0 +1,527 @@
+import json
+import re
+import threading
+
+from telemetry import get_telemetry
+
+# One schema-driven parser for every LLM reply format the game uses. It reads
+# the legacy line formats (LABEL: value, numbered choices) and JSON-mode
+# replies in a single pass, works incrementally over streamed chunks, and
+# repairs near-misses (markdown labels, "1)" numbering, wrapped lines,
+# fenced or truncated JSON) instead of throwing them away.
+
+# "SCENE: ...", "**Scene:** ...", "- CHOICE 2: ...", "PRIMARY_STAT: ..."
+LABEL_LINE = re.compile(r"^[\s>*_#-]*([A-Za-z][A-Za-z_ ]{0,24}?)[\s_]*(\d*)[\s*_]*[:：][\s*_]*(.*)$")
+# "1. ...", "2) ...", "**3.** ..."
+NUMBERED_LINE = re.compile(r"^\s*[*_]*(\d{1,2})\s*[.):][*_]*\s+(.*)$")
+STRICT_NUMBERED_LINE = re.compile(r"^\s*\d\.\s")
+# Partial line that may still turn into a numbered line once more text arrives
+MARKER_PREFIX = re.compile(r"[*_]*(\d{1,2}\s*[.):]?[*_]*)?")
+# What may sit between a label's colon and its value
+LABEL_PADDING = " \t\r\f\v*_"
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+class Schema:
+    """Fields a reply should contain and how to read them
+
+    labels maps a lowercase label (digits stripped) to a field name. Text
+    without a label goes to body_field if there is one, otherwise it
+    continues the previous text field. Numbered lines go to numbered_field.
+    """
+
+    def __init__(self, name, labels, defaults, list_fields=(), body_field=None, numbered_field=None,
+                 enums=None, required=(), min_items=0, max_items=None, record_label=None):
+        self.name = name
+        self.labels = labels
+        self.defaults = defaults
+        self.list_fields = set(list_fields)
+        self.body_field = body_field
+        self.numbered_field = numbered_field
+        self.enums = enums or {}
+        self.required = required
+        self.min_items = min_items
+        self.max_items = max_items
+        self.record_label = record_label
+        self.canonical_labels = {label.upper() for label in labels}
+        self.canonical_fields = {label.upper(): field for label, field in labels.items()}
+
+ENCOUNTER_SCHEMA = Schema(
+    "encounter",
+    labels={"scene": "scene", "description": "scene", "choice": "choices", "option": "choices", "choices": "choices"},
+    defaults={
+        "scene": "You encounter something mysterious in the forest...",
+        "choices": ["Fight with strength", "Try your luck", "Use agility to escape"]
+    },
+    list_fields=("choices",),
+    numbered_field="choices",
+    required=("scene", "choices"),
+    min_items=2,
+    record_label="scene"
+)
+
+ANALYSIS_SCHEMA = Schema(
+    "analysis",
+    labels={
+        "primary_stat": "primary_stat", "primary stat": "primary_stat", "primary": "primary_stat", "stat": "primary_stat",
+        "difficulty": "difficulty",
+        "prediction": "outcome_prediction", "outcome_prediction": "outcome_prediction", "outcome": "outcome_prediction",
+        "secondary": "secondary_stats", "secondary_stats": "secondary_stats", "secondary stats": "secondary_stats"
+    },
+    defaults={
+        "primary_stat": "Luck",
+        "difficulty": "Medium",
+        "outcome_prediction": "Unknown outcome",
+        "secondary_stats": []
+    },
+    list_fields=("secondary_stats",),
+    enums={
+        "primary_stat": ("Strength", "Luck", "Agility"),
+        "difficulty": ("Very Hard", "Easy", "Medium", "Hard")
+    },
+    required=("primary_stat",)
+)
+
+STORY_SCHEMA = Schema(
+    "story",
+    labels={"story": "story", "scene": "story", "text": "story", "choices": "choices"},
+    defaults={
+        "story": "Adventure awaits...",
+        "choices": [
+            "Use brute force to overcome the obstacle",
+            "Trust in fate and take a risky chance",
+            "Use speed and cunning to find another way"
+        ]
+    },
+    list_fields=("choices",),
+    body_field="story",
+    numbered_field="choices",
+    required=("choices",),
+    min_items=3,
+    max_items=3
+)
+
+# Parse outcomes per schema: ok, repaired or fallback
+_outcomes = {}
+_outcomes_lock = threading.Lock()
+
+class ParseResult:
+    """Parsed fields plus how they were obtained"""
+
+    def __init__(self, value, status, repairs):
+        self.value = value
+        self.status = status  # "ok", "repaired" or "fallback"
+        self.repairs = repairs
+
+    def __repr__(self):
+        return f"ParseResult({self.status}, {self.value!r}, repairs={self.repairs})"
+
+class _Record:
+    def __init__(self):
+        self.values = {}
+        self.body = []
+        self.numbered_lines = []
+        self.preamble = []
+        self.repairs = []
+        self.last_field = None
+
+class ResponseParser:
+    """Incremental parser: feed() chunks as they stream in, then finish()
+
+    feed() returns body text that is settled and safe to display. Lines that
+    may still become a numbered choice or a label are held back until they
+    are complete.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.repairs = []
+        self._records = [_Record()]
+        self._pending = ""
+        self._mid_line = False  # Part of the current line was already returned as body
+        self._json = None  # None until the first visible character decides the mode
+        self._buffer = []
+        self._closed = False
+        self._results = None
+
+    def feed(self, chunk):
+        """Consume a chunk; returns body text that can be shown now"""
+        if self._json:
+            self._buffer.append(chunk)
+            return ""
+
+        self._pending += chunk
+        if self._json is None:
+            stripped = self._pending.lstrip()
+            if not stripped:
+                return ""
+            if stripped[0] == "`" and len(stripped) < 3:
+                return ""
+            self._json = stripped.startswith(("{", "```"))
+            if self._json:
+                self._buffer.append(self._pending)
+                self._pending = ""
+                return ""
+
+        shown = []
+        while "\n" in self._pending:
+            line, self._pending = self._pending.split("\n", 1)
+            shown.append(self._line(line))
+        # Flush a partial body line as soon as it can't be a choice or a label
+        if self._pending and self.schema.body_field and (self._mid_line or self._settled(self._pending)):
+            shown.append(self._body_text(self._pending))
+            self._pending = ""
+            self._mid_line = True
+        return "".join(shown)
+
+    def close(self):
+        """Consume the rest of the reply; returns any body text not shown yet"""
+        if self._closed:
+            return ""
+        self._closed = True
+
+        if self._json:
+            self._parse_json("".join(self._buffer))
+            if self._json:
+                return self._records[0].values.get(self.schema.body_field, "") if self.schema.body_field else ""
+            return "".join(self._records[0].body)
+
+        tail = self._line(self._pending, final=True) if self._pending else ""
+        self._pending = ""
+        return tail
+
+    def finish(self):
+        """Return the ParseResult for the (first) record in the reply"""
+        return self.finish_all()[0]
+
+    def finish_all(self):
+        """Return a ParseResult per record, for replies holding several"""
+        self.close()
+        if self._results is None:
+            records = [record for record in self._records if record.values or record.body or record.preamble]
+            self._results = [self._build(record) for record in records or [_Record()]]
+            with _outcomes_lock:
+                counts = _outcomes.setdefault(self.schema.name, {"ok": 0, "repaired": 0, "fallback": 0})
+                for result in self._results:
+                    counts[result.status] += 1
+            get_telemetry().record_parse([result.status for result in self._results])
+        return self._results
+
+    def read_strict(self, text):
+        """Read a complete reply in the exact format the prompts ask for
+
+        One cheap pass over canonical "LABEL: value" lines, "1. " choices and
+        plain body text. Returns False, leaving the parser untouched, as soon
+        as a line needs anything more (JSON, markdown, other numbering,
+        wrapped or repeated fields); the full parser then reads the reply.
+        """
+        schema = self.schema
+        stripped = text.lstrip()
+        if not stripped or stripped.startswith(("{", "```")):
+            return False
+
+        record = _Record()
+        # Every line keeps its newline: the body is stripped when the record is built
+        for line in text.split("\n"):
+            if not line.strip():
+                if schema.body_field:
+                    record.body.append(line + "\n")
+                continue
+
+            first = line[0]
+            if first.isdigit():
+                if not schema.numbered_field or line[1:3] != ". ":
+                    return False
+                record.numbered_lines.append(line)
+                record.values.setdefault(schema.numbered_field, []).append(line[3:].strip())
+                record.last_field = None
+                continue
+            if not (first.isalpha() or first in "\"'"):
+                return False
+
+            colon = line.find(":")
+            if colon < 0 and "：" in line:
+                return False
+            if colon > 0:
+                head = line[:colon]
+                unnumbered = head.rstrip("0123456789")
+                field = schema.canonical_fields.get(unnumbered.rstrip(" _"))
+                if field:
+                    value = line[colon + 1:].lstrip(LABEL_PADDING)
+                    if field == schema.body_field:
+                        record.body.append(value + "\n")
+                    elif schema.record_label and field == schema.labels.get(schema.record_label) and field in record.values:
+                        return False  # Several records: leave batches to the full parser
+                    else:
+                        self._set(record, field, value.strip(), numbered=unnumbered != head)
+                    continue
+                if self._label_field(LABEL_LINE.match(line)):
+                    return False  # A label written some other way
+            if not schema.body_field:
+                return False  # Unlabelled text: a preamble or a wrapped line
+            record.body.append(line + "\n")
+
+        self._records = [record]
+        self._json = False
+        self._closed = True
+        return True
+
+    def _settled(self, partial):
+        stripped = partial.lstrip()
+        if not stripped or MARKER_PREFIX.fullmatch(stripped):
+            return False
+        return not NUMBERED_LINE.match(partial + " ") and not self._label_field(LABEL_LINE.match(partial))
+
+    def _label_field(self, match):
+        """Field a label line belongs to, or None if the label isn't in the schema"""
+        if not match:
+            return None
+        name = " ".join(match.group(1).lower().replace("_", " ").split())
+        return self.schema.labels.get(name) or self.schema.labels.get(name.replace(" ", "_"))
+
+    def _body_text(self, text):
+        self._records[-1].body.append(text)
+        return text
+
+    def _line(self, line, final=False):
+        """Route one complete line; returns it if it is displayable body text"""
+        newline = "" if final else "\n"
+        if self._mid_line:
+            self._mid_line = False
+            return self._body_text(line + newline)
+        if not line.strip():
+            if self.schema.body_field:
+                return self._body_text(line + newline)
+            return ""
+
+        schema = self.schema
+        record = self._records[-1]
+
+        match = LABEL_LINE.match(line)
+        field = self._label_field(match)
+        if field:
+            if schema.record_label and field == schema.labels.get(schema.record_label) and field in record.values:
+                # A repeated record label starts the next record of a batch
+                record = _Record()
+                self._records.append(record)
+            label = match.group(1)
+            if not line.startswith(label) or label not in schema.canonical_labels:
+                self._repair("label_format")
+            if field == schema.body_field:
+                return self._body_text(match.group(3) + newline)
+            self._set(record, field, match.group(3).strip(), numbered=bool(match.group(2)))
+            return ""
+
+        if schema.numbered_field:
+            match = NUMBERED_LINE.match(line)
+            if match:
+                if not STRICT_NUMBERED_LINE.match(line):
+                    self._repair("numbering")
+                record.numbered_lines.append(line)
+                record.values.setdefault(schema.numbered_field, []).append(match.group(2).strip())
+                record.last_field = None
+                return ""
+
+        if line.strip().strip("-*_=`") == "":
+            return ""  # Separator between records, or a stray code fence
+
+        if schema.body_field:
+            return self._body_text(line + newline)
+
+        if record.last_field and record.last_field not in schema.list_fields:
+            # Wrapped line: continue the previous field
+            self._repair("continuation")
+            record.values[record.last_field] += " " + line.strip()
+        else:
+            record.preamble.append(line.strip())
+        return ""
+
+    def _set(self, record, field, text, numbered=False):
+        if field in self.schema.list_fields:
+            items = record.values.setdefault(field, [])
+            if numbered or field == self.schema.numbered_field:
+                if text:
+                    items.append(text)
+            elif text.lower() not in ("none", "n/a", "-", ""):
+                items.extend(item.strip() for item in text.split(",") if item.strip())
+            record.last_field = None
+        else:
+            record.values[field] = text
+            record.last_field = field
+
+    def _repair(self, kind):
+        # JSON-level repairs apply to every record; line repairs to the current one
+        repairs = self.repairs if self._json else self._records[-1].repairs
+        if kind not in repairs:
+            repairs.append(kind)
+
+    def _parse_json(self, text):
+        """Read a JSON-mode reply, repairing fences, trailing commas and truncation"""
+        original = text
+        text = text.strip()
+        if text.startswith("```"):
+            self._repair("json_fence")
+            text = text.split("\n", 1)[1] if "\n" in text else ""
+            text = text.rsplit("```", 1)[0]
+        text = TRAILING_COMMA.sub(r"\1", text)
+
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+            closed = _close_json(text)
+            if closed is not None:
+                try:
+                    data = json.loads(closed)
+                    self._repair("json_truncated")
+                except ValueError:
+                    data = None
+
+        if data is None:
+            # Not JSON after all: read it as the line format
+            self._json = False
+            self._pending = ""
+            self._repair("json_invalid")
+            for line in original.split("\n"):
+                self._line(line)
+            return
+
+        if isinstance(data, dict):
+            # {"encounters": [...]} style wrappers around several records
+            nested = [value for value in data.values() if isinstance(value, list) and value and isinstance(value[0], dict)]
+            items = nested[0] if len(data) == 1 and nested else [data]
+        else:
+            items = [item for item in data if isinstance(item, dict)] if isinstance(data, list) else []
+
+        self._records = []
+        for item in items or [{}]:
+            record = _Record()
+            for key, value in item.items():
+                name = " ".join(re.sub(r"\d+$", "", str(key)).lower().replace("_", " ").split())
+                field = self.schema.labels.get(name) or self.schema.labels.get(name.replace(" ", "_"))
+                if field is None:
+                    continue
+                if field in self.schema.list_fields:
+                    values = value if isinstance(value, list) else [value]
+                    for entry in values:
+                        if isinstance(entry, dict):
+                            entry = next((v for v in entry.values() if isinstance(v, str)), "")
+                        self._set(record, field, str(entry).strip(), numbered=field == self.schema.numbered_field)
+                else:
+                    self._set(record, field, str(value).strip())
+            self._records.append(record)
+
+    def _build(self, record):
+        """Validate one record against the schema, filling in defaults where needed"""
+        schema = self.schema
+        repairs = self.repairs + record.repairs
+        values = dict(record.values)
+        fallback = False
+
+        if schema.body_field:
+            body = "".join(record.body).strip()
+            if body:
+                values[schema.body_field] = body
+
+        if record.preamble and schema.record_label and not values.get(schema.record_label):
+            values[schema.record_label] = " ".join(record.preamble)
+            repairs.append("unlabeled_" + schema.record_label)
+
+        for field, allowed in schema.enums.items():
+            if field in values:
+                normalized = _match_enum(values[field], allowed)
+                if normalized is None:
+                    fallback = True
+                    del values[field]
+                elif normalized != values[field]:
+                    repairs.append("enum_" + field)
+                    values[field] = normalized
+
+        for field in schema.list_fields:
+            items = values.get(field)
+            if items is None:
+                continue
+            if len(items) < schema.min_items:
+                fallback = True
+                if field == schema.numbered_field and schema.body_field:
+                    # Keep stray numbered lines in the story rather than dropping them
+                    values[schema.body_field] = (values.get(schema.body_field, "") + "\n" +
+                                                 "\n".join(record.numbered_lines)).strip()
+                del values[field]
+            elif schema.max_items and len(items) > schema.max_items:
+                repairs.append("extra_" + field)
+                values[field] = items[:schema.max_items]
+
+        for field in schema.required:
+            if not values.get(field):
+                fallback = True
+
+        for field, default in schema.defaults.items():
+            if values.get(field) in (None, "", []):
+                values[field] = list(default) if isinstance(default, list) else default
+
+        status = "fallback" if fallback else "repaired" if repairs else "ok"
+        return ParseResult(values, status, repairs)
+
+def _match_enum(text, allowed):
+    """Map free text onto one of the allowed values, e.g. "strength (combat)" -> "Strength" """
+    lowered = text.strip().lower()
+    for value in allowed:
+        if lowered == value.lower():
+            return value
+    # Longest value first so "Very Hard" wins over "Hard"
+    for value in sorted(allowed, key=len, reverse=True):
+        if value.lower() in lowered:
+            return value
+    return None
+
+def _close_json(text):
+    """Close the open strings, arrays and objects of a truncated JSON document"""
+    stack = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not stack:
+                return None
+            stack.pop()
+    if not stack and not in_string:
+        return None
+    closed = text + ('"' if in_string else "")
+    closed = re.sub(r"[,:]\s*$", "", closed.rstrip())
+    return closed + "".join(reversed(stack))
+
+def parse_response(schema, text):
+    """Parse a complete reply in one pass"""
+    parser = ResponseParser(schema)
+    if not parser.read_strict(text or ""):
+        parser.feed(text or "")
+    return parser.finish()
+
+def parse_records(schema, text):
+    """Parse a reply holding several records, e.g. a batch of encounters"""
+    parser = ResponseParser(schema)
+    if not parser.read_strict(text or ""):
+        parser.feed(text or "")
+    return parser.finish_all()
+
+def parse_stats():
+    """ok / repaired / fallback counts and recovery rate per schema"""
+    with _outcomes_lock:
+        report = {}
+        for name, counts in _outcomes.items():
+            total = sum(counts.values())
+            report[name] = dict(counts, total=total, recovered_rate=(
+                (counts["ok"] + counts["repaired"]) / total if total else 0.0
+            ))
+        return report
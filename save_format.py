@@ -0,0 +1,129 @@
+import json
+import struct
+import zlib
+
+# Binary save container:
+#   header   magic "ZSAV", format version, section count          (<4sHH)
+#   table    per section: name length, name, codec, offset, size  (<B, name, <BII)
+#   payload  the sections, each a JSON object, zlib-compressed unless tiny
+# Offsets are from the start of the payload, so a reader can pick out one
+# section without touching the others.
+SAVE_MAGIC = b"ZSAV"
+SAVE_FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHH")
+ENTRY = struct.Struct("<BII")
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+# Sections smaller than this aren't worth compressing
+COMPRESS_MIN_BYTES = 128
+
+# Which section each save field goes in; anything else goes in "extra"
+SECTIONS = {
+    "stats": ("player_name", "player_stats", "player_class", "character_health", "character_points"),
+    "inventory": ("inventory",),
+    "scene": ("current_stage", "current_story", "current_choices"),
+    "history": ("story_summary", "event_count", "history_events", "story_history"),
+    "scenes": ("scene_index",),
+}
+EXTRA_SECTION = "extra"
+
+_SECTION_OF = {field: section for section, fields in SECTIONS.items() for field in fields}
+
+# Upgrades from each older format version to the next: version -> function(fields) -> fields.
+# They get whichever fields the caller asked for, so they must cope with a partial save.
+MIGRATIONS = {}
+
+def is_binary_save(blob):
+    return isinstance(blob, (bytes, bytearray, memoryview)) and bytes(blob[:4]) == SAVE_MAGIC
+
+def encode_save(data):
+    """Pack a save dict into the binary container"""
+    sections = {}
+    for field, value in data.items():
+        sections.setdefault(_SECTION_OF.get(field, EXTRA_SECTION), {})[field] = value
+
+    table = []
+    payload = []
+    offset = 0
+    for name, fields in sections.items():
+        raw = json.dumps(fields, separators=(",", ":")).encode("utf-8")
+        codec = CODEC_RAW
+        if len(raw) >= COMPRESS_MIN_BYTES:
+            compressed = zlib.compress(raw, 6)
+            if len(compressed) < len(raw):
+                raw, codec = compressed, CODEC_ZLIB
+        encoded_name = name.encode("utf-8")
+        table.append(struct.pack("<B", len(encoded_name)) + encoded_name + ENTRY.pack(codec, offset, len(raw)))
+        payload.append(raw)
+        offset += len(raw)
+
+    return HEADER.pack(SAVE_MAGIC, SAVE_FORMAT_VERSION, len(table)) + b"".join(table) + b"".join(payload)
+
+class SaveReader:
+    """Reads sections of a binary save on demand; only requested sections are decompressed and parsed"""
+
+    def __init__(self, blob):
+        self.blob = memoryview(blob)
+        magic, self.version, count = HEADER.unpack_from(self.blob, 0)
+        if magic != SAVE_MAGIC:
+            raise ValueError("not a binary save")
+        if self.version > SAVE_FORMAT_VERSION:
+            raise ValueError(f"save format version {self.version} is newer than this game supports")
+
+        self._entries = {}
+        position = HEADER.size
+        for _ in range(count):
+            name_length = self.blob[position]
+            name = bytes(self.blob[position + 1:position + 1 + name_length]).decode("utf-8")
+            position += 1 + name_length
+            self._entries[name] = ENTRY.unpack_from(self.blob, position)
+            position += ENTRY.size
+        self._payload_start = position
+        self._cache = {}
+
+    def sections(self):
+        return list(self._entries)
+
+    def section(self, name):
+        """Fields of one section ({} if the save doesn't have it)"""
+        if name not in self._cache:
+            if name not in self._entries:
+                return {}
+            codec, offset, size = self._entries[name]
+            start = self._payload_start + offset
+            raw = self.blob[start:start + size]
+            if codec == CODEC_ZLIB:
+                raw = zlib.decompress(raw)
+            self._cache[name] = json.loads(bytes(raw))
+        return self._cache[name]
+
+    def read(self, sections=None):
+        """Fields of the given sections merged into one dict (all sections when None)"""
+        data = {}
+        for name in sections if sections is not None else self.sections():
+            data.update(self.section(name))
+        if self.version < SAVE_FORMAT_VERSION:
+            data = migrate_fields(data, self.version)
+        return data
+
+def migrate_fields(data, version):
+    """Bring fields read from an older format version up to date"""
+    while version < SAVE_FORMAT_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    return data
+
+def decode_save(blob, sections=None):
+    """Read a save in either format: the binary container, or a JSON save from before it
+
+    With the binary format only the requested sections are decoded. A JSON
+    save has to be parsed whole, then is cut down to the same fields.
+    """
+    if is_binary_save(blob):
+        return SaveReader(blob).read(sections)
+
+    data = json.loads(blob)
+    if sections is None:
+        return data
+    return {field: value for field, value in data.items() if _SECTION_OF.get(field, EXTRA_SECTION) in sections}
@@ -0,0 +1,148 @@
+import atexit
+import os
+import threading
+import time
+
+# Saves for the same key within this window are written once (override via environment)
+SAVE_COALESCE_SECONDS = float(os.getenv("SAVE_COALESCE_SECONDS", "0.5"))
+# How long flush() waits for queued saves before giving up
+SAVE_FLUSH_TIMEOUT = float(os.getenv("SAVE_FLUSH_TIMEOUT", "10"))
+
+class SaveQueue:
+    """Write-behind saver: callers hand over a snapshot and return at once
+
+    Snapshots are keyed (by player name in the game). A new snapshot replaces
+    the one still waiting for its key, so rapid saves collapse into a single
+    write and only the latest state is written. A single worker thread does
+    all the writing, so an older snapshot can never land after a newer one.
+    """
+
+    def __init__(self, coalesce_seconds=SAVE_COALESCE_SECONDS):
+        self.coalesce_seconds = coalesce_seconds
+        self.submitted = 0
+        self.coalesced = 0
+        self.writes = 0
+        self.failures = 0
+        self._pending = {}  # key -> (sequence, due time, write, snapshot)
+        self._status = {}  # key -> status of the latest snapshot
+        self._sequence = 0
+        self._writing = None
+        self._worker = None
+        self._condition = threading.Condition()
+
+    def submit(self, key, write, snapshot):
+        """Queue write(snapshot) for key, replacing any snapshot still waiting; never blocks on I/O"""
+        with self._condition:
+            self._sequence += 1
+            self.submitted += 1
+            if key in self._pending:
+                self.coalesced += 1
+                due = self._pending[key][1]
+            else:
+                due = time.monotonic() + self.coalesce_seconds
+            self._pending[key] = (self._sequence, due, write, snapshot)
+            self._status[key] = {"state": "pending", "sequence": self._sequence, "error": None,
+                                 "saved_at": self._status.get(key, {}).get("saved_at")}
+            self._start_worker()
+            self._condition.notify_all()
+            return self._sequence
+
+    def status(self, key):
+        """State of the latest snapshot for key: pending, saved or failed (None if never saved)"""
+        with self._condition:
+            status = self._status.get(key)
+            return dict(status) if status else None
+
+    def flush(self, key=None, timeout=SAVE_FLUSH_TIMEOUT):
+        """Write waiting snapshots now (all, or only key's) and wait for them; returns True when done"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            for pending_key, (sequence, _, write, snapshot) in self._pending.items():
+                if key is None or pending_key == key:
+                    self._pending[pending_key] = (sequence, 0, write, snapshot)
+            self._condition.notify_all()
+            while self._busy(key):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def stats(self):
+        """Counters for dashboards"""
+        with self._condition:
+            return {
+                "queued": len(self._pending),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "writes": self.writes,
+                "failures": self.failures
+            }
+
+    def _busy(self, key):
+        if key is None:
+            return bool(self._pending) or self._writing is not None
+        return key in self._pending or self._writing == key
+
+    def _start_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="save-queue", daemon=True)
+            self._worker.start()
+            atexit.register(self.flush)
+
+    def _next_due(self):
+        """Key of the snapshot due first if its coalescing window has passed, else seconds to wait"""
+        now = time.monotonic()
+        key, (_, due, _, _) = min(self._pending.items(), key=lambda item: (item[1][1], item[1][0]))
+        if due <= now:
+            return key, None
+        return None, due - now
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._pending:
+                        self._condition.wait()
+                        continue
+                    key, wait = self._next_due()
+                    if key is not None:
+                        break
+                    self._condition.wait(wait)
+                sequence, _, write, snapshot = self._pending.pop(key)
+                self._writing = key
+
+            error = None
+            try:
+                write(snapshot)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                print(f"Error saving game for {key}: {e}")
+
+            with self._condition:
+                self._writing = None
+                if error:
+                    self.failures += 1
+                else:
+                    self.writes += 1
+                # A newer snapshot queued meanwhile keeps its pending status
+                if self._status[key]["sequence"] == sequence:
+                    self._status[key].update(
+                        state="failed" if error else "saved",
+                        error=error,
+                        saved_at=self._status[key]["saved_at"] if error else time.time()
+                    )
+                self._condition.notify_all()
+
+# Shared by every session in the process
+_save_queue = None
+_save_queue_lock = threading.Lock()
+
+def get_save_queue():
+    """Return the process-wide save queue"""
+    global _save_queue
+    if _save_queue is None:
+        with _save_queue_lock:
+            if _save_queue is None:
+                _save_queue = SaveQueue()
+    return _save_queue
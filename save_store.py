@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from save_format import decode_save, encode_save
+
+# Local save database, shared by app.py and Main.py (override via environment)
+SAVE_DB_PATH = os.getenv("SAVE_DB_PATH", "saves.db")
+
+# Each game keeps its own saves in the database
+STREAMLIT_GAME = "streamlit"
+CLI_GAME = "cli"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saves (
+    game TEXT NOT NULL,
+    player_key TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    data BLOB NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS saves_player ON saves (game, player_key);
+CREATE INDEX IF NOT EXISTS saves_updated ON saves (game, updated_at);
+"""
+
+# Fixed statement text, so each connection's statement cache prepares them once
+UPSERT_SQL = (
+    "INSERT INTO saves (game, player_key, player_name, data, updated_at) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (game, player_key) DO UPDATE SET "
+    "player_name = excluded.player_name, data = excluded.data, updated_at = excluded.updated_at"
+)
+LOAD_SQL = "SELECT data FROM saves WHERE game = ? AND player_key = ?"
+LEGACY_SQL = "SELECT player_name, data FROM saves WHERE game = ? AND typeof(data) = 'text' LIMIT ?"
+LATEST_SQL = "SELECT data FROM saves WHERE game = ? ORDER BY updated_at DESC LIMIT 1"
+COUNT_SQL = "SELECT COUNT(*) FROM saves WHERE game = ?"
+DELETE_SQL = "DELETE FROM saves WHERE game = ? AND player_key = ?"
+
+def player_key(player_name):
+    """Lookup key for a player, matching the old save file names"""
+    return player_name.lower().replace(' ', '_')
+
+class SaveStore:
+    """Saves of many players in one SQLite database in WAL mode
+
+    Each game (the Streamlit app, the CLI) keeps its own saves, keyed by
+    player. A save is one upsert in its own transaction, so a crash leaves
+    either the old save or the new one. WAL lets loads run while a save is
+    being written. Each thread gets its own connection.
+
+    Saves are stored in the binary format of save_format, so a reader that
+    only needs some sections (e.g. stats) decodes just those. Rows written
+    as JSON before that format still load, and migrate() converts them.
+    """
+
+    def __init__(self, path=SAVE_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def save(self, game, player_name, data):
+        """Write a player's save, replacing the previous one"""
+        self.save_many(game, [(player_name, data)])
+
+    def save_many(self, game, saves):
+        """Write (player_name, data) saves in one transaction"""
+        now = time.time()
+        rows = [(game, player_key(name), name, encode_save(data), now) for name, data in saves]
+        connection = self._connection()
+        with connection:
+            connection.executemany(UPSERT_SQL, rows)
+
+    def load(self, game, player_name, sections=None):
+        """A player's save, or None; pass section names to decode only those"""
+        row = self._connection().execute(LOAD_SQL, (game, player_key(player_name))).fetchone()
+        return decode_save(row[0], sections) if row else None
+
+    def latest(self, game, sections=None):
+        """The most recently written save of a game, or None"""
+        row = self._connection().execute(LATEST_SQL, (game,)).fetchone()
+        return decode_save(row[0], sections) if row else None
+
+    def migrate(self, game, batch_size=1000):
+        """Rewrite a game's JSON saves in the binary format; returns how many were converted"""
+        converted = 0
+        while True:
+            rows = self._connection().execute(LEGACY_SQL, (game, batch_size)).fetchall()
+            if not rows:
+                return converted
+            # save_many keeps updated_at moving, which is fine: the data is unchanged
+            self.save_many(game, [(name, json.loads(data)) for name, data in rows])
+            converted += len(rows)
+
+    def count(self, game):
+        return self._connection().execute(COUNT_SQL, (game,)).fetchone()[0]
+
+    def delete(self, game, player_name):
+        connection = self._connection()
+        with connection:
+            connection.execute(DELETE_SQL, (game, player_key(player_name)))
+
+    def close(self):
+        """Close this thread's connection"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # With WAL, NORMAL only risks the last commits on power loss, never corruption
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    connection.executescript(SCHEMA)
+                    self._schema_ready = True
+            self._local.connection = connection
+        return connection
+
+def import_json_save(store, game, path, player_name=None):
+    """Copy an old JSON save file into the store; returns its data, or None if there is no file"""
+    try:
+        with open(path, "r") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return None
+    store.save(game, player_name or data["player_name"], data)
+    return data
+
+# Shared by every thread in the process
+_save_store = None
+_save_store_lock = threading.Lock()
+
+def get_save_store():
+    """Return the process-wide save store"""
+    global _save_store
+    if _save_store is None:
+        with _save_store_lock:
+            if _save_store is None:
+                _save_store = SaveStore()
+    return _save_store
@@ -0,0 +1,188 @@
+import base64
+import hashlib
+import os
+import re
+import struct
+import threading
+from collections import Counter, OrderedDict
+from itertools import chain
+
+# Similarity above which a new scene counts as a repeat (override via environment)
+SCENE_REPEAT_THRESHOLD = float(os.getenv("SCENE_REPEAT_THRESHOLD", "0.5"))
+# Words per shingle, and shingle hashes kept per scene (bottom-k MinHash)
+SCENE_SHINGLE_WORDS = int(os.getenv("SCENE_SHINGLE_WORDS", "2"))
+SCENE_SKETCH_SIZE = int(os.getenv("SCENE_SKETCH_SIZE", "32"))
+# Most recent scenes remembered per player; older ones age out. Each costs
+# about 170 bytes in a save, so this also bounds the save's size
+SCENE_INDEX_CAPACITY = int(os.getenv("SCENE_INDEX_CAPACITY", "100"))
+# Procedural alternatives tried when a scene has to be swapped out
+SCENE_SWAP_ATTEMPTS = int(os.getenv("SCENE_SWAP_ATTEMPTS", "5"))
+
+WORD = re.compile(r"[a-z0-9']+")
+
+def shingles(text, size=SCENE_SHINGLE_WORDS):
+    """Overlapping word n-grams of a scene, lowercased and without punctuation"""
+    words = WORD.findall((text or "").lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[index:index + size]) for index in range(len(words) - size + 1)}
+
+def sketch(text, size=SCENE_SKETCH_SIZE, shingle_words=SCENE_SHINGLE_WORDS):
+    """Bottom-k MinHash sketch: the `size` smallest 32-bit shingle hashes, sorted"""
+    hashes = {
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+        for shingle in shingles(text, shingle_words)
+    }
+    return tuple(sorted(hashes)[:size])
+
+def estimate_similarity(first, second, size=SCENE_SKETCH_SIZE):
+    """Estimated Jaccard similarity of the shingle sets behind two sketches"""
+    if not first or not second:
+        return 0.0
+    first, second = set(first), set(second)
+    common = first & second
+    if not common:
+        return 0.0
+    # Of the `size` smallest hashes in the union, the share both sketches hold
+    union = sorted(first | second)[:size]
+    cutoff = union[-1]
+    return sum(1 for value in common if value <= cutoff) / len(union)
+
+class SceneIndex:
+    """Near-duplicate index of the scenes one player has been shown
+
+    Each scene is kept as a bottom-k MinHash sketch of its word shingles,
+    with an inverted index from hash to scene, so checking a new scene only
+    estimates its similarity to scenes that share enough hashes with it.
+    The newest SCENE_INDEX_CAPACITY scenes are kept, which is small enough
+    to store with the save (to_dict/from_dict).
+    """
+
+    def __init__(self, threshold=SCENE_REPEAT_THRESHOLD, capacity=SCENE_INDEX_CAPACITY):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.checked = 0
+        self.repeats = 0
+        self.regenerated = 0
+        self._scenes = OrderedDict()  # scene id -> sketch, oldest first
+        self._postings = {}  # shingle hash -> scene ids
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._scenes)
+
+    def similarity(self, text):
+        """Highest estimated similarity between a scene and any scene already shown"""
+        return self._best(sketch(text))
+
+    def is_repeat(self, text):
+        return self.similarity(text) >= self.threshold
+
+    def check(self, text):
+        """is_repeat for a scene about to be shown, counted towards the repetition rate"""
+        repeat = self.is_repeat(text)
+        with self._lock:
+            self.checked += 1
+            self.repeats += repeat
+        return repeat
+
+    def add(self, text):
+        """Remember a scene the player has been shown"""
+        self._add_sketch(sketch(text))
+
+    def record_regenerated(self):
+        """Count a generation that repeated a scene and was written again"""
+        with self._lock:
+            self.regenerated += 1
+
+    def stats(self):
+        """Scenes remembered and how often a generation repeated one of them"""
+        with self._lock:
+            return {
+                "scenes": len(self._scenes),
+                "checked": self.checked,
+                "repeats": self.repeats,
+                "regenerated": self.regenerated,
+                "repetition_rate": self.repeats / self.checked if self.checked else 0.0
+            }
+
+    def to_dict(self):
+        """JSON-ready form for saves: sketches as base64 packed hashes, oldest first"""
+        with self._lock:
+            return {
+                "sketches": [
+                    base64.b64encode(struct.pack(f"<{len(values)}I", *values)).decode("ascii")
+                    for values in self._scenes.values()
+                ],
+                "added": self._next_id,
+                "checked": self.checked,
+                "repeats": self.repeats,
+                "regenerated": self.regenerated
+            }
+
+    @property
+    def added(self):
+        """Scenes added over the index's lifetime, including ones since aged out"""
+        return self._next_id
+
+    @classmethod
+    def from_dict(cls, data, **kwargs):
+        """Rebuild an index from to_dict() output; tolerates missing or damaged data"""
+        index = cls(**kwargs)
+        for encoded in (data or {}).get("sketches", []):
+            try:
+                raw = base64.b64decode(encoded)
+                index._add_sketch(struct.unpack(f"<{len(raw) // 4}I", raw))
+            except (ValueError, struct.error):
+                continue
+        index._next_id = max(index._next_id, int((data or {}).get("added", 0)))
+        index.checked = int((data or {}).get("checked", 0))
+        index.repeats = int((data or {}).get("repeats", 0))
+        index.regenerated = int((data or {}).get("regenerated", 0))
+        return index
+
+    def _best(self, values):
+        with self._lock:
+            shared = Counter(chain.from_iterable(self._postings.get(value, ()) for value in values))
+            best = 0.0
+            # Most shared hashes first: the estimate can't exceed the share of
+            # hashes two sketches have in common, so the scan stops early
+            for scene_id, count in shared.most_common():
+                if count / len(values) <= best:
+                    break
+                other = self._scenes[scene_id]
+                if count / max(len(values), len(other)) > best:
+                    best = max(best, estimate_similarity(values, other))
+            return best
+
+    def _add_sketch(self, values):
+        if not values:
+            return
+        with self._lock:
+            scene_id = self._next_id
+            self._next_id += 1
+            self._scenes[scene_id] = tuple(values)
+            for value in values:
+                self._postings.setdefault(value, set()).add(scene_id)
+            while len(self._scenes) > self.capacity:
+                old_id, old_values = self._scenes.popitem(last=False)
+                for value in old_values:
+                    ids = self._postings.get(value)
+                    if ids is not None:
+                        ids.discard(old_id)
+                        if not ids:
+                            del self._postings[value]
+
+def least_similar(index, generate, scene_of=None, attempts=SCENE_SWAP_ATTEMPTS):
+    """Draw up to `attempts` alternatives from generate(); the first that isn't a repeat, else the least similar"""
+    scene_of = scene_of or (lambda item: item)
+    best, best_score = None, None
+    for _ in range(max(1, attempts)):
+        item = generate()
+        score = index.similarity(scene_of(item))
+        if score < index.threshold:
+            return item
+        if best_score is None or score < best_score:
+            best, best_score = item, score
+    return best
@@ -0,0 +1,258 @@
+import heapq
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+# Provider limits for the account (override via environment)
+OPENAI_RPM = float(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = float(os.getenv("OPENAI_TPM", "200000"))
+# Attempts per request, and the full-jitter exponential backoff bounds in seconds
+OPENAI_RETRY_ATTEMPTS = int(os.getenv("OPENAI_RETRY_ATTEMPTS", "4"))
+OPENAI_BACKOFF_BASE = float(os.getenv("OPENAI_BACKOFF_BASE", "0.5"))
+OPENAI_BACKOFF_MAX = float(os.getenv("OPENAI_BACKOFF_MAX", "20"))
+# Share of each bucket that background work may not dip into, kept for players
+BACKGROUND_RESERVE = float(os.getenv("OPENAI_BACKGROUND_RESERVE", "0.2"))
+
+# Priority classes, lowest value served first
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+_thread_priority = threading.local()
+
+def current_priority():
+    """Priority class for calls made from this thread"""
+    return getattr(_thread_priority, "value", INTERACTIVE)
+
+def background_worker():
+    """ThreadPoolExecutor initializer: calls from this worker yield to interactive ones"""
+    _thread_priority.value = BACKGROUND
+
+class TokenBucket:
+    """Refills continuously at per_minute / 60 per second, up to per_minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount, now, reserve=0.0):
+        """Seconds until amount can be taken while leaving reserve in the bucket"""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        # Requests larger than the bucket wait for it to be full rather than forever
+        amount = min(amount, self.capacity - reserve)
+        needed = amount + reserve - self.level
+        return needed / self.rate if needed > 0 else 0.0
+
+    def take(self, amount):
+        self.level -= amount
+
+def retry_delay(error):
+    """Seconds to pause admission after a 429, 0 for other transient errors, None if not retryable"""
+    import openai
+
+    if isinstance(error, openai.RateLimitError):
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            if "retry-after-ms" in headers:
+                delay = float(headers["retry-after-ms"]) / 1000
+            else:
+                delay = float(headers.get("retry-after", 0))
+        except ValueError:
+            delay = 0.0
+        # Always pause a little: a 429 means our bucket is ahead of the provider's
+        return max(delay, OPENAI_BACKOFF_BASE)
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)):
+        return 0.0
+    return None
+
+class LLMScheduler:
+    """Admits LLM calls under RPM/TPM token buckets, by priority class
+
+    Waiting calls are served strictly by priority, then arrival. Transient
+    errors are retried with jittered exponential backoff, and a 429 pauses
+    admission for everyone until its Retry-After has passed. Identical
+    in-flight requests share a single call.
+    """
+
+    def __init__(self, rpm=OPENAI_RPM, tpm=OPENAI_TPM, max_attempts=OPENAI_RETRY_ATTEMPTS,
+                 backoff_base=OPENAI_BACKOFF_BASE, backoff_max=OPENAI_BACKOFF_MAX):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._waiting = []  # heap of (priority, arrival)
+        self._arrivals = 0
+        self._paused_until = 0.0
+        self._in_flight = {}  # coalescing key -> Future
+        self._cond = threading.Condition()
+        self._metrics = {
+            "max_queue_depth": 0,
+            "admitted": 0,
+            "coalesced": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "waits": {name: {"count": 0, "total": 0.0, "max": 0.0} for name in PRIORITY_NAMES.values()}
+        }
+
+    def run(self, call, tokens=1, priority=None, key=None):
+        """Run call() once admitted, retrying transient errors
+
+        Calls with the same key while one is in flight get that call's result.
+        """
+        if priority is None:
+            priority = current_priority()
+        if key is None:
+            return self._run_with_retries(call, tokens, priority)
+
+        with self._cond:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self._metrics["coalesced"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._run_with_retries(call, tokens, priority)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._cond:
+                self._in_flight.pop(key, None)
+
+    def acquire(self, tokens=1, priority=INTERACTIVE):
+        """Block until the buckets admit one request of this many tokens"""
+        start = time.monotonic()
+        with self._cond:
+            ticket = (priority, self._arrivals)
+            self._arrivals += 1
+            heapq.heappush(self._waiting, ticket)
+            self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], len(self._waiting))
+            self._cond.notify_all()
+            try:
+                while True:
+                    wait = None
+                    if self._waiting[0] == ticket:
+                        now = time.monotonic()
+                        reserve = BACKGROUND_RESERVE if priority != INTERACTIVE else 0.0
+                        wait = max(
+                            self._paused_until - now,
+                            self.requests.wait_time(1, now, self.requests.capacity * reserve),
+                            self.tokens.wait_time(tokens, now, self.tokens.capacity * reserve)
+                        )
+                        if wait <= 0:
+                            break
+                    self._cond.wait(wait)
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+
+            heapq.heappop(self._waiting)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self._record_wait(priority, time.monotonic() - start)
+            self._cond.notify_all()
+
+    def settle(self, estimated, actual):
+        """Correct the token bucket once a call reports its real usage"""
+        with self._cond:
+            self.tokens.take(actual - estimated)
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        """Stop admitting calls for a while, e.g. after a 429"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff for a retry attempt (0-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def stats(self):
+        """Queue depth, per-class wait times and retry counters"""
+        with self._cond:
+            now = time.monotonic()
+            self.requests.wait_time(0, now)
+            self.tokens.wait_time(0, now)
+            waits = {
+                name: {
+                    "count": wait["count"],
+                    "mean_wait": wait["total"] / wait["count"] if wait["count"] else 0.0,
+                    "max_wait": wait["max"]
+                }
+                for name, wait in self._metrics["waits"].items()
+            }
+            return {
+                "queue_depth": len(self._waiting),
+                "max_queue_depth": self._metrics["max_queue_depth"],
+                "in_flight_coalescable": len(self._in_flight),
+                "admitted": self._metrics["admitted"],
+                "coalesced": self._metrics["coalesced"],
+                "retries": self._metrics["retries"],
+                "rate_limited": self._metrics["rate_limited"],
+                "failures": self._metrics["failures"],
+                "waits": waits,
+                "requests_available": self.requests.level,
+                "tokens_available": self.tokens.level,
+                "paused_for": max(0.0, self._paused_until - now)
+            }
+
+    def _record_wait(self, priority, waited):
+        self._metrics["admitted"] += 1
+        wait = self._metrics["waits"][PRIORITY_NAMES.get(priority, "background")]
+        wait["count"] += 1
+        wait["total"] += waited
+        wait["max"] = max(wait["max"], waited)
+
+    def _run_with_retries(self, call, tokens, priority):
+        for attempt in range(self.max_attempts):
+            self.acquire(tokens, priority)
+            try:
+                return call()
+            except Exception as e:
+                delay = retry_delay(e)
+                if delay is None or attempt == self.max_attempts - 1:
+                    with self._cond:
+                        self._metrics["failures"] += 1
+                    raise
+
+                with self._cond:
+                    self._metrics["retries"] += 1
+                if delay > 0:
+                    with self._cond:
+                        self._metrics["rate_limited"] += 1
+                    self.pause(delay)
+                print(f"LLM call failed ({type(e).__name__}), retry {attempt + 1} of {self.max_attempts - 1}")
+                time.sleep(max(delay, self.backoff(attempt)))
+
+# Process-wide scheduler shared by every caller
+_scheduler = LLMScheduler()
+
+def get_scheduler():
+    """Return the process-wide scheduler"""
+    return _scheduler
+
+def configure(rpm=None, tpm=None, max_attempts=None):
+    """Replace the shared scheduler with one using new limits"""
+    global _scheduler
+    current = _scheduler
+    _scheduler = LLMScheduler(
+        rpm=rpm if rpm is not None else current.requests.capacity,
+        tpm=tpm if tpm is not None else current.tokens.capacity,
+        max_attempts=max_attempts if max_attempts is not None else current.max_attempts
+    )
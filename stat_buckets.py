@@ -0,0 +1,15 @@
+STATS = ("Strength", "Luck", "Agility")
+
+def bucket_stat(value):
+    """Group a 1-10 stat into low/mid/high so nearby stats share cache entries"""
+    if value <= 3:
+        return "low"
+    elif value <= 6:
+        return "mid"
+    elif value <= 10:
+        return "high"
+    return "epic"
+
+def stat_buckets(player_stats):
+    """Strength/Luck/Agility grouped into low/mid/high, as the prompts care about them"""
+    return tuple(bucket_stat(player_stats.get(stat, 5)) for stat in STATS)
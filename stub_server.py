@@ -0,0 +1,323 @@
+"""Local OpenAI-compatible stub server for offline load and latency testing.
+
+Mimics POST /v1/chat/completions (including streaming) with deterministic,
+correctly formatted replies for every prompt the game sends: story
+segments with numbered choices, single or batched SCENE/CHOICE encounters,
+PRIMARY_STAT/DIFFICULTY analyses, outcome narration and history summaries.
+
+Usage:
+    python stub_server.py --port 8089 --latency lognormal:0.8:0.4 --error-429 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=sk-stub streamlit run app.py
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCENE_OPENINGS = [
+    "The canopy closes overhead like a fist, and the air turns thick with rot and copper.",
+    "A ring of moss-eaten statues watches you from the mist, their eyes weeping black sap.",
+    "Roots split the path ahead, pulsing faintly with the same heat as the Hollow Flame.",
+    "Bones hang from the vines in neat rows, wind-chimes for something that likes an audience.",
+    "The river here runs uphill, and the stones along its bank hum a mining song from Slokia.",
+    "A shattered wagon lies in the ferns, its cargo of noble crests scattered in the mud.",
+]
+SCENE_THREATS = [
+    "A goblin pack circles in the shadows, blades scraping bark.",
+    "An undead knight rises from the bog, armor green with centuries of slime.",
+    "Something large breathes in the dark between the trees, patient and hungry.",
+    "A flesh mage stitches a new arm onto itself, humming as it notices you.",
+    "Cannibal drums start up somewhere close, answering each other across the ravine.",
+    "An orc leader blocks the trail, a spiked bat resting on one shoulder.",
+]
+STRENGTH_CHOICES = ["Smash through the barricade", "Charge the nearest enemy", "Wrench the gate off its hinges"]
+LUCK_CHOICES = ["Search the wreckage for anything useful", "Gamble on the unmarked path", "Trust the whisper and open the chest"]
+AGILITY_CHOICES = ["Slip past along the branches", "Sprint for the ravine edge", "Sneak around through the ferns"]
+OUTCOME_LINES = [
+    "Steel meets bone and the jungle goes quiet for a heartbeat.",
+    "The ground gives way, but your hand finds a root in time.",
+    "Shadows scatter as the Hollow Flame flickers behind your eyes.",
+    "Something valuable glints where the dust settles.",
+]
+
+STAT_KEYWORDS = {
+    "Strength": ("fight", "attack", "punch", "strike", "force", "break", "smash", "lift", "push", "charge"),
+    "Agility": ("dodge", "run", "quick", "fast", "escape", "sneak", "climb", "jump", "stealth", "slip", "sprint"),
+    "Luck": ("luck", "chance", "gamble", "risk", "try", "search", "find", "discover", "trust"),
+}
+
+class StubConfig:
+    """Latency distribution, streaming speed and error injection rates"""
+
+    def __init__(self, latency="fixed:0", token_delay=0.0, error_429=0.0, error_500=0.0,
+                 error_timeout=0.0, timeout_seconds=60.0, seed=None):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.error_429 = error_429
+        self.error_500 = error_500
+        self.error_timeout = error_timeout
+        self.timeout_seconds = timeout_seconds
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def sample_latency(self):
+        """Draw one response delay in seconds from the configured distribution
+
+        Supported specs: fixed:S, uniform:MIN:MAX, lognormal:MEDIAN:SIGMA
+        """
+        kind, _, args = self.latency.partition(":")
+        values = [float(v) for v in args.split(":") if v]
+        with self._rng_lock:
+            if kind == "uniform":
+                return self._rng.uniform(values[0], values[1])
+            if kind == "lognormal":
+                return self._rng.lognormvariate(math.log(values[0]), values[1]) if values[0] > 0 else 0.0
+            return values[0] if values else 0.0
+
+    def pick_error(self):
+        """Return "429", "500", "timeout" or None for this request"""
+        with self._rng_lock:
+            roll = self._rng.random()
+        if roll < self.error_429:
+            return "429"
+        roll -= self.error_429
+        if roll < self.error_500:
+            return "500"
+        roll -= self.error_500
+        if roll < self.error_timeout:
+            return "timeout"
+        return None
+
+def _rng_for(messages):
+    """Deterministic RNG seeded from the request content"""
+    digest = hashlib.sha1(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+def _stat_for(text):
+    lowered = text.lower()
+    for stat, words in STAT_KEYWORDS.items():
+        if any(word in lowered for word in words):
+            return stat
+    return "Luck"
+
+def _scene(rng):
+    return f"{rng.choice(SCENE_OPENINGS)} {rng.choice(SCENE_THREATS)}"
+
+def _encounter(rng):
+    return (f"SCENE: {_scene(rng)}\n\n"
+            f"CHOICE1: {rng.choice(STRENGTH_CHOICES)} (Strength-based)\n"
+            f"CHOICE2: {rng.choice(LUCK_CHOICES)} (Luck-based)\n"
+            f"CHOICE3: {rng.choice(AGILITY_CHOICES)} (Agility-based)")
+
+def build_reply(messages):
+    """Pick a correctly formatted reply for whichever game prompt this is"""
+    prompt = "\n".join(message.get("content") or "" for message in messages)
+    rng = _rng_for(messages)
+
+    if "PRIMARY_STAT:" in prompt:
+        match = re.search(r'Action: "(.*)"', prompt)
+        action = match.group(1) if match else ""
+        stat = _stat_for(action)
+        words = len(action.split())
+        difficulty = "Easy" if words <= 2 else "Medium" if words <= 4 else "Hard"
+        return (f"PRIMARY_STAT: {stat}\nDIFFICULTY: {difficulty}\n"
+                f"PREDICTION: Your {stat} will be tested. {rng.choice(OUTCOME_LINES)}\n"
+                f"SECONDARY: None")
+
+    if "SCENE:" in prompt and "CHOICE1:" in prompt:
+        match = re.search(r"Write (\d+) separate encounters", prompt)
+        count = int(match.group(1)) if match else 1
+        return "\n---\n".join(_encounter(rng) for _ in range(count))
+
+    if "[Strength-based choice]" in prompt:
+        return (f"{_scene(rng)}\n{rng.choice(OUTCOME_LINES)}\n\n"
+                f"1. {rng.choice(STRENGTH_CHOICES)}\n"
+                f"2. {rng.choice(LUCK_CHOICES)}\n"
+                f"3. {rng.choice(AGILITY_CHOICES)}")
+
+    if "Update the story summary" in prompt:
+        return f"The hero pressed deeper into the jungle. {rng.choice(OUTCOME_LINES)}"
+
+    return f"{rng.choice(OUTCOME_LINES)} {rng.choice(OUTCOME_LINES)}"
+
+def _usage(messages, content):
+    prompt_tokens = max(1, sum(len(message.get("content") or "") for message in messages) // 4)
+    completion_tokens = max(1, len(content) // 4)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+def make_handler(config):
+    """Build the request handler class bound to a StubConfig"""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self._send_json(200, {"object": "list", "data": [
+                    {"id": model, "object": "model", "owned_by": "stub"} for model in ("gpt-4o", "gpt-4o-mini")
+                ]})
+            else:
+                self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send_json(400, {"error": {"message": "Invalid JSON", "type": "invalid_request_error"}})
+                return
+
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+                return
+
+            config.requests += 1
+            error = config.pick_error()
+            if error:
+                config.errors += 1
+            if error == "timeout":
+                time.sleep(config.timeout_seconds)
+                self.close_connection = True
+                return
+            if error == "429":
+                self._send_json(429, {"error": {"message": "Rate limit reached (stub)", "type": "requests", "code": "rate_limit_exceeded"}},
+                                extra_headers={"Retry-After": "1"})
+                return
+            if error == "500":
+                self._send_json(500, {"error": {"message": "Internal error (stub)", "type": "server_error"}})
+                return
+
+            time.sleep(config.sample_latency())
+
+            messages = request.get("messages", [])
+            model = request.get("model", "gpt-4o-mini")
+            content = build_reply(messages)
+            max_tokens = request.get("max_tokens")
+            if max_tokens:
+                content = content[:max_tokens * 4]
+
+            if request.get("stream"):
+                include_usage = (request.get("stream_options") or {}).get("include_usage")
+                self._send_stream(model, messages, content, include_usage)
+            else:
+                # Same generation time as streaming, delivered all at once
+                if config.token_delay:
+                    time.sleep(config.token_delay * len(content.split()))
+                self._send_json(200, {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": _usage(messages, content)
+                })
+
+        def _send_json(self, status, payload, extra_headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (extra_headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_stream(self, model, messages, content, include_usage):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def event(payload):
+                data = f"data: {payload}\n\n".encode("utf-8")
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+            def chunk(delta, finish_reason=None):
+                return json.dumps({
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+                })
+
+            event(chunk({"role": "assistant", "content": ""}))
+            # Roughly one token per word, keeping the whitespace with each piece
+            for piece in re.findall(r"\s*\S+\s*", content):
+                if config.token_delay:
+                    time.sleep(config.token_delay)
+                event(chunk({"content": piece}))
+            event(chunk({}, "stop"))
+            if include_usage:
+                event(json.dumps({
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [],
+                    "usage": _usage(messages, content)
+                }))
+            event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+def start_stub_server(config=None, host="127.0.0.1", port=0):
+    """Start the stub on a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), make_handler(config or StubConfig()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}/v1"
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:0",
+                        help="fixed:S, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA (seconds)")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed chunks")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-500", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--error-timeout", type=float, default=0.0, help="Fraction of requests that hang")
+    parser.add_argument("--timeout-seconds", type=float, default=60.0, help="How long a hanging request hangs")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency and error sampling")
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency=args.latency,
+        token_delay=args.token_delay,
+        error_429=args.error_429,
+        error_500=args.error_500,
+        error_timeout=args.error_timeout,
+        timeout_seconds=args.timeout_seconds,
+        seed=args.seed
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    server.daemon_threads = True
+    print(f"🧪 Stub OpenAI server listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nServed {config.requests} requests ({config.errors} injected errors)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""Per-call LLM telemetry: latency histograms, token usage and parse outcomes.
+
+llm_client records every completion call (latency, time to first token for
+streams, prompt/completion tokens, model, call site, ok/error/skipped) and
+response_parser attaches the parse outcome to the call whose reply it
+parsed. Aggregates are kept in memory; the raw events are flushed every
+TELEMETRY_FLUSH_SECONDS to TELEMETRY_PATH, a JSONL file or, for a .db or
+.sqlite path, an SQLite table. Set TELEMETRY_PATH to an empty string to
+keep telemetry in memory only. The sink is kept near TELEMETRY_MAX_BYTES:
+a JSONL file is rotated to "<path>.1", an SQLite table drops its oldest
+half. Readers only look at the last TELEMETRY_READ_BYTES of a JSONL file.
+
+Usage:
+    python telemetry.py [path]   # print a summary of a telemetry sink
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+TELEMETRY_PATH = os.getenv("TELEMETRY_PATH", "llm_telemetry.jsonl")
+TELEMETRY_FLUSH_SECONDS = float(os.getenv("TELEMETRY_FLUSH_SECONDS", "30"))
+# Rotate (JSONL) or prune (SQLite) the sink once it grows past this
+TELEMETRY_MAX_BYTES = int(os.getenv("TELEMETRY_MAX_BYTES", str(8 * 1024 * 1024)))
+# load_events reads at most this much from the end of a JSONL sink
+TELEMETRY_READ_BYTES = int(os.getenv("TELEMETRY_READ_BYTES", str(2 * 1024 * 1024)))
+# A parse more than this long after the call isn't attributed to it
+TELEMETRY_PARSE_WINDOW = 60.0
+
+# Log-spaced latency bucket upper bounds in ms, 10 ms to ~2 min, 25% apart
+LATENCY_BUCKETS_MS = tuple(round(10 * 1.25 ** i, 1) for i in range(43))
+
+# Worse parse outcomes win when one reply holds several records
+PARSE_RANK = {"ok": 0, "repaired": 1, "fallback": 2}
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_calls (
+    ts REAL, call_site TEXT, model TEXT, status TEXT, error TEXT,
+    latency_ms REAL, first_token_ms REAL, prompt_tokens INTEGER,
+    completion_tokens INTEGER, parse TEXT, streamed INTEGER
+)
+"""
+EVENT_FIELDS = ("ts", "call_site", "model", "status", "error", "latency_ms", "first_token_ms",
+                "prompt_tokens", "completion_tokens", "parse", "streamed")
+
+class Histogram:
+    """Fixed-bucket latency histogram with approximate percentiles"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last bucket: above the largest bound
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        low, high = 0, len(self.bounds)
+        while low < high:
+            middle = (low + high) // 2
+            if value <= self.bounds[middle]:
+                high = middle
+            else:
+                low = middle + 1
+        self.counts[low] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding this percentile, capped at the largest value seen"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                bound = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def buckets(self):
+        """Non-empty buckets as [(upper bound, count)]; the overflow bucket's bound is the largest value"""
+        bounds = list(self.bounds) + [self.max]
+        return [(bound, count) for bound, count in zip(bounds, self.counts) if count]
+
+class _Aggregate:
+    """Running totals for one (call site, model)"""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.first_token = Histogram()
+        self.statuses = {"ok": 0, "error": 0, "skipped": 0}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.parse = {"ok": 0, "repaired": 0, "fallback": 0}
+
+    def add(self, event):
+        self.statuses[event["status"]] = self.statuses.get(event["status"], 0) + 1
+        if event["status"] != "skipped":
+            self.latency.add(event["latency_ms"])
+        if event.get("first_token_ms") is not None:
+            self.first_token.add(event["first_token_ms"])
+        self.prompt_tokens += event.get("prompt_tokens") or 0
+        self.completion_tokens += event.get("completion_tokens") or 0
+        if event.get("parse"):
+            self.parse[event["parse"]] += 1
+
+    def summary(self):
+        calls = sum(self.statuses.values())
+        answered = self.statuses["ok"]
+        parsed = sum(self.parse.values())
+        return {
+            "calls": calls,
+            "ok": answered,
+            "errors": self.statuses["error"],
+            "skipped": self.statuses["skipped"],
+            "p50_ms": self.latency.percentile(0.5),
+            "p95_ms": self.latency.percentile(0.95),
+            "p99_ms": self.latency.percentile(0.99),
+            "mean_ms": self.latency.mean(),
+            "first_token_p50_ms": self.first_token.percentile(0.5),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "avg_tokens": (self.prompt_tokens + self.completion_tokens) / answered if answered else 0.0,
+            "parse": dict(self.parse),
+            "parse_fallback_rate": self.parse["fallback"] / parsed if parsed else 0.0,
+            "histogram": self.latency.buckets()
+        }
+
+def summarize(events):
+    """Aggregate telemetry events into per-"call_site/model" summaries"""
+    aggregates = {}
+    for event in events:
+        key = f"{event['call_site']}/{event['model']}"
+        aggregates.setdefault(key, _Aggregate()).add(event)
+    return {key: aggregate.summary() for key, aggregate in sorted(aggregates.items())}
+
+class Telemetry:
+    """In-memory aggregates plus a buffer of raw events awaiting flush"""
+
+    def __init__(self, path=TELEMETRY_PATH, flush_seconds=TELEMETRY_FLUSH_SECONDS):
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self._aggregates = {}
+        self._pending = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._flusher = None
+
+    def record_call(self, call_site, model, seconds, usage=None, status="ok", error=None,
+                    first_token=None, streamed=False):
+        """Record one completion call; usage is the response's usage object, if any"""
+        event = {
+            "ts": time.time(),
+            "call_site": call_site or "unknown",
+            "model": model or "unknown",
+            "status": status,
+            "error": type(error).__name__ if error is not None else None,
+            "latency_ms": round(seconds * 1000, 1),
+            "first_token_ms": round(first_token * 1000, 1) if first_token is not None else None,
+            "prompt_tokens": getattr(usage, "prompt_tokens", None) if usage is not None else None,
+            "completion_tokens": getattr(usage, "completion_tokens", None) if usage is not None else None,
+            "parse": None,
+            "streamed": streamed
+        }
+        with self._lock:
+            key = f"{event['call_site']}/{event['model']}"
+            self._aggregates.setdefault(key, _Aggregate()).add(event)
+            self._pending.append(event)
+        # The reply is parsed on this thread next, if at all
+        self._local.last_call = event if status == "ok" else None
+        self._start_flusher()
+
+    def record_parse(self, statuses):
+        """Attach the worst of a reply's parse outcomes to the last call this thread made"""
+        event = getattr(self._local, "last_call", None)
+        self._local.last_call = None
+        if event is None or not statuses or time.time() - event["ts"] > TELEMETRY_PARSE_WINDOW:
+            return
+        status = max(statuses, key=PARSE_RANK.get)
+        with self._lock:
+            event["parse"] = status
+            self._aggregates[f"{event['call_site']}/{event['model']}"].parse[status] += 1
+
+    def summary(self):
+        """Per-"call_site/model" summaries of everything recorded in this process"""
+        with self._lock:
+            return {key: aggregate.summary() for key, aggregate in sorted(self._aggregates.items())}
+
+    def flush(self):
+        """Write buffered events to the sink"""
+        with self._lock:
+            events, self._pending = self._pending, []
+        if not events or not self.path:
+            return
+        try:
+            if _is_sqlite(self.path):
+                _write_sqlite(self.path, events)
+            else:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(event) + "\n" for event in events)
+                if os.path.getsize(self.path) > TELEMETRY_MAX_BYTES:
+                    # Keep one older file; the one before it is dropped
+                    os.replace(self.path, self.path + ".1")
+        except Exception as e:
+            print(f"Error flushing LLM telemetry: {e}")
+
+    def _start_flusher(self):
+        if self._flusher is not None or not self.path:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="telemetry-flush", daemon=True)
+            self._flusher.start()
+        atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+def _is_sqlite(path):
+    return path.endswith((".db", ".sqlite", ".sqlite3"))
+
+def _write_sqlite(path, events):
+    import sqlite3
+
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            connection.execute(SQLITE_SCHEMA)
+            connection.executemany(
+                f"INSERT INTO llm_calls ({', '.join(EVENT_FIELDS)}) VALUES ({', '.join('?' * len(EVENT_FIELDS))})",
+                [tuple(event[field] for field in EVENT_FIELDS) for event in events]
+            )
+            page_size, pages, free = (connection.execute(f"PRAGMA {name}").fetchone()[0]
+                                      for name in ("page_size", "page_count", "freelist_count"))
+            if (pages - free) * page_size > TELEMETRY_MAX_BYTES:
+                # Drop the oldest half; SQLite reuses the freed pages, so the file stops growing
+                connection.execute(
+                    "DELETE FROM llm_calls WHERE rowid <= (SELECT (MIN(rowid) + MAX(rowid)) / 2 FROM llm_calls)"
+                )
+    finally:
+        connection.close()
+
+def load_events(path=TELEMETRY_PATH, since=None, max_bytes=TELEMETRY_READ_BYTES):
+    """Read flushed events back from a JSONL or SQLite sink, optionally only those after `since`
+
+    Only the last max_bytes of a JSONL sink (with its rotated file) are
+    read, so the cost stays bounded however long the game has been logging.
+    An SQLite sink is bounded by its TELEMETRY_MAX_BYTES pruning.
+    """
+    if not path:
+        return []
+    since = since or 0.0
+    if _is_sqlite(path):
+        if not os.path.exists(path):
+            return []
+        import sqlite3
+
+        connection = sqlite3.connect(path)
+        try:
+            rows = connection.execute(
+                f"SELECT {', '.join(EVENT_FIELDS)} FROM llm_calls WHERE ts >= ? ORDER BY ts", (since,)
+            ).fetchall()
+        finally:
+            connection.close()
+        return [dict(zip(EVENT_FIELDS, row)) for row in rows]
+
+    # The current file, topped up from the end of the rotated one if it's short
+    lines = _tail_lines(path, max_bytes)
+    remaining = max_bytes - sum(len(line) for line in lines) if max_bytes else None
+    if remaining is None or remaining > 0:
+        lines = _tail_lines(path + ".1", remaining) + lines
+
+    events = []
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue  # Torn last line from a crash
+        if event.get("ts", 0) >= since:
+            events.append(event)
+    return events
+
+def _tail_lines(path, max_bytes):
+    """Whole lines from the last max_bytes of a file (all of it when max_bytes is None)"""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return []
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        # Start one byte early: if that byte ends a line, the tail starts on a whole line
+        f.seek(max(0, size - max_bytes - 1) if max_bytes is not None else 0)
+        if f.tell():
+            f.readline()  # Rest of a line cut by the tail
+        return f.readlines()
+
+# Shared telemetry for the whole process
+_telemetry = Telemetry()
+
+def get_telemetry():
+    """Return the process-wide telemetry recorder"""
+    return _telemetry
+
+def telemetry_summary():
+    """Summaries of the calls recorded in this process"""
+    return _telemetry.summary()
+
+if __name__ == "__main__":
+    for key, summary in summarize(load_events(sys.argv[1] if len(sys.argv) > 1 else TELEMETRY_PATH)).items():
+        summary.pop("histogram")
+        print(key, json.dumps(summary))
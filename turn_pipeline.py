@@ -0,0 +1,108 @@
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from game_engine import (
+    roll_for_choice, describe_roll, process_choice, generate_ai_story,
+    process_choice_stream, generate_ai_story_stream
+)
+
+# Worker threads shared by every turn in the process (two LLM calls per turn)
+TURN_WORKERS = int(os.getenv("TURN_WORKERS", "8"))
+_executor = ThreadPoolExecutor(max_workers=TURN_WORKERS, thread_name_prefix="turn")
+
+def start_turn(player_name, action, player_stats, story_history, executor=None, story_summary="", scene_index=None):
+    """Roll locally, then start the outcome and next-scene calls at the same time
+
+    Returns (roll, outcome_future, story_future). The story call gets the roll
+    result as context, so it does not need to wait for the outcome narration.
+    """
+    executor = executor or _executor
+    roll = roll_for_choice(action, player_stats)
+    history = list(story_history or []) + [f"You chose: {action}"]
+    context = describe_roll(action, roll)
+
+    outcome_future = executor.submit(process_choice, player_name, action, player_stats, roll)
+    story_future = executor.submit(generate_ai_story, player_name, player_stats, history, context, story_summary, scene_index)
+    return roll, outcome_future, story_future
+
+def run_turn(player_name, action, player_stats, story_history, story_summary=""):
+    """Synchronous turn: returns (outcome_text, new_story, new_choices)
+
+    Wall-clock time is max() of the two LLM calls instead of their sum.
+    """
+    roll, outcome_future, story_future = start_turn(
+        player_name, action, player_stats, story_history, story_summary=story_summary
+    )
+    outcome = outcome_future.result()
+    new_story, new_choices = story_future.result()
+    return outcome, new_story, new_choices
+
+async def run_turn_async(player_name, action, player_stats, story_history, story_summary=""):
+    """Async turn for event-loop callers: returns (outcome_text, new_story, new_choices)"""
+    import asyncio  # Only async callers pay for importing it
+
+    roll, outcome_future, story_future = start_turn(
+        player_name, action, player_stats, story_history, story_summary=story_summary
+    )
+    outcome, (new_story, new_choices) = await asyncio.gather(
+        asyncio.wrap_future(outcome_future),
+        asyncio.wrap_future(story_future)
+    )
+    return outcome, new_story, new_choices
+
+class TurnStream:
+    """Streams both calls of a turn as ("outcome" | "story", text) events
+
+    The outcome and story streams are read concurrently on the turn pool and
+    merged, so the caller (the Streamlit thread) can render both
+    progressively. Once iteration ends, .outcome, .story and .choices hold
+    the finished turn.
+    """
+
+    def __init__(self, player_name, action, player_stats, story_history, executor=None, story_summary=""):
+        executor = executor or _executor
+        self.roll = roll_for_choice(action, player_stats)
+        self.outcome = ""
+        history = list(story_history or []) + [f"You chose: {action}"]
+        context = describe_roll(action, self.roll)
+
+        self._events = queue.Queue()
+        self._story_stream = generate_ai_story_stream(player_name, player_stats, history, context, story_summary)
+        executor.submit(self._pump, "outcome", process_choice_stream(player_name, action, player_stats, self.roll))
+        executor.submit(self._pump, "story", self._story_stream)
+
+    def _pump(self, kind, chunks):
+        """Forward one stream's chunks to the merged event queue"""
+        try:
+            for text in chunks:
+                self._events.put((kind, text))
+        except Exception as e:
+            print(f"Error streaming {kind}: {e}")
+        finally:
+            self._events.put((kind, None))
+
+    def __iter__(self):
+        open_streams = 2
+        outcome_parts = []
+        while open_streams:
+            kind, text = self._events.get()
+            if text is None:
+                open_streams -= 1
+                continue
+            if kind == "outcome":
+                outcome_parts.append(text)
+            yield kind, text
+        self.outcome = "".join(outcome_parts)
+
+    @property
+    def story(self):
+        return self._story_stream.story
+
+    @property
+    def choices(self):
+        return self._story_stream.choices
+
+def stream_turn(player_name, action, player_stats, story_history, story_summary=""):
+    """Start a streaming turn; iterate the result to render it as it arrives"""
+    return TurnStream(player_name, action, player_stats, story_history, story_summary=story_summary)